@@ -0,0 +1,61 @@
+'''Benchmark filtering many points against many areas.
+
+`in_area` validates the geometry and runs the ray casting algorithm for a
+single point, while a `PreparedArea` stores the edges once and tests every
+point in a `PointArray` with numpy.
+
+Run from the root of the project after installing the package:
+
+    python benchmarks/bench_area.py
+'''
+from math import cos, pi, sin
+from timeit import repeat
+import numpy as np
+from nautical.location import Point, PointArray, PreparedArea
+from nautical.location.util import in_area
+
+
+NUM_POINTS = 2000
+NUM_AREAS = 50
+NUM_VERTICES = 12
+REPEAT = 5
+
+
+def _best(func, number):
+    '''Best time of a single call in seconds'''
+    return min(repeat(func, number=number, repeat=REPEAT)) / number
+
+
+def _create_areas(rng):
+    '''Create star shaped (concave) geometries around random centers'''
+    areas = []
+    for lat, lon in zip(rng.uniform(-50, 50, NUM_AREAS), rng.uniform(-150, 150, NUM_AREAS)):
+        radii = rng.uniform(2.0, 10.0, NUM_VERTICES)
+        angles = [2.0 * pi * index / NUM_VERTICES for index in range(NUM_VERTICES)]
+        areas.append([
+            Point(lat + radius * sin(angle), lon + radius * cos(angle))
+            for radius, angle in zip(radii, angles)
+        ])
+    return areas
+
+
+def main():
+    rng = np.random.default_rng(0)
+    points = PointArray(rng.uniform(-60, 60, NUM_POINTS), rng.uniform(-180, 180, NUM_POINTS))
+    point_list = list(points)
+    areas = _create_areas(rng)
+
+    loop_time = _best(lambda: [[in_area(geo, pnt) for pnt in point_list] for geo in areas], 1)
+    prepare_time = _best(lambda: [PreparedArea(geo) for geo in areas], 10)
+    prepared = [PreparedArea(geo) for geo in areas]
+    vector_time = _best(lambda: [area.contains(points) for area in prepared], 10)
+
+    print(f"{NUM_POINTS} points, {NUM_AREAS} areas of {NUM_VERTICES} points")
+    print(f"{'method':<40}{'per call (ms)':>16}")
+    print(f"{'in_area per point':<40}{loop_time * 1e3:>16.3f}")
+    print(f"{'PreparedArea (prepare)':<40}{prepare_time * 1e3:>16.3f}")
+    print(f"{'PreparedArea.contains':<40}{vector_time * 1e3:>16.3f}")
+
+
+if __name__ == "__main__":
+    main()
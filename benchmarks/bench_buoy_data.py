@@ -0,0 +1,60 @@
+'''Benchmark the construction of BuoyData objects and reading the epoch time.
+
+The constructor initializes the date and time to now and each value is
+set through `from_dict`, while `from_values` creates the object in a single
+call. The epoch time is read once on a new object (computed) and repeatedly
+on the same object (cached).
+
+Run from the root of the project after installing the package:
+
+    python benchmarks/bench_buoy_data.py
+'''
+from timeit import repeat
+from nautical.noaa.buoy import BuoyData
+from nautical.noaa.buoy.buoy_data import buoy_vars
+
+
+NUMBER = 20000
+REPEAT = 5
+
+RECORD = {
+    'wdir': "ESE", 'wspd': 10.2, 'gst': 15.9, 'wspd10m': 10.4, 'wspd20m': 13.4,
+    'wvht': 2.5, 'dpd': 2.5, 'apd': 2.5, 'mwd': "E", 'wwh': 3.5, 'wwp': 7,
+    'pres': 1.8, 'ptdy': 1.8, 'atmp': 76.5, 'wtmp': 65.3, 'dewp': 85.0,
+    'time': '09:34:00', 'dd': 18, 'mm': 10, 'year': 2022
+}
+
+
+def _best(func):
+    '''Best time of a single call in microseconds'''
+    return min(repeat(func, number=NUMBER, repeat=REPEAT)) / NUMBER * 1e6
+
+
+def _from_dict():
+    buoy_data = BuoyData()
+    buoy_data.from_dict(RECORD)
+    return buoy_data
+
+
+def main():
+    record_tuple = tuple(RECORD.get(var, None) for var in buoy_vars)
+    cached = BuoyData.from_values(RECORD)
+
+    results = [
+        ("BuoyData()", _best(BuoyData)),
+        ("BuoyData() + from_dict", _best(_from_dict)),
+        ("BuoyData.from_json", _best(lambda: BuoyData.from_json(RECORD))),
+        ("BuoyData.from_values(dict)", _best(lambda: BuoyData.from_values(RECORD))),
+        ("BuoyData.from_values(tuple)", _best(lambda: BuoyData.from_values(record_tuple))),
+        ("epoch_time (computed)", _best(lambda: BuoyData.from_values(RECORD).epoch_time)
+         - _best(lambda: BuoyData.from_values(RECORD))),
+        ("epoch_time (cached)", _best(lambda: cached.epoch_time)),
+    ]
+
+    print(f"{'method':<32}{'per call (us)':>16}")
+    for name, per_call in results:
+        print(f"{name:<32}{per_call:>16.2f}")
+
+
+if __name__ == "__main__":
+    main()
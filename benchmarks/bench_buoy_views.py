@@ -0,0 +1,61 @@
+'''Benchmark reading the present data and location across the fleet.
+
+The present data and location of a Buoy are shared read-only snapshots, so
+reading them does not allocate. The previous behaviour, returning a copy
+on every read, is measured by calling `copy()` on each read. Each scan reads
+the present data and location of every buoy.
+
+Run from the root of the project after installing the package:
+
+    python benchmarks/bench_buoy_views.py
+'''
+from timeit import repeat
+from tracemalloc import get_traced_memory, start, stop
+from nautical.location import Point
+from nautical.noaa.buoy import Buoy, BuoyData
+
+
+NUM_BUOYS = 1500
+REPEAT = 5
+
+
+def _create_buoys():
+    buoys = []
+    for index in range(NUM_BUOYS):
+        data = BuoyData()
+        data.set("wspd", float(index % 30))
+        buoys.append(Buoy(str(index), location=Point(30.0 + index / 100, -75.0)))
+        buoys[-1].present = data
+    return buoys
+
+
+def _shared_scan(buoys):
+    return [(buoy.present, buoy.location) for buoy in buoys]
+
+
+def _copy_scan(buoys):
+    return [(buoy.present.copy(), buoy.location.copy()) for buoy in buoys]
+
+
+def _allocated(func, buoys):
+    '''Bytes allocated by the result of a single scan'''
+    start()
+    result = func(buoys)
+    current, _ = get_traced_memory()
+    stop()
+    del result
+    return current
+
+
+def main():
+    buoys = _create_buoys()
+
+    print(f"{NUM_BUOYS} buoys")
+    print(f"{'scan':<16}{'per scan (ms)':>16}{'allocated (KiB)':>20}")
+    for name, func in (("copy on read", _copy_scan), ("shared", _shared_scan)):
+        per_scan = min(repeat(lambda: func(buoys), number=10, repeat=REPEAT)) / 10
+        print(f"{name:<16}{per_scan * 1e3:>16.3f}{_allocated(func, buoys) / 1024:>20.1f}")
+
+
+if __name__ == "__main__":
+    main()
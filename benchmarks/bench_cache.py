@@ -0,0 +1,87 @@
+'''Benchmark saving and loading a single buoy in the nautical cache.
+
+The json cache is rewritten to save any change and parsed completely to
+read a single station. The SQLite cache upserts the buoy and looks up the
+station with an index. The journal appends the new observation to the end
+of a file. The indexed cache is opened (the index is decoded) and only the
+record of the station is decoded.
+
+Run from the root of the project after installing the package:
+
+    python benchmarks/bench_cache.py
+'''
+from os.path import join
+from tempfile import TemporaryDirectory
+from timeit import repeat
+from nautical.cache import CacheData, IndexedCache, ObservationJournal, SQLiteCache, dumps, load
+from nautical.location import Point
+from nautical.noaa.buoy import Buoy, BuoyData
+
+
+NUM_BUOYS = 5000
+REPEAT = 5
+
+
+def _best(func, number):
+    '''Best time of a single call in seconds'''
+    return min(repeat(func, number=number, repeat=REPEAT)) / number
+
+
+def _create_buoy(index, minute=0):
+    data = BuoyData.from_values({
+        "wdir": "NNE", "wspd": float(index % 30), "gst": 12.5, "wvht": 1.5, "dpd": 8.0,
+        "pres": 1015.2, "atmp": 20.5, "wtmp": 18.0,
+        "year": 2020, "mm": 1, "dd": 10, "time": f"09:{minute:02d}:00"
+    })
+    buoy = Buoy(str(index), "synthetic buoy", Point(30.0 + index / 1000, -75.0))
+    buoy.present = data
+    buoy.valid = True
+    return buoy
+
+
+def main():
+    buoys = [_create_buoy(index) for index in range(NUM_BUOYS)]
+    refreshed = [_create_buoy(0, minute) for minute in range(1, 60)]
+    station = str(NUM_BUOYS // 2)
+
+    with TemporaryDirectory() as directory:
+        json_file = join(directory, "cache.json")
+        db_file = join(directory, "cache.db")
+        indexed_file = join(directory, "cache.ncache")
+
+        dumps({CacheData.BUOYS.name: buoys}, json_file)
+        dumps({CacheData.BUOYS.name: buoys}, indexed_file)
+        with SQLiteCache(db_file) as cache:
+            cache.upsert_buoys(buoys)
+
+            # saving a single refreshed buoy
+            json_save = _best(lambda: dumps({CacheData.BUOYS.name: buoys}, json_file), 1)
+            updates = iter(refreshed * REPEAT)
+            sqlite_save = _best(lambda: cache.upsert_buoy(next(updates)), 10)
+
+        with ObservationJournal(join(directory, "cache.journal")) as journal:
+            updates = iter(refreshed * REPEAT * 10)
+            journal_save = _best(lambda: journal.append_buoy(next(updates)), 100)
+
+        with SQLiteCache(db_file) as cache:
+            # loading a single station
+            json_load = _best(
+                lambda: [b for b in load(json_file, CacheData.BUOYS)[CacheData.BUOYS.name]
+                         if b.station == station], 1
+            )
+            sqlite_load = _best(lambda: cache.get_buoy(station), 100)
+
+        indexed_load = _best(lambda: IndexedCache(indexed_file).get_buoy(station), 10)
+
+    print(f"{NUM_BUOYS} buoys")
+    print(f"{'operation':<40}{'per call (ms)':>16}")
+    print(f"{'json dumps (save one buoy)':<40}{json_save * 1e3:>16.3f}")
+    print(f"{'SQLiteCache.upsert_buoy':<40}{sqlite_save * 1e3:>16.3f}")
+    print(f"{'ObservationJournal.append_buoy':<40}{journal_save * 1e3:>16.3f}")
+    print(f"{'json load (find one station)':<40}{json_load * 1e3:>16.3f}")
+    print(f"{'SQLiteCache.get_buoy':<40}{sqlite_load * 1e3:>16.3f}")
+    print(f"{'IndexedCache (open + get_buoy)':<40}{indexed_load * 1e3:>16.3f}")
+
+
+if __name__ == "__main__":
+    main()
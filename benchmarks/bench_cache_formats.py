@@ -0,0 +1,62 @@
+'''Benchmark the size, dump time and load time of each cache format.
+
+The cache contains synthetic buoys with the variables that are reported by
+most NDBC stations. Loading decodes every buoy (the indexed cache is lazy,
+every buoy is accessed).
+
+Run from the root of the project after installing the package:
+
+    python benchmarks/bench_cache_formats.py
+'''
+from os.path import getsize, join
+from tempfile import TemporaryDirectory
+from timeit import repeat
+from nautical.cache import CacheData, CacheFormat, dumps, load
+from nautical.location import Point
+from nautical.noaa.buoy import Buoy, BuoyData
+
+
+NUM_BUOYS = 10000
+REPEAT = 3
+DIRECTIONS = ("N", "NNE", "NE", "ENE", "E", "ESE", "SE", "SSE", "S", "SSW", "SW", "WSW", "W", "WNW", "NW", "NNW")
+
+
+def _best(func):
+    '''Best time of a single call in seconds'''
+    return min(repeat(func, number=1, repeat=REPEAT))
+
+
+def _create_buoy(index):
+    data = BuoyData.from_values({
+        "wdir": DIRECTIONS[index % len(DIRECTIONS)], "wspd": float(index % 30), "gst": 12.5,
+        "wvht": 1.5 + index % 7 / 10, "dpd": 8.0, "apd": 6.1, "mwd": DIRECTIONS[index % 5],
+        "pres": 1015.2, "ptdy": -0.3, "atmp": 20.5, "wtmp": 18.0, "dewp": 15.1,
+        "year": 2020, "mm": 1, "dd": 10, "time": f"09:{index % 60:02d}:00"
+    })
+    buoy = Buoy(str(index), f"Station {index}", Point(30.0 + index / 1000, -75.0 + index / 2000))
+    buoy.present = data
+    buoy.valid = True
+    return buoy
+
+
+def _load_all(filename):
+    return [buoy.present for buoy in load(filename)[CacheData.BUOYS.name]]
+
+
+def main():
+    data = {CacheData.BUOYS.name: [_create_buoy(index) for index in range(NUM_BUOYS)]}
+
+    print(f"{NUM_BUOYS} buoys")
+    print(f"{'format':<12}{'size (KiB)':>14}{'dump (ms)':>14}{'load (ms)':>14}")
+    with TemporaryDirectory() as directory:
+        for cache_format in CacheFormat:
+            filename = join(directory, f"cache.{cache_format.value}")
+            # SQLite upserts, each dump after the first one updates the rows
+            dump_time = _best(lambda: dumps(data, filename, format=cache_format))
+            load_time = _best(lambda: _load_all(filename))
+            size = getsize(filename) / 1024
+            print(f"{cache_format.value:<12}{size:>14.1f}{dump_time * 1e3:>14.1f}{load_time * 1e3:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+'''Benchmark the distance between a point and many points.
+
+`Point.distance` is called once per point, while `haversine_one_to_many`
+computes all distances with numpy. The pairwise matrix is computed in chunks.
+
+Run from the root of the project after installing the package:
+
+    python benchmarks/bench_distance.py
+'''
+from timeit import repeat
+import numpy as np
+from nautical.location import Point, PointArray
+from nautical.location.util import haversine_matrix, haversine_one_to_many
+from nautical.units import DistanceUnits
+
+
+NUM_POINTS = 10000
+NUM_PAIRWISE = 2000
+REPEAT = 5
+
+
+def _best(func, number):
+    '''Best time of a single call in seconds'''
+    return min(repeat(func, number=number, repeat=REPEAT)) / number
+
+
+def main():
+    rng = np.random.default_rng(0)
+    points = PointArray(rng.uniform(-90, 90, NUM_POINTS), rng.uniform(-180, 180, NUM_POINTS))
+    point_list = list(points)
+    origin = Point(36.0, -75.0)
+    units = DistanceUnits.NAUTICAL_MILES
+
+    loop_time = _best(lambda: [origin.distance(pnt, units) for pnt in point_list], 1)
+    vector_time = _best(lambda: haversine_one_to_many(origin, points, units), 20)
+    pairwise = points[:NUM_PAIRWISE]
+    matrix_time = _best(lambda: haversine_matrix(pairwise, units=units), 1)
+
+    print(f"{'method':<40}{'per call (ms)':>16}")
+    print(f"{f'Point.distance x {NUM_POINTS}':<40}{loop_time * 1e3:>16.3f}")
+    print(f"{f'haversine_one_to_many ({NUM_POINTS})':<40}{vector_time * 1e3:>16.3f}")
+    print(f"{f'haversine_matrix ({NUM_PAIRWISE} x {NUM_PAIRWISE})':<40}{matrix_time * 1e3:>16.3f}")
+
+
+if __name__ == "__main__":
+    main()
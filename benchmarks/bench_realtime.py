@@ -0,0 +1,57 @@
+'''Benchmark the realtime text parser against scraping the station page.
+
+The station page contains a single observation, while the realtime file
+contains 45 days of observations. The fixture files in the tests directory
+are used, the realtime rows are repeated to fill 45 days of 10 minute data.
+
+Run from the root of the project after installing the package:
+
+    python benchmarks/bench_realtime.py
+'''
+from os.path import abspath, dirname, join
+from timeit import repeat
+from bs4 import BeautifulSoup
+from nautical.io.buoy import get_current_data, get_current_data_from_source
+from nautical.io.realtime import parse_realtime_data
+from nautical.noaa.buoy import BuoyData
+
+
+TESTS_DIR = join(dirname(dirname(abspath(__file__))), "tests")
+SEARCH = ["Conditions at 44072", "Detailed Wave Summary"]
+# 45 days of observations every 10 minutes
+NUM_ROWS = 45 * 24 * 6
+REPEAT = 5
+
+
+def _read(filename):
+    with open(join(TESTS_DIR, filename), "rb") as fixture:
+        return fixture.read()
+
+
+def _best(func, number):
+    '''Best time of a single call in seconds'''
+    return min(repeat(func, number=number, repeat=REPEAT)) / number
+
+
+def main():
+    page = _read("ValidBuoy.html")
+
+    lines = _read("Realtime2Buoy.txt").decode("utf-8").splitlines()
+    header, rows = lines[:2], lines[2:]
+    realtime = "\n".join(header + (rows * (NUM_ROWS // len(rows) + 1))[:NUM_ROWS])
+
+    soup_time = _best(
+        lambda: get_current_data(BeautifulSoup(page, features="lxml"), BuoyData(), SEARCH), 5
+    )
+    source_time = _best(lambda: get_current_data_from_source(page, BuoyData(), SEARCH), 20)
+    realtime_time = _best(lambda: parse_realtime_data(realtime), 1)
+
+    print(f"{'method':<32}{'per call (ms)':>16}{'per observation (us)':>24}")
+    print(f"{'get_current_data':<32}{soup_time * 1e3:>16.3f}{soup_time * 1e6:>24.1f}")
+    print(f"{'get_current_data_from_source':<32}{source_time * 1e3:>16.3f}{source_time * 1e6:>24.1f}")
+    print(f"{'parse_realtime_data':<32}{realtime_time * 1e3:>16.3f}"
+          f"{realtime_time * 1e6 / NUM_ROWS:>24.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+'''Load test a refresh cycle of many stations without network access.
+
+A fixture directory is filled with station pages built from the test
+fixtures, and the stations are refreshed through a ReplayTransport with the
+injected latency. Responses recorded with a RecordTransport can be used by
+passing the fixture directory.
+
+Run from the root of the project after installing the package:
+
+    python benchmarks/bench_refresh.py --stations 10000 --latency 0.05 --workers 32
+'''
+from argparse import ArgumentParser
+from asyncio import run
+from os.path import abspath, dirname, join
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from nautical.io import (
+    HTTPSession,
+    RecordTransport,
+    ReplayTransport,
+    TransportResponse,
+    async_create_buoys,
+    get_noaa_forecast_url,
+    validate_sources
+)
+from nautical.noaa.buoy import Buoy, Source, SourceType
+
+
+TESTS_DIR = join(dirname(dirname(abspath(__file__))), "tests")
+
+
+class _FixtureTransport:
+    '''Transport that builds a station page for every url'''
+
+    def __init__(self, page):
+        self.page = page
+
+    def get(self, url, headers=None, timeout=None):  # pylint: disable=unused-argument
+        station = url.rsplit("=", 1)[-1]
+        return TransportResponse(200, "OK", {}, self.page.replace(b"44072", station.encode()))
+
+    def close(self):
+        pass
+
+
+def _record_fixtures(directory, stations):
+    with open(join(TESTS_DIR, "ValidBuoy.html"), "rb") as page_file:
+        page = page_file.read()
+
+    with HTTPSession(transport=RecordTransport(directory, _FixtureTransport(page))) as session:
+        for station in stations:
+            session.read(get_noaa_forecast_url(station))
+
+
+def main():
+    arg_parser = ArgumentParser(description=__doc__.split("\n")[0])
+    arg_parser.add_argument("--stations", type=int, default=200, help="Number of stations")
+    arg_parser.add_argument("--latency", type=float, default=0.05, help="Seconds per response")
+    arg_parser.add_argument("--workers", type=int, default=16, help="Number of workers")
+    arg_parser.add_argument("--fixtures", default=None, help="Directory of recorded responses")
+    args = arg_parser.parse_args()
+
+    stations = [str(40000 + index) for index in range(args.stations)]
+
+    with TemporaryDirectory() as tmp_dir:
+        fixtures = args.fixtures
+        if fixtures is None:
+            fixtures = tmp_dir
+            _record_fixtures(fixtures, stations)
+
+        replay = ReplayTransport(fixtures, latency=args.latency)
+
+        source = Source(SourceType.as_strings(SourceType.NDBC_METEOROLOGICAL_OCEAN), "benchmark")
+        for station in stations:
+            source.add_buoy(Buoy(station))
+
+        with HTTPSession(pool_maxsize=args.workers, transport=replay) as session:
+            start = perf_counter()
+            validate_sources({source.name: source}, session=session, max_workers=args.workers)
+            validate_time = perf_counter() - start
+
+            start = perf_counter()
+            run(async_create_buoys(stations, concurrency=args.workers, session=session))
+            async_time = perf_counter() - start
+
+    print(f"{args.stations} stations, {args.latency}s latency, {args.workers} workers")
+    print(f"{'validate_sources':<24}{validate_time:>10.2f}s")
+    print(f"{'async_create_buoys':<24}{async_time:>10.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+'''Benchmark snapshots of the nautical cache.
+
+A full copy of the json cache (`copy_current_cache`) is compared with the
+snapshot store. The first snapshot saves every block, later snapshots only
+save the blocks of the buoys that changed (1% of the buoys are refreshed
+between snapshots). Snapshots of the loaded data are compared with snapshots
+that read the records of the json and indexed cache files.
+
+Run from the root of the project after installing the package:
+
+    python benchmarks/bench_snapshot.py
+'''
+from os import walk
+from os.path import getsize, join
+from shutil import copyfile
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from nautical.cache import CacheData, CacheFormat, SnapshotStore, dumps
+from nautical.location import Point
+from nautical.noaa.buoy import Buoy, BuoyData
+
+
+NUM_BUOYS = 10000
+NUM_SNAPSHOTS = 5
+CHANGED = NUM_BUOYS // 100
+
+
+def _create_buoy(index, minute=0):
+    data = BuoyData.from_values({
+        "wdir": "NNE", "wspd": float(index % 30), "gst": 12.5, "wvht": 1.5 + index % 7 / 10,
+        "dpd": 8.0, "pres": 1015.2, "atmp": 20.5, "wtmp": 18.0,
+        "year": 2020, "mm": 1, "dd": 10, "time": f"09:{minute:02d}:00"
+    })
+    buoy = Buoy(str(index), f"Station {index}", Point(30.0 + index / 1000, -75.0 + index / 2000))
+    buoy.present = data
+    buoy.valid = True
+    return buoy
+
+
+def _directory_size(directory):
+    return sum(getsize(join(root, name)) for root, _, names in walk(directory) for name in names)
+
+
+def main():
+    buoys = [_create_buoy(index) for index in range(NUM_BUOYS)]
+
+    with TemporaryDirectory() as directory:
+        json_file = join(directory, "cache.json")
+        dumps({CacheData.BUOYS.name: buoys}, json_file)
+
+        start = perf_counter()
+        for snapshot in range(NUM_SNAPSHOTS):
+            copyfile(json_file, join(directory, f"cache{snapshot}.json"))
+        copy_time = (perf_counter() - start) / NUM_SNAPSHOTS
+        print(f"full copy: {copy_time * 1000:8.1f} ms {getsize(json_file) / 1024:8.0f} KiB per snapshot")
+
+        for compression in ("gzip", "lzma", None):
+            store_dir = join(directory, f"snapshots_{compression}")
+            store = SnapshotStore(store_dir, compression=compression)
+
+            start = perf_counter()
+            store.snapshot({CacheData.BUOYS.name: buoys})
+            first_time = perf_counter() - start
+            first_size = _directory_size(store_dir)
+
+            start = perf_counter()
+            for snapshot in range(1, NUM_SNAPSHOTS):
+                for index in range(snapshot * CHANGED, (snapshot + 1) * CHANGED):
+                    buoys[index] = _create_buoy(index, snapshot)
+                store.snapshot({CacheData.BUOYS.name: buoys})
+            next_time = (perf_counter() - start) / (NUM_SNAPSHOTS - 1)
+            next_size = (_directory_size(store_dir) - first_size) / (NUM_SNAPSHOTS - 1)
+
+            print(f"{str(compression):>9}: first {first_time * 1000:8.1f} ms {first_size / 1024:8.0f} KiB, "
+                  f"next {next_time * 1000:8.1f} ms {next_size / 1024:8.0f} KiB per snapshot")
+
+        for format in (CacheFormat.JSON, CacheFormat.INDEXED):
+            cache_file = join(directory, f"cache_{format.name.lower()}")
+            dumps({CacheData.BUOYS.name: buoys}, cache_file, format=format)
+            store = SnapshotStore(join(directory, f"snapshots_{format.name.lower()}"))
+            store.snapshot(filename=cache_file)
+
+            start = perf_counter()
+            for _ in range(1, NUM_SNAPSHOTS):
+                store.snapshot(filename=cache_file)
+            file_time = (perf_counter() - start) / (NUM_SNAPSHOTS - 1)
+            print(f"{format.name.lower():>9} file: next {file_time * 1000:8.1f} ms per snapshot")
+
+
+if __name__ == "__main__":
+    main()
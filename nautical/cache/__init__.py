@@ -4,9 +4,16 @@ from .file import (
     copy_current_cache_with_timestamp, 
     load, 
     dumps,
-    CacheData
+    CacheData,
+    CacheFormat
 )
 from .time import should_update
+from .http import HTTPCache
+from .indexed import IndexedCache
+from .journal import ObservationJournal
+from .snapshot import RetentionPolicy, SnapshotStore
+from .sqlite import SQLiteCache
+from .catalogue import load_catalogue, dump_catalogue
 
 
 __all__ = [
@@ -16,5 +23,14 @@ __all__ = [
     "load", 
     "dumps",
     "should_update",
-    "CacheData"
+    "CacheData",
+    "CacheFormat",
+    "HTTPCache",
+    "IndexedCache",
+    "ObservationJournal",
+    "RetentionPolicy",
+    "SnapshotStore",
+    "SQLiteCache",
+    "load_catalogue",
+    "dump_catalogue"
 ]
\ No newline at end of file
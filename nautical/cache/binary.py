@@ -0,0 +1,256 @@
+'''Binary cache format. Every buoy is saved as a record where the values of the
+present data are saved in the order of `buoy_vars`, so the names of the variables
+are not repeated for each buoy. Strings (stations, descriptions, time and values
+that are not numeric such as the wind direction) are saved once in a string table
+and the records refer to them by index.
+
+Layout of the file::
+
+    magic | header size | json header | records ...
+
+Each record has a fixed size part followed by one double for each variable that
+is present::
+
+    station | description | source | flags | latitude | longitude | altitude |
+    present mask | string mask | int mask | values ...
+
+The size of a record depends on its present mask, so the records are read in order.
+'''
+from json import dumps as jdumps, loads as jloads
+from struct import Struct
+from ..location import Point
+from ..log import get_logger
+from ..noaa.buoy import Buoy, Source
+from ..noaa.buoy.buoy_data import FrozenBuoyData, buoy_vars
+from ..time import convert_noaa_time, get_current_time, get_time_str
+from .common import CacheData, atomic_open, convert_to_keys
+
+
+log = get_logger()
+
+# Extensions of the files that are written with the binary format
+BINARY_EXTENSIONS = (".nbin",)
+
+_MAGIC = b"NCBIN002"
+_HEADER = Struct(">Q")
+
+# Values of the record flags
+_VALID = 0x01
+_LOCATION = 0x02
+_DATA = 0x04
+
+# Index used when a string is not set (ex. no description)
+_NO_STRING = -1
+
+# station, description, source (string indices), flags, latitude, longitude, altitude,
+# mask of the variables that are present, mask of the variables that are string indices,
+# mask of the variables that are integers. The values of the variables that are present follow.
+_RECORD = Struct(">iiiBdddQQQ")
+
+# Each variable is a bit of the 64 bit masks
+if len(buoy_vars) > 64:
+    raise ImportError(f"The binary cache supports 64 buoy variables, found {len(buoy_vars)}")
+
+# Structs of the values, by number of values
+_values_structs = {}
+
+
+def _values_struct(num_values):
+    '''Get the struct that packs the number of values'''
+    if num_values not in _values_structs:
+        _values_structs[num_values] = Struct(f">{num_values}d")
+    return _values_structs[num_values]
+
+
+def is_binary_file(filename):
+    '''Determine if the file is a binary cache.
+
+    :param filename: Name of the file
+    :return: True when the file exists and contains a binary cache
+    '''
+    try:
+        with open(filename, "rb") as cache_file:
+            return cache_file.read(len(_MAGIC)) == _MAGIC
+    except OSError:
+        return False
+
+
+class _StringTable:
+
+    '''Strings saved in the cache, each string is saved once'''
+
+    def __init__(self):
+        self.strings = []
+        self._indices = {}
+
+    def index(self, value):
+        '''Get the index of the string, the string is added when it is not in the table'''
+        if value is None:
+            return _NO_STRING
+        if value not in self._indices:
+            self._indices[value] = len(self.strings)
+            self.strings.append(value)
+        return self._indices[value]
+
+
+def _encode_buoy(strings, source_index, buoy):
+    '''Pack a buoy into a record'''
+    flags = _VALID if buoy.valid else 0
+    location = buoy.location
+    latitude = longitude = altitude = 0.0
+    if location is not None:
+        flags |= _LOCATION
+        latitude, longitude, altitude = location.latitude, location.longitude, location.altitude
+
+    present_mask = 0
+    string_mask = 0
+    int_mask = 0
+    values = []
+    if buoy.present is not None:
+        flags |= _DATA
+        for position, var in enumerate(buoy_vars):
+            value = getattr(buoy.present, var, None)
+            if value is None or value == "":
+                continue
+            if var == "time":
+                value = str(value)
+
+            present_mask |= 1 << position
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                values.append(float(value))
+                if isinstance(value, int):
+                    int_mask |= 1 << position
+            else:
+                values.append(float(strings.index(str(value))))
+                string_mask |= 1 << position
+
+    return _RECORD.pack(
+        strings.index(str(buoy.station)), strings.index(buoy.description if buoy.description else None),
+        source_index, flags, latitude, longitude, altitude, present_mask, string_mask, int_mask
+    ) + _values_struct(len(values)).pack(*values)
+
+
+def dump_binary(data, filename):
+    '''Save the data as a binary cache. See `nautical.cache.dumps`.
+
+    :param data: Dictionary containing buoys and sources with the keys to match
+    :param filename: name of the file where the data will be stored
+    '''
+    if not isinstance(data, dict):
+        raise TypeError("dumps requires data to be a dictionary")
+
+    strings = _StringTable()
+    sources = data.get(CacheData.SOURCES.name, [])
+
+    groups = [(_NO_STRING, data.get(CacheData.BUOYS.name, []))]
+    groups.extend((strings.index(source.name), source) for source in sources)
+    records = b"".join(
+        _encode_buoy(strings, source_index, buoy)
+        for source_index, buoys in groups for buoy in buoys
+    )
+
+    header = {
+        CacheData.TIME.name: get_time_str(get_current_time()),
+        CacheData.SOURCES.name: [
+            [source.name, source.description if source.description else ""] for source in sources
+        ],
+        "VARS": buoy_vars,
+        "STRINGS": strings.strings
+    }
+    encoded_header = jdumps(header, separators=(",", ":")).encode("utf-8")
+
+    with atomic_open(filename) as cache_file:
+        cache_file.write(_MAGIC + _HEADER.pack(len(encoded_header)))
+        cache_file.write(encoded_header)
+        cache_file.write(records)
+
+
+def load_binary(filename, cached_output=CacheData.ALL):
+    '''Load a binary cache. See `nautical.cache.load`.
+
+    :param filename: Name of the file containing the binary cache
+    :param cached_output: CacheData enumeration type. What type of information to retrieve
+    :return: Dictionary containing all cached output
+    :raises ValueError: when the file is not a binary cache
+    '''
+    with open(filename, "rb") as cache_file:
+        contents = cache_file.read()
+
+    if contents[:len(_MAGIC)] != _MAGIC:
+        raise ValueError(f"{filename} is not a binary cache")
+
+    start = len(_MAGIC) + _HEADER.size
+    (header_size,) = _HEADER.unpack_from(contents, len(_MAGIC))
+    header = jloads(contents[start:start + header_size])
+
+    strings = header["STRINGS"]
+    variables = header["VARS"]
+    # position of each saved variable in `buoy_vars`, variables that are no longer known are dropped
+    targets = [buoy_vars.index(var) if var in buoy_vars else None for var in variables]
+    time_position = buoy_vars.index("time")
+    # each time string is only parsed once, the read-only time is shared by the buoys
+    times = {}
+
+    converted = convert_to_keys(cached_output)
+    load_buoys = CacheData.BUOYS.name in converted
+    load_sources = CacheData.SOURCES.name in converted
+
+    sources = {}
+    if load_sources:
+        for name, description in header[CacheData.SOURCES.name]:
+            sources[name] = Source(name, description if description else None)
+
+    buoys = []
+    offset = start + header_size
+    while offset < len(contents):
+        station, description, source_index, flags, lat, lon, alt, present_mask, string_mask, int_mask = \
+            _RECORD.unpack_from(contents, offset)
+        offset += _RECORD.size
+
+        values_struct = _values_struct(bin(present_mask).count("1"))
+        values = values_struct.unpack_from(contents, offset)
+        offset += values_struct.size
+
+        if not (load_sources if source_index != _NO_STRING else load_buoys):
+            continue
+
+        buoy = Buoy(strings[station], strings[description] if description != _NO_STRING else None)
+        buoy.valid = bool(flags & _VALID)
+        if flags & _LOCATION:
+            buoy.location = Point(lat, lon, alt)
+
+        if flags & _DATA:
+            present = [None] * len(buoy_vars)
+            values = iter(values)
+            for position, target in enumerate(targets):
+                if not present_mask >> position & 1:
+                    continue
+                value = next(values)
+                if target is None:
+                    continue
+                if string_mask >> position & 1:
+                    value = strings[int(value)]
+                    if target == time_position:
+                        if value not in times:
+                            nautical_time = convert_noaa_time(value)
+                            times[value] = nautical_time.freeze() if nautical_time else None
+                        value = times[value]
+                elif int_mask >> position & 1:
+                    value = int(value)
+                present[target] = value
+
+            buoy.present = FrozenBuoyData.from_values(present)
+
+        if source_index == _NO_STRING:
+            buoys.append(buoy)
+        else:
+            sources[strings[source_index]].add_buoy(buoy)
+
+    output = {}
+    if load_buoys:
+        output[CacheData.BUOYS.name] = buoys
+    if load_sources:
+        output[CacheData.SOURCES.name] = list(sources.values())
+    if CacheData.TIME.name in converted:
+        output[CacheData.TIME.name] = header[CacheData.TIME.name]
+    return output
@@ -0,0 +1,86 @@
+'''The catalogue of sources (and their buoys) rarely changes. The parsed
+catalogue is saved to the cache directory so that it does not need to be
+downloaded and parsed every time the sources are requested.
+'''
+from json import load as jload, dump as jdump
+from os import makedirs
+from os.path import abspath, dirname, join, exists
+from ..log import get_logger
+from ..noaa.buoy import Source
+from ..units import TimeUnits
+from .common import atomic_open
+from .file import NAUTICAL_CACHE_DIR
+from .time import should_update
+
+
+log = get_logger()
+
+NAUTICAL_CATALOGUE_FILE = join(NAUTICAL_CACHE_DIR, "nautical_catalogue.json")
+
+# Default number of minutes that a cached source is considered valid
+DEFAULT_CATALOGUE_TTL = 24 * 60
+
+
+def load_catalogue(filename=NAUTICAL_CATALOGUE_FILE):
+    '''Load the cached catalogue of sources.
+
+    :param filename: Name of the file containing the cached catalogue
+    :return: Dictionary of source name mapped to a tuple of (time string, Source)
+    where the time string is the time that the source was cached. The Source is None
+    when the source was requested but not found.
+    '''
+    if not exists(filename):
+        return {}
+
+    try:
+        with open(filename, "rb") as catalogue_file:
+            catalogue = jload(catalogue_file)
+    except (OSError, ValueError) as error:
+        log.warning("Failed to load the catalogue %s: %s", filename, error)
+        return {}
+
+    output = {}
+    for entry in catalogue.get("SOURCES", []):
+        try:
+            source = Source.from_json(entry["source"]) if entry["source"] else None
+            output[entry["name"]] = (entry.get("TIME"), source)
+        except KeyError as error:
+            log.warning("Skip loading catalogue entry: %s", error)
+    return output
+
+
+def dump_catalogue(catalogue, filename=NAUTICAL_CATALOGUE_FILE):
+    '''Save the catalogue of sources. The file is replaced atomically (see `atomic_open`).
+
+    :param catalogue: Dictionary of source name mapped to a tuple of (time string, Source)
+    (see `load_catalogue`)
+    :param filename: Name of the file where the catalogue is stored
+    '''
+    data = {
+        "SOURCES": [
+            {"TIME": time_str, "name": name, "source": source.to_json() if source else None}
+            for name, (time_str, source) in catalogue.items()
+        ]
+    }
+
+    makedirs(dirname(abspath(filename)), exist_ok=True)
+    with atomic_open(filename, "w") as catalogue_file:
+        jdump(data, catalogue_file)
+
+
+def is_stale(time_str, ttl=DEFAULT_CATALOGUE_TTL):
+    '''Determine if a cached catalogue entry should be updated.
+
+    :param time_str: Time that the entry was cached (see `get_time_str`)
+    :param ttl: Number of minutes that an entry is considered valid
+    :return: True when the entry is older than the ttl or the time is invalid
+    '''
+    if not time_str:
+        return True
+
+    try:
+        return should_update(time_str, units=TimeUnits.MINUTES, max_diff=ttl)
+    except ValueError as error:
+        log.warning("Invalid catalogue time %s: %s", time_str, error)
+        return True
+
@@ -0,0 +1,67 @@
+'''Locations and types of data shared by all cache formats. No matter what
+system is used, the cache should be saved to the correct/known location
+provided by this module.
+'''
+from appdirs import user_cache_dir
+from contextlib import contextmanager
+from enum import Enum
+from os.path import join
+from os import getenv, remove, replace
+from uuid import uuid4
+
+
+__CACHE_FILE = "nautical_cache.json"
+NAUTICAL_CACHE_DIR = getenv("NAUTICAL_CACHE_DIR", user_cache_dir("nautical"))
+
+NAUTICAL_CACHE_FILE = join(NAUTICAL_CACHE_DIR, __CACHE_FILE)
+
+
+class CacheData(Enum):
+    '''Describes the type of data that the user wants
+    to retrieve from the CACHE
+    '''
+    ALL = 0
+    BUOYS = 1
+    SOURCES = 2
+    TIME = 3
+
+
+class CacheFormat(Enum):
+    '''Describes the format of the cache file (see `nautical.cache.dumps`)
+    '''
+    JSON = "json"
+    SQLITE = "sqlite"
+    INDEXED = "indexed"
+    BINARY = "binary"
+
+
+def convert_to_keys(output_type):
+    '''Convert the CacheData type to string keys required for output
+    '''
+    if output_type == CacheData.ALL:
+        return [x.name for x in CacheData if x != CacheData.ALL]
+    return [output_type.name]
+
+
+@contextmanager
+def atomic_open(filename, mode="wb"):
+    '''Open a temporary file that replaces the file when the context exits without
+    an error, so readers never see a partially written file. Every writer uses a
+    temporary file with a unique name, concurrent writers of the same file do not
+    overwrite each other's temporary file (the last writer to finish wins).
+
+    :param filename: Name of the file to write
+    :param mode: "wb" for bytes or "w" for text, the file can also be read ("+" is implied)
+    :return: context manager of the open temporary file
+    '''
+    temp_filename = f"{filename}.{uuid4().hex}.tmp"
+    try:
+        with open(temp_filename, mode.replace("w", "x").replace("+", "") + "+") as temp_file:
+            yield temp_file
+        replace(temp_filename, filename)
+    except BaseException:
+        try:
+            remove(temp_filename)
+        except OSError:
+            pass
+        raise
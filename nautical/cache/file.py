@@ -1,35 +1,25 @@
 '''No matter what system is used, the cache should be save to the 
 correct/known location provided by this module.
 '''
-from appdirs import user_cache_dir
 from datetime import datetime, timezone
-from enum import Enum
 from json import load as jload, dump as jdump
-from os.path import join, exists
-from os import mkdir, remove, getenv
+from os.path import exists
+from os import mkdir
+from shutil import copyfileobj
 from ..log import get_logger
 from ..time import get_time_str
 from ..noaa.buoy import Source, Buoy
+from .binary import BINARY_EXTENSIONS, dump_binary, is_binary_file, load_binary
+from .common import (
+    CacheData, CacheFormat, NAUTICAL_CACHE_DIR, NAUTICAL_CACHE_FILE, atomic_open, convert_to_keys
+)
+from .indexed import INDEXED_EXTENSIONS, IndexedCache, dump_indexed, is_indexed_file
+from .sqlite import SQLITE_EXTENSIONS, SQLiteCache, is_sqlite_file
 
 
 log = get_logger()
 log.warning("First time imports should call nautical.cache.setup()")
 
-__CACHE_FILE = "nautical_cache.json"
-NAUTICAL_CACHE_DIR = getenv("NAUTICAL_CACHE_DIR", user_cache_dir("nautical"))
-
-NAUTICAL_CACHE_FILE = join(NAUTICAL_CACHE_DIR, __CACHE_FILE)
-
-
-class CacheData(Enum):
-    '''Describes the type of data that the user wants
-    to retrieve from the CACHE
-    '''
-    ALL = 0
-    BUOYS = 1
-    SOURCES = 2
-    TIME = 3
-
 
 def setup():
     '''Create the cache directory if it does not exist/
@@ -39,7 +29,9 @@ def setup():
 
 
 def copy_current_cache(extra_name_data):
-    '''Copy the current nautical cache file and append the extra_data.
+    '''Copy the current nautical cache file and append the extra_data. The file
+    is copied in chunks. For regular snapshots see `nautical.cache.snapshot.SnapshotStore`,
+    which only saves the buoys that changed.
     
     :return: Filename on success, None otherwise
     '''
@@ -49,9 +41,9 @@ def copy_current_cache(extra_name_data):
     copied_name = NAUTICAL_CACHE_FILE
     copied_name = copied_name.replace(".json", extra_name_data) + ".json"
 
-    with open(NAUTICAL_CACHE_FILE.replace("\\", "/"), "r") as readFile:
-        with open(copied_name, "w+") as writeFile:
-            writeFile.write(readFile.read())
+    with open(NAUTICAL_CACHE_FILE.replace("\\", "/"), "rb") as readFile:
+        with open(copied_name, "wb") as writeFile:
+            copyfileobj(readFile, writeFile)
 
     return copied_name
 
@@ -63,29 +55,35 @@ def copy_current_cache_with_timestamp():
     return copy_current_cache(now.strftime("%Y-%m-%d_%H-%M-%S"))
 
 
-def _convert_to_keys(output_type):
-    '''Convert the CacheData type to string keys required for output
-    '''
-    if output_type == CacheData.ALL:
-        return [x.name for x in CacheData if x != CacheData.ALL]
-    return [output_type.name]
-
-
 def load(filename=NAUTICAL_CACHE_FILE, cached_output=CacheData.ALL):
     '''Load the nautical cache if it exists. All nautical data is returned as nautical objects
     in the dictionary. Time is provided as a string.
     
-    :param filename: Name of the file containing cached data.
+    :param filename: Name of the file containing cached data. The format of the file
+    (see `CacheFormat`) is detected automatically. The file is closed when the data
+    is returned, use `nautical.cache.indexed.IndexedCache` to decode the buoys of an
+    indexed cache when they are first accessed.
     :param cached_output: CacheData enumeration type. What type of information to retrieve
     :return: Dictionary containing all cached output
     '''
     if not exists(filename):
         return {}
+
+    if is_sqlite_file(filename):
+        with SQLiteCache(filename) as cache:
+            return cache.load(cached_output)
+
+    if is_indexed_file(filename):
+        with IndexedCache(filename) as cache:
+            return cache.load(cached_output, lazy=False)
+
+    if is_binary_file(filename):
+        return load_binary(filename, cached_output)
     
     with open(filename, "rb") as cache_file:
         cache = jload(cache_file)
     
-    converted = _convert_to_keys(cached_output)
+    converted = convert_to_keys(cached_output)
 
     output = {}    
     for key, value in cache.items():
@@ -97,21 +95,61 @@ def load(filename=NAUTICAL_CACHE_FILE, cached_output=CacheData.ALL):
     return output
 
 
-def dumps(data, filename=NAUTICAL_CACHE_FILE):
+def _find_format(filename):
+    '''Determine the format of the cache from the extension of the filename.
+    An existing cache keeps its format.
+
+    :param filename: Name of the cache file
+    :return: CacheFormat, JSON when the extension is not known
+    '''
+    if filename.endswith(SQLITE_EXTENSIONS) or is_sqlite_file(filename):
+        return CacheFormat.SQLITE
+    if filename.endswith(INDEXED_EXTENSIONS) or is_indexed_file(filename):
+        return CacheFormat.INDEXED
+    if filename.endswith(BINARY_EXTENSIONS) or is_binary_file(filename):
+        return CacheFormat.BINARY
+    return CacheFormat.JSON
+
+
+# pylint: disable=redefined-builtin
+def dumps(data, filename=NAUTICAL_CACHE_FILE, format=None):
     '''Overwrite the current value of the NAUTICAL_CACHE_FILE
     with the current contents of data. The data should be passed in should
     be provided as nautical objects for buoys and sources.
     
+    The format of the file is selected with `format`. When the format is not provided,
+    an existing cache keeps its format, otherwise the format is found from the extension:
+    - SQLite (`SQLITE_EXTENSIONS`): the buoys and sources are upserted
+    into the database rather than rewriting the file (see `nautical.cache.sqlite.SQLiteCache.dumps`).
+    - Indexed (`INDEXED_EXTENSIONS`): see `nautical.cache.indexed.dump_indexed`.
+    - Binary (`BINARY_EXTENSIONS`): see `nautical.cache.binary.dump_binary`.
+    - JSON: all other files.
+
     :param data: Dictionary containing buoys and sources with the keys to match
     :param filename: name of the file where the data will be stored
+    :param format: CacheFormat (or the value of a CacheFormat) of the file
     '''
-    if exists(filename):
-        log.warning("Overwriting contents of %s", filename)
-        remove(filename)
-    
     if not isinstance(data, dict):
         raise TypeError("dumps requires data to be a dictionary")
 
+    cache_format = _find_format(filename) if format is None else CacheFormat(format)
+
+    if cache_format == CacheFormat.SQLITE:
+        with SQLiteCache(filename) as cache:
+            cache.dumps(data)
+        return
+
+    if cache_format == CacheFormat.INDEXED:
+        dump_indexed(data, filename)
+        return
+
+    if cache_format == CacheFormat.BINARY:
+        dump_binary(data, filename)
+        return
+
+    if exists(filename):
+        log.warning("Overwriting contents of %s", filename)
+
     _data = {}
     _data[CacheData.TIME.name] = get_time_str()
     
@@ -125,5 +163,5 @@ def dumps(data, filename=NAUTICAL_CACHE_FILE):
             source.to_json() for source in data[CacheData.SOURCES.name]
         ]
         
-    with open(filename, "w+") as cache_file:
+    with atomic_open(filename, "w") as cache_file:
         jdump(_data, cache_file, indent=4)
@@ -0,0 +1,117 @@
+'''Cache for the raw responses of urls. The cache stores the ETag and
+Last-Modified headers of each response so that conditional requests can be
+sent, and the cached body can be used when the server reports that the
+data has not been modified.
+'''
+from hashlib import sha1
+from json import load as jload, dump as jdump
+from os import listdir, makedirs, remove
+from os.path import join, exists
+from ..log import get_logger
+from .common import atomic_open
+from .file import NAUTICAL_CACHE_DIR
+
+
+log = get_logger()
+
+HTTP_CACHE_DIR = join(NAUTICAL_CACHE_DIR, "http")
+
+
+class HTTPCache:
+
+    '''On disk cache of url responses used to send conditional requests.'''
+
+    def __init__(self, directory: str = HTTP_CACHE_DIR) -> None:
+        '''
+        :param directory: Directory where the responses are stored
+        '''
+        self.directory = directory
+        makedirs(self.directory, exist_ok=True)
+
+    def _filename(self, url, extension):
+        '''Name of the file for the url, the url is hashed to create a valid filename'''
+        return join(self.directory, sha1(url.encode("utf-8")).hexdigest() + extension)
+
+    def _load_headers(self, url):
+        '''Load the cached headers for the url.
+
+        :return: Dictionary of cached headers, empty when none are cached
+        '''
+        filename = self._filename(url, ".json")
+        if not exists(filename):
+            return {}
+
+        try:
+            with open(filename, "r") as header_file:
+                return jload(header_file)
+        except (OSError, ValueError) as error:
+            log.warning("Failed to load cached headers for %s: %s", url, error)
+            return {}
+
+    def conditional_headers(self, url):
+        '''Get the headers that should be sent with a request for the url.
+
+        :param url: full url to request
+        :return: Dictionary containing If-None-Match and/or If-Modified-Since
+        '''
+        cached = self._load_headers(url)
+        if not cached or not exists(self._filename(url, ".body")):
+            return {}
+
+        headers = {}
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+        return headers
+
+    def load(self, url):
+        '''Load the cached body for the url.
+
+        :param url: full url
+        :return: bytes of the body, None when the url is not cached
+        '''
+        filename = self._filename(url, ".body")
+        if not exists(filename):
+            return None
+
+        with open(filename, "rb") as body_file:
+            return body_file.read()
+
+    def store(self, url, headers, content):
+        '''Store the response for the url. Responses without an ETag or
+        Last-Modified header cannot be used for conditional requests and
+        are not stored.
+
+        :param url: full url
+        :param headers: Response headers
+        :param content: bytes of the response body
+        :return: True when the response was stored
+        '''
+        cached = {
+            "url": url,
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified")
+        }
+        if not cached["etag"] and not cached["last_modified"]:
+            return False
+
+        with atomic_open(self._filename(url, ".body")) as body_file:
+            body_file.write(content)
+
+        with atomic_open(self._filename(url, ".json"), "w") as header_file:
+            jdump(cached, header_file)
+
+        return True
+
+    def remove(self, url):
+        '''Remove the cached response for the url'''
+        for extension in (".json", ".body"):
+            filename = self._filename(url, extension)
+            if exists(filename):
+                remove(filename)
+
+    def clear(self):
+        '''Remove all cached responses'''
+        for filename in listdir(self.directory):
+            remove(join(self.directory, filename))
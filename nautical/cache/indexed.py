@@ -0,0 +1,363 @@
+'''Indexed cache format. Each buoy is saved as a separate json record, followed
+by fixed size tables of the byte offsets of the records. A single station or
+source is loaded by reading the tables and the records that it needs, the rest
+of the cache is not decoded. Opening the cache only decodes a small header, so
+the time to open the cache does not depend on the number of buoys.
+
+Layout of the file::
+
+    magic | header offset | header size | buoy records ... | records table |
+    stations table | station keys | header
+
+The records table contains the (offset, size) of each record in the order
+that the records were written; the buoys of each source are contiguous. The
+stations table contains a key (station, source, description) for each record,
+sorted so that a station is found with a binary search.
+'''
+from collections.abc import Sequence
+from json import dumps as jdumps, loads as jloads
+from mmap import mmap, ACCESS_READ
+from os.path import exists, getsize
+from struct import Struct
+from ..log import get_logger
+from ..noaa.buoy import Buoy, Source
+from ..time import get_current_time, get_time_str
+from .common import CacheData, atomic_open, convert_to_keys
+
+
+log = get_logger()
+
+# Extensions of the files that are written with the indexed format
+INDEXED_EXTENSIONS = (".ncache",)
+
+_MAGIC = b"NCIDX001"
+# offset and size of the json header
+_HEADER = Struct(">QQ")
+# offset and size of a record
+_RECORD = Struct(">QI")
+# offset and size of the station key, index of the record
+_STATION = Struct(">QII")
+
+# Separates the station, source and description in a station key
+_SEPARATOR = b"\x00"
+
+
+def is_indexed_file(filename):
+    '''Determine if the file is an indexed cache.
+
+    :param filename: Name of the file
+    :return: True when the file exists and contains an indexed cache
+    '''
+    if not exists(filename):
+        return False
+
+    with open(filename, "rb") as cache_file:
+        return cache_file.read(len(_MAGIC)) == _MAGIC
+
+
+def _station_key(station, source, description):
+    '''Create the key used to sort and search the stations table'''
+    return _SEPARATOR.join(
+        value.encode("utf-8") for value in (str(station), source, description if description else "")
+    )
+
+
+def dump_indexed(data, filename):
+    '''Save the data as an indexed cache. See `nautical.cache.dumps`.
+
+    :param data: Dictionary containing buoys and sources with the keys to match
+    :param filename: name of the file where the data will be stored
+    '''
+    if not isinstance(data, dict):
+        raise TypeError("dumps requires data to be a dictionary")
+
+    sources = data.get(CacheData.SOURCES.name, [])
+    groups = [("", data.get(CacheData.BUOYS.name, []))]
+    groups.extend((source.name, source) for source in sources)
+
+    records = []
+    keys = []
+    ranges = []
+
+    with atomic_open(filename) as cache_file:
+        cache_file.write(_MAGIC + _HEADER.pack(0, 0))
+        offset = cache_file.tell()
+
+        for source_name, buoys in groups:
+            first = len(records)
+            for buoy in buoys:
+                record = jdumps(buoy.to_json(), separators=(",", ":")).encode("utf-8")
+                cache_file.write(record)
+                keys.append((_station_key(buoy.station, source_name, buoy.description), len(records)))
+                records.append((offset, len(record)))
+                offset += len(record)
+            ranges.append((first, len(records) - first))
+
+        keys.sort()
+        key_blob = b"".join(key for key, _ in keys)
+
+        stations_table = bytearray()
+        key_offset = 0
+        for key, record_index in keys:
+            stations_table += _STATION.pack(key_offset, len(key), record_index)
+            key_offset += len(key)
+
+        header = {
+            CacheData.TIME.name: get_time_str(get_current_time()),
+            CacheData.BUOYS.name: ranges[0],
+            CacheData.SOURCES.name: {
+                source.name: [source.description if source.description else "", *ranges[index + 1]]
+                for index, source in enumerate(sources)
+            },
+            "COUNT": len(records),
+            "RECORDS": offset,
+            "STATIONS": offset + len(records) * _RECORD.size,
+            "KEYS": offset + len(records) * _RECORD.size + len(stations_table)
+        }
+
+        cache_file.write(b"".join(_RECORD.pack(*record) for record in records))
+        cache_file.write(stations_table)
+        cache_file.write(key_blob)
+
+        encoded_header = jdumps(header, separators=(",", ":")).encode("utf-8")
+        header_offset = cache_file.tell()
+        cache_file.write(encoded_header)
+        cache_file.seek(len(_MAGIC))
+        cache_file.write(_HEADER.pack(header_offset, len(encoded_header)))
+
+
+class LazySequence(Sequence):
+
+    '''Read-only sequence where each item is decoded on first access. Decoded
+    items are kept so that every access returns the same object.
+    '''
+
+    def __init__(self, decode, keys) -> None:
+        '''
+        :param decode: Function that creates an item from a key
+        :param keys: Sequence of keys, one for each item
+        '''
+        self._decode = decode
+        self._keys = keys
+        self._items = [None] * len(keys)
+
+    def __len__(self):
+        '''Number of items in the sequence'''
+        return len(self._keys)
+
+    def __getitem__(self, index):
+        '''Get (and decode when required) an item, a list is returned for a slice'''
+        if isinstance(index, slice):
+            return [self[position] for position in range(*index.indices(len(self)))]
+
+        if self._items[index] is None:
+            self._items[index] = self._decode(self._keys[index])
+        return self._items[index]
+
+    @property
+    def num_decoded(self):
+        '''Number of items that have been decoded'''
+        return sum(item is not None for item in self._items)
+
+
+class IndexedCache:
+
+    '''Reader for an indexed cache (see `dump_indexed`). Only the header is decoded
+    when the cache is opened; buoys and sources are decoded when they are requested.
+
+    The file is memory mapped until the cache is closed, use the cache as a context
+    manager (or call `close`). Lazy sequences returned by `load` read from the mapping,
+    so the cache must stay open while they are used. Some systems (Windows) do not
+    allow an open cache to be replaced, close the cache before saving to the same file.
+    '''
+
+    def __init__(self, filename: str) -> None:
+        '''
+        :param filename: Name of the file containing the indexed cache
+        :raises ValueError: when the file is not an indexed cache
+        '''
+        self.filename = filename
+        self._data = None
+        if getsize(filename) < len(_MAGIC) + _HEADER.size:
+            raise ValueError(f"{filename} is not an indexed cache")
+
+        with open(filename, "rb") as cache_file:
+            self._data = mmap(cache_file.fileno(), 0, access=ACCESS_READ)
+
+        if self._data[:len(_MAGIC)] != _MAGIC:
+            self.close()
+            raise ValueError(f"{filename} is not an indexed cache")
+
+        header_offset, header_size = _HEADER.unpack_from(self._data, len(_MAGIC))
+        header = jloads(self._data[header_offset:header_offset + header_size])
+
+        self.time = header.get(CacheData.TIME.name)
+        # (first record, number of records) of the buoys that are not in a source
+        self._buoys = header[CacheData.BUOYS.name]
+        # source name mapped to the description, first record and number of records
+        self._sources = header[CacheData.SOURCES.name]
+        self._count = header["COUNT"]
+        self._records_offset = header["RECORDS"]
+        self._stations_offset = header["STATIONS"]
+        self._keys_offset = header["KEYS"]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __len__(self):
+        '''Number of buoys in the cache, including the buoys in sources'''
+        return self._count
+
+    def close(self):
+        '''Close the memory mapped file'''
+        if self._data is not None:
+            self._data.close()
+            self._data = None
+
+    @property
+    def stations(self):
+        '''Set of all stations in the cache. The entire stations table is read.'''
+        return {self._station_entry(index)[0][0] for index in range(self._count)}
+
+    @property
+    def sources(self):
+        '''View of the names of the sources in the cache'''
+        return self._sources.keys()
+
+    def _check_open(self):
+        '''Raise ValueError when the cache is closed'''
+        if self._data is None:
+            raise ValueError(f"{self.filename} is closed")
+
+    def _station_entry(self, index):
+        '''Read an entry of the stations table.
+
+        :return: tuple of ((station, source, description), record index)
+        :raises ValueError: when the cache is closed
+        '''
+        self._check_open()
+        key_offset, key_size, record_index = _STATION.unpack_from(
+            self._data, self._stations_offset + index * _STATION.size
+        )
+        start = self._keys_offset + key_offset
+        key = self._data[start:start + key_size].decode("utf-8").split(_SEPARATOR.decode())
+        return tuple(key), record_index
+
+    def _read_buoy(self, record_index):
+        '''Decode the Buoy saved in a record
+
+        :raises ValueError: when the cache is closed
+        '''
+        self._check_open()
+        offset, size = _RECORD.unpack_from(self._data, self._records_offset + record_index * _RECORD.size)
+        return Buoy.from_json(jloads(self._data[offset:offset + size]))
+
+    def _find(self, station):
+        '''Binary search of the stations table.
+
+        :return: list of tuples of ((station, source, description), record index)
+        :raises ValueError: when the cache is closed
+        '''
+        self._check_open()
+        prefix = str(station).encode("utf-8") + _SEPARATOR
+
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            key_offset, key_size, _ = _STATION.unpack_from(
+                self._data, self._stations_offset + middle * _STATION.size
+            )
+            start = self._keys_offset + key_offset
+            if self._data[start:start + key_size] < prefix:
+                low = middle + 1
+            else:
+                high = middle
+
+        found = []
+        for index in range(low, self._count):
+            key, record_index = self._station_entry(index)
+            if key[0] != str(station):
+                break
+            found.append((key, record_index))
+        return found
+
+    def get_buoy(self, station, source=None):
+        '''Load a single buoy without decoding the rest of the cache.
+
+        :param station: ID of the station
+        :param source: Name of the source containing the buoy [default is any source]. Use
+        an empty string for the buoys that were not saved with a source.
+        :return: Buoy, None when the station was not found
+        '''
+        buoys = self.get_buoys([station], source)
+        return buoys[0] if buoys else None
+
+    def get_buoys(self, stations, source=None):
+        '''Load buoys. See `get_buoy`.
+
+        :param stations: Iterable of station IDs
+        :param source: Name of the source containing the buoys [default is any source]
+        :return: list of Buoy objects, every buoy with a matching station is included
+        '''
+        return [
+            self._read_buoy(record_index)
+            for station in stations for key, record_index in self._find(station)
+            if source is None or key[1] == source
+        ]
+
+    def _read_records(self, first, count):
+        '''Read the records without decoding them'''
+        for record_index in range(first, first + count):
+            self._check_open()
+            offset, size = _RECORD.unpack_from(self._data, self._records_offset + record_index * _RECORD.size)
+            yield self._data[offset:offset + size]
+
+    def records(self):
+        '''Read the json record of every buoy without decoding the records.
+
+        :return: generator of (source name, source description, generator of record bytes).
+        The buoys that are not in a source are first, the source name is an empty string.
+        '''
+        first, count = self._buoys
+        yield "", None, self._read_records(first, count)
+        for name, (description, first, count) in self._sources.items():
+            yield name, description if description else None, self._read_records(first, count)
+
+    def get_source(self, name):
+        '''Load a source and the buoys in the source without decoding the rest of the cache.
+
+        :param name: Name of the source
+        :return: Source, None when the source was not found
+        '''
+        if name not in self._sources:
+            return None
+
+        description, first, count = self._sources[name]
+        source = Source(name, description if description else None)
+        source.add_buoys(self._read_buoy(index) for index in range(first, first + count))
+        return source
+
+    def load(self, cached_output=CacheData.ALL, lazy=True):
+        '''Load the cache in the same format as `nautical.cache.load`.
+
+        :param cached_output: CacheData enumeration type. What type of information to retrieve
+        :param lazy: When True the buoys and sources are lazy sequences, each object is
+        decoded when it is first accessed (the cache must be open). Otherwise lists of
+        the decoded objects are returned.
+        :return: Dictionary containing all cached output
+        '''
+        sequence = LazySequence if lazy else lambda decode, keys: [decode(key) for key in keys]
+
+        output = {}
+        for key in convert_to_keys(cached_output):
+            if key == CacheData.BUOYS.name:
+                first, count = self._buoys
+                output[key] = sequence(self._read_buoy, range(first, first + count))
+            elif key == CacheData.SOURCES.name:
+                output[key] = sequence(self.get_source, list(self._sources))
+            elif key == CacheData.TIME.name and self.time is not None:
+                output[key] = self.time
+        return output
@@ -0,0 +1,291 @@
+'''Append-only journal of buoy observations. New observations are appended to
+the journal as they arrive instead of saving the entire cache. The journal is
+folded into the cache (snapshot) by `ObservationJournal.compact`.
+
+Each record is a length prefixed, checksummed json payload. A record that was
+only partially written (ex. the process crashed) is detected by the length and
+checksum and removed when the journal is opened.
+'''
+from json import dumps as jdumps, loads as jloads
+from os import fsync, makedirs, remove, replace
+from os.path import abspath, dirname, exists, join
+from struct import Struct
+from threading import Lock, Thread
+from zlib import crc32
+from ..log import get_logger
+from ..location import Point
+from ..noaa.buoy import Buoy, BuoyData
+from .common import CacheData, NAUTICAL_CACHE_DIR, NAUTICAL_CACHE_FILE
+from .file import dumps, load
+
+
+log = get_logger()
+
+NAUTICAL_JOURNAL_FILE = join(NAUTICAL_CACHE_DIR, "nautical_cache.journal")
+
+# Number of appended records between calls to fsync
+DEFAULT_SYNC_EVERY = 64
+
+# Extension of the journal while it is folded into the cache
+_COMPACTING = ".compacting"
+
+# Each record starts with the size of the payload and the crc32 of the payload
+_HEADER = Struct(">II")
+
+
+def _read_records(filename):
+    '''Read the valid records of a journal file.
+
+    :param filename: Name of the journal file
+    :return: tuple of (list of record dictionaries, offset of the end of the last valid record)
+    '''
+    records = []
+    offset = 0
+    if not exists(filename):
+        return records, offset
+
+    with open(filename, "rb") as journal_file:
+        contents = journal_file.read()
+
+    while offset + _HEADER.size <= len(contents):
+        size, checksum = _HEADER.unpack_from(contents, offset)
+        start = offset + _HEADER.size
+        payload = contents[start:start + size]
+        if len(payload) < size or crc32(payload) != checksum:
+            break
+
+        try:
+            records.append(jloads(payload))
+        except ValueError:
+            break
+        offset = start + size
+
+    if offset < len(contents):
+        log.warning("Found %d bytes of incomplete records in %s", len(contents) - offset, filename)
+    return records, offset
+
+
+def _buoy_key(station, description):
+    '''Key used to match journal records with buoys (see `Buoy.__hash__`)'''
+    return str(station), description if description else None
+
+
+def apply_records(data, records):
+    '''Fold journal records into cache data. The present data of a buoy is only
+    replaced by newer data, so applying the same records twice has no effect.
+
+    :param data: Dictionary of cache data (see `nautical.cache.load`). Buoys that are not
+    found in the BUOYS or SOURCES are added to the BUOYS.
+    :param records: Iterable of record dictionaries (see `ObservationJournal.records`)
+    :return: Number of records that changed the data
+    '''
+    buoys = {}
+    for source in data.get(CacheData.SOURCES.name, []):
+        for buoy in source:
+            buoys.setdefault(_buoy_key(buoy.station, buoy.description), []).append(buoy)
+    # the loaded buoys may be a read-only (lazy) sequence
+    data[CacheData.BUOYS.name] = list(data.get(CacheData.BUOYS.name, []))
+    for buoy in data[CacheData.BUOYS.name]:
+        buoys.setdefault(_buoy_key(buoy.station, buoy.description), []).append(buoy)
+
+    num_applied = 0
+    for record in records:
+        key = _buoy_key(record["station"], record.get("description"))
+        if key not in buoys:
+            buoy = Buoy(*key)
+            buoy.valid = True
+            data[CacheData.BUOYS.name].append(buoy)
+            buoys[key] = [buoy]
+
+        buoy_data = BuoyData.from_json(record["data"])
+        location = Point.from_json(record["location"]) if record.get("location") else None
+
+        applied = False
+        for buoy in buoys[key]:
+            if buoy.present is None or buoy_data.epoch_time > buoy.present.epoch_time:
+                buoy.present = buoy_data
+                if location is not None:
+                    buoy.location = location
+                applied = True
+        num_applied += int(applied)
+
+    return num_applied
+
+
+class ObservationJournal:
+
+    '''Append-only journal of observations (BuoyData). Appending writes a single
+    record to the end of the journal, the cost does not depend on the size of the
+    cache. Records are flushed to the disk (fsync) in batches of `sync_every`
+    records, call `sync` to flush the records immediately.
+    '''
+
+    def __init__(self, filename: str = NAUTICAL_JOURNAL_FILE, sync_every: int = DEFAULT_SYNC_EVERY) -> None:
+        '''
+        :param filename: Name of the journal file
+        :param sync_every: Number of records appended between calls to fsync
+        '''
+        self.filename = filename
+        self.sync_every = max(int(sync_every), 1)
+        self._lock = Lock()
+        self._compact_lock = Lock()
+        self._unsynced = 0
+
+        makedirs(dirname(abspath(filename)), exist_ok=True)
+
+        # remove the incomplete record (if any) left by a crash during an append
+        _, offset = _read_records(filename)
+        self._journal_file = open(filename, "ab")
+        if self._journal_file.tell() > offset:
+            self._journal_file.truncate(offset)
+            self._journal_file.seek(offset)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        '''Flush the remaining records and close the journal'''
+        with self._lock:
+            if self._journal_file is not None:
+                self._sync()
+                self._journal_file.close()
+                self._journal_file = None
+
+    def _check_open(self):
+        '''Raise ValueError when the journal is closed, the lock must be held'''
+        if self._journal_file is None:
+            raise ValueError(f"{self.filename} is closed")
+
+    def _sync(self):
+        '''Flush the records to the disk, the lock must be held'''
+        self._journal_file.flush()
+        fsync(self._journal_file.fileno())
+        self._unsynced = 0
+
+    def sync(self):
+        '''Flush all appended records to the disk
+
+        :raises ValueError: when the journal is closed
+        '''
+        with self._lock:
+            self._check_open()
+            self._sync()
+
+    def append(self, station, buoy_data, description=None, location=None):
+        '''Append an observation to the journal.
+
+        :param station: ID of the station
+        :param buoy_data: BuoyData of the observation
+        :param description: Description of the buoy, used to separate buoys that share a station (ships)
+        :param location: `Point` where the observation was made [optional]
+        :raises TypeError: when the buoy_data is not BuoyData
+        :raises ValueError: when the journal is closed
+        '''
+        if not isinstance(buoy_data, BuoyData):
+            raise TypeError(f"{self.__class__.__name__} requires BuoyData")
+
+        record = {"station": str(station), "data": buoy_data.to_json()}
+        if description:
+            record["description"] = description
+        if isinstance(location, Point):
+            record["location"] = location.to_json()
+
+        payload = jdumps(record, separators=(",", ":")).encode("utf-8")
+        with self._lock:
+            self._check_open()
+            self._journal_file.write(_HEADER.pack(len(payload), crc32(payload)) + payload)
+            self._unsynced += 1
+            if self._unsynced >= self.sync_every:
+                self._sync()
+
+    def append_buoy(self, buoy):
+        '''Append the present data of the buoy to the journal. See `append`.
+
+        :param buoy: Buoy
+        :return: True when the buoy contained present data
+        '''
+        if buoy.present is None:
+            return False
+        self.append(buoy.station, buoy.present, buoy.description, buoy.location)
+        return True
+
+    def records(self):
+        '''Read all records, including the records that are being compacted.
+
+        :return: list of record dictionaries from oldest to newest
+        :raises ValueError: when the journal is closed
+        '''
+        with self._lock:
+            self._check_open()
+            self._journal_file.flush()
+            compacting, _ = _read_records(self.filename + _COMPACTING)
+            records, _ = _read_records(self.filename)
+        return compacting + records
+
+    def __len__(self):
+        '''Number of records in the journal'''
+        return len(self.records())
+
+    def load(self, snapshot_filename=NAUTICAL_CACHE_FILE):
+        '''Load the cache and replay the journal (crash recovery).
+
+        :param snapshot_filename: Name of the cache file (see `nautical.cache.load`)
+        :return: Dictionary containing the cached BUOYS, SOURCES and TIME
+        '''
+        data = load(snapshot_filename)
+        apply_records(data, self.records())
+        return data
+
+    def _rotate(self):
+        '''Move the records to the compacting file so that new records can be
+        appended while the records are compacted.
+
+        :return: True when there are records to compact
+        '''
+        with self._lock:
+            self._check_open()
+            if exists(self.filename + _COMPACTING):
+                # a previous compaction did not finish, compact those records first
+                return True
+            if self._journal_file.tell() == 0:
+                return False
+
+            self._sync()
+            self._journal_file.close()
+            replace(self.filename, self.filename + _COMPACTING)
+            self._journal_file = open(self.filename, "ab")
+            return True
+
+    def compact(self, snapshot_filename=NAUTICAL_CACHE_FILE, background=False):
+        '''Fold the journal into the cache. The records are removed from the journal
+        once the cache is saved, records appended during the compaction are kept.
+
+        :param snapshot_filename: Name of the cache file (see `nautical.cache.dumps`)
+        :param background: When True the compaction runs in a separate thread
+        :return: Thread running the compaction when `background` is True, otherwise
+        the number of records that were compacted
+        '''
+        if background:
+            thread = Thread(target=self.compact, args=(snapshot_filename,), daemon=True)
+            thread.start()
+            return thread
+
+        with self._compact_lock:
+            if not self._rotate():
+                return 0
+
+            compacting = self.filename + _COMPACTING
+            records, _ = _read_records(compacting)
+
+            data = load(snapshot_filename)
+            apply_records(data, records)
+            dumps({key: value for key, value in data.items() if key != CacheData.TIME.name},
+                  snapshot_filename)
+
+            remove(compacting)
+
+        log.debug("Compacted %d records into %s", len(records), snapshot_filename)
+        return len(records)
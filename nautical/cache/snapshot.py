@@ -0,0 +1,654 @@
+'''Snapshots of the nautical cache. The buoys are saved in content addressed
+blocks (the name of a block is the sha256 of its contents), so a block of
+buoys that did not change since a previous snapshot is not saved again. Each
+snapshot is a small manifest containing the names of its blocks.
+
+The buoys are split into blocks where the hash of a buoy matches a pattern
+(content defined chunking), so adding or removing a buoy only changes the
+block that contains it. Buoys are tracked by identity between snapshots (the
+present data and location of a buoy are immutable), so the buoys and blocks
+that did not change are neither encoded, hashed nor written again.
+
+Layout of the snapshot directory::
+
+    blocks/ab/abcdef...    compressed json list of buoys
+    manifests/<name>.json  blocks of each snapshot
+'''
+import gzip
+import lzma
+import re
+from datetime import datetime, timedelta, timezone
+from hashlib import sha256
+from json import JSONDecodeError, JSONDecoder, dumps as jdumps, loads as jloads
+from os import listdir, makedirs, remove, rmdir
+from os.path import exists, join
+from threading import Lock
+from zlib import crc32
+from ..log import get_logger
+from ..noaa.buoy import Buoy, Source
+from .binary import is_binary_file
+from .common import CacheData, NAUTICAL_CACHE_DIR, NAUTICAL_CACHE_FILE, atomic_open, convert_to_keys
+from .file import dumps, load
+from .indexed import IndexedCache, is_indexed_file
+from .sqlite import is_sqlite_file
+
+
+log = get_logger()
+
+NAUTICAL_SNAPSHOT_DIR = join(NAUTICAL_CACHE_DIR, "snapshots")
+
+# Average number of buoys in a block
+DEFAULT_BLOCK_SIZE = 16
+
+# Number of characters read from a json cache at once
+DEFAULT_CHUNK_SIZE = 1 << 16
+
+_BLOCKS = "blocks"
+_MANIFESTS = "manifests"
+_NAME_FORMAT = "%Y-%m-%d_%H-%M-%S"
+
+# Compression of the blocks, the compression of a saved block is found from its magic
+_COMPRESSORS = {
+    None: lambda payload: payload,
+    "gzip": gzip.compress,
+    "lzma": lzma.compress,
+}
+_GZIP_MAGIC = b"\x1f\x8b"
+_LZMA_MAGIC = b"\xfd7zXZ\x00"
+
+
+def _decompress(contents):
+    '''Decompress a block with the compression that was used to save it'''
+    if contents.startswith(_GZIP_MAGIC):
+        return gzip.decompress(contents)
+    if contents.startswith(_LZMA_MAGIC):
+        return lzma.decompress(contents)
+    return contents
+
+
+_WHITESPACE = re.compile(r"\s*")
+# Characters that may continue a number
+_NUMBER = re.compile(r"[0-9eE.+\-]*")
+
+
+def _encode_buoy(buoy):
+    '''Encode a buoy as a json record'''
+    return jdumps(buoy.to_json(), separators=(",", ":"), sort_keys=True).encode("utf-8")
+
+
+class _JSONReader:
+
+    '''Read the values of a json document in chunks, the document is never
+    completely in memory. Objects and arrays are read one member at a time.
+    '''
+
+    def __init__(self, json_file, chunk_size=DEFAULT_CHUNK_SIZE):
+        self._file = json_file
+        self._chunk_size = chunk_size
+        self._buffer = ""
+        self._offset = 0
+        self._decoder = JSONDecoder()
+
+    def _read_chunk(self):
+        '''Add a chunk to the buffer, the characters that were read are dropped.
+
+        :return: False at the end of the file
+        '''
+        chunk = self._file.read(self._chunk_size)
+        self._buffer = self._buffer[self._offset:] + chunk
+        self._offset = 0
+        return bool(chunk)
+
+    def peek(self):
+        '''Skip the whitespace and get the next character.
+
+        :raises ValueError: at the end of the file
+        '''
+        while True:
+            self._offset = _WHITESPACE.match(self._buffer, self._offset).end()
+            if self._offset < len(self._buffer):
+                return self._buffer[self._offset]
+            if not self._read_chunk():
+                raise ValueError("Unexpected end of the json cache")
+
+    def accept(self, character):
+        '''Read the next character when it matches.
+
+        :return: True when the character was read
+        '''
+        if self.peek() != character:
+            return False
+        self._offset += 1
+        return True
+
+    def expect(self, character):
+        '''Read the next character.
+
+        :raises ValueError: when the next character does not match
+        '''
+        if not self.accept(character):
+            raise ValueError(f"Expected {character} in the json cache")
+
+    def value(self):
+        '''Decode the next value.
+
+        :return: tuple of (value, json text of the value)
+        '''
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._offset)
+            except JSONDecodeError:
+                if not self._read_chunk():
+                    raise
+                continue
+            # a number at the end of the buffer may continue in the next chunk
+            if _NUMBER.match(self._buffer, end).end() == len(self._buffer) and self._read_chunk():
+                continue
+            text = self._buffer[self._offset:end]
+            self._offset = end
+            return value, text
+
+    def members(self):
+        '''Iterate over the keys of an object, the caller reads the value of each key'''
+        self.expect("{")
+        if self.accept("}"):
+            return
+        while True:
+            key, _ = self.value()
+            self.expect(":")
+            yield key
+            if self.accept("}"):
+                return
+            self.expect(",")
+
+    def elements(self):
+        '''Iterate over the elements of an array, the caller reads each element'''
+        self.expect("[")
+        if self.accept("]"):
+            return
+        while True:
+            yield
+            if self.accept("]"):
+                return
+            self.expect(",")
+
+    def records(self):
+        '''Iterate over the json text (bytes) of the elements of an array'''
+        for _ in self.elements():
+            yield self.value()[1].encode("utf-8")
+
+
+def _stream_json_cache(filename, header):
+    '''Read the buoy records of a json cache (see `nautical.cache.dumps`) without
+    loading the cache.
+
+    :param filename: Name of the json cache
+    :param header: Dictionary where the TIME of the cache is saved
+    :return: generator of groups, see `SnapshotStore._save_groups`
+    '''
+    with open(filename, "r", encoding="utf-8") as cache_file:
+        reader = _JSONReader(cache_file)
+        for key in reader.members():
+            if key == CacheData.BUOYS.name:
+                yield None, reader.records()
+            elif key == CacheData.SOURCES.name:
+                for _ in reader.elements():
+                    source = {"name": "", "description": ""}
+                    found_buoys = False
+                    for source_key in reader.members():
+                        if source_key == "buoys":
+                            found_buoys = True
+                            yield source, reader.records()
+                        else:
+                            value, _ = reader.value()
+                            if source_key in source:
+                                source[source_key] = value if value else ""
+                    if not found_buoys:
+                        yield source, ()
+            else:
+                value, _ = reader.value()
+                if key == CacheData.TIME.name:
+                    header[key] = value
+
+
+def _stream_indexed_cache(filename, header):
+    '''Read the buoy records of an indexed cache without decoding the records.
+    See `_stream_json_cache`.
+    '''
+    with IndexedCache(filename) as cache:
+        header[CacheData.TIME.name] = cache.time
+        for name, description, records in cache.records():
+            source = {"name": name, "description": description if description else ""} if name else None
+            yield source, records
+
+
+class RetentionPolicy:
+
+    '''Select the snapshots to keep. Each rule is a pair of (interval, duration):
+    one snapshot (the newest) is kept for every interval, for the snapshots that
+    are newer than the duration. For example, keep hourly snapshots for 2 days
+    and daily snapshots for 30 days::
+
+        RetentionPolicy(
+            (timedelta(hours=1), timedelta(days=2)),
+            (timedelta(days=1), timedelta(days=30))
+        )
+    '''
+
+    def __init__(self, *rules, keep_last: int = 1) -> None:
+        '''
+        :param rules: Pairs of `timedelta` (interval, duration)
+        :param keep_last: Number of the newest snapshots that are always kept
+        :raises ValueError: when an interval is not positive
+        '''
+        self.rules = [(interval, duration) for interval, duration in rules]
+        self.keep_last = max(int(keep_last), 0)
+
+        for interval, _ in self.rules:
+            if interval <= timedelta(0):
+                raise ValueError(f"{self.__class__.__name__} requires positive intervals")
+
+    def select(self, snapshots, now=None):
+        '''Select the snapshots to keep.
+
+        :param snapshots: Iterable of (name, `datetime` when the snapshot was created)
+        :param now: `datetime` used to find the age of the snapshots [default is the current time]
+        :return: Set of the names of the snapshots to keep
+        '''
+        now = now or datetime.now(timezone.utc)
+        newest_first = sorted(snapshots, key=lambda snapshot: snapshot[1], reverse=True)
+
+        keep = {name for name, _ in newest_first[:self.keep_last]}
+        for interval, duration in self.rules:
+            intervals = set()
+            for name, created in newest_first:
+                if now - created > duration:
+                    break
+                bucket = int(created.timestamp() // interval.total_seconds())
+                if bucket not in intervals:
+                    intervals.add(bucket)
+                    keep.add(name)
+        return keep
+
+
+# Keep hourly snapshots for 2 days and daily snapshots for 30 days
+DEFAULT_RETENTION = RetentionPolicy(
+    (timedelta(hours=1), timedelta(days=2)),
+    (timedelta(days=1), timedelta(days=30))
+)
+
+
+class SnapshotStore:
+
+    '''Deduplicated and compressed snapshots of the nautical cache. Blocks are
+    written one at a time, the snapshot is not copied in memory.
+
+    The store remembers the buoys of the previous snapshot (not their records), a buoy
+    is encoded again when its station, description, valid flag, location or present data
+    is replaced. Saving, pruning and removing snapshots is synchronized between the threads
+    that use the same store. Only one process should modify a snapshot directory.
+    '''
+
+    def __init__(self, directory: str = NAUTICAL_SNAPSHOT_DIR, compression: str = "gzip",
+                 block_size: int = DEFAULT_BLOCK_SIZE) -> None:
+        '''
+        :param directory: Directory where the blocks and manifests are saved
+        :param compression: Compression of new blocks: "gzip", "lzma" or None
+        :param block_size: Average number of buoys in a block. Smaller blocks are
+        shared more often between snapshots but create more files.
+        :raises ValueError: when the compression is not supported
+        '''
+        if compression not in _COMPRESSORS:
+            raise ValueError(f"{self.__class__.__name__} does not support {compression} compression")
+
+        self.directory = directory
+        self.compression = compression
+        self.block_size = max(int(block_size), 1)
+        self._lock = Lock()
+
+        # names of the blocks that are known to be saved
+        self._saved_blocks = set()
+        # buoys of the previous snapshot mapped to (block boundary, location, present data)
+        # and the blocks of the previous snapshot by the buoys in the block (see `_save_buoys`)
+        self._boundaries = {}
+        self._blocks = {}
+        self._next_boundaries = {}
+        self._next_blocks = {}
+
+        makedirs(join(directory, _BLOCKS), exist_ok=True)
+        makedirs(join(directory, _MANIFESTS), exist_ok=True)
+
+    def _block_filename(self, block):
+        return join(self.directory, _BLOCKS, block[:2], block)
+
+    def _manifest_filename(self, name):
+        return join(self.directory, _MANIFESTS, name + ".json")
+
+    def _save_block(self, records):
+        '''Save a block of json records when the block does not exist.
+
+        :return: tuple of (name of the block, number of bytes written)
+        '''
+        payload = b"[" + b",".join(records) + b"]"
+        block = sha256(payload).hexdigest()
+        written = 0
+        if block not in self._saved_blocks:
+            filename = self._block_filename(block)
+            if not exists(filename):
+                makedirs(join(self.directory, _BLOCKS, block[:2]), exist_ok=True)
+                contents = _COMPRESSORS[self.compression](payload)
+                with atomic_open(filename) as block_file:
+                    block_file.write(contents)
+                written = len(contents)
+            self._saved_blocks.add(block)
+        return block, written
+
+    def _save_records(self, records):
+        '''Split json records into blocks and save the blocks that do not exist.
+
+        :param records: Iterable of json records (bytes) of buoys
+        :return: tuple of (list of block names, number of bytes written)
+        '''
+        blocks = []
+        written = 0
+        pending = []
+        for record in records:
+            pending.append(record)
+            # the boundary only depends on the record, so the same records create the same blocks
+            if crc32(record) % self.block_size == 0:
+                block, size = self._save_block(pending)
+                blocks.append(block)
+                written += size
+                pending = []
+        if pending:
+            block, size = self._save_block(pending)
+            blocks.append(block)
+            written += size
+        return blocks, written
+
+    def _save_buoy_block(self, keys, pending):
+        '''Save a block of buoys, see `_save_buoys`.
+
+        :return: tuple of (name of the block, number of bytes written)
+        '''
+        keys = tuple(keys)
+        block = self._blocks.get(keys)
+        written = 0
+        if block is None or block not in self._saved_blocks:
+            block, written = self._save_block(
+                [_encode_buoy(buoy) if record is None else record for buoy, record in pending]
+            )
+        self._next_blocks[keys] = block
+        return block, written
+
+    def _save_buoys(self, buoys):
+        '''Split the buoys into blocks and save the blocks that do not exist. A buoy is
+        only encoded when it changed since the previous snapshot, or when it shares a
+        block with a buoy that changed. The blocks of buoys that did not change are reused
+        without encoding or hashing the buoys.
+
+        :param buoys: Iterable of Buoy objects
+        :return: tuple of (list of block names, number of bytes written)
+        '''
+        blocks = []
+        written = 0
+        keys = []
+        pending = []
+        for buoy in buoys:
+            location, present = buoy.location, buoy.present
+            key = (buoy.station, buoy.description, buoy.valid, id(location), id(present))
+            known = self._boundaries.get(key)
+            if known is None:
+                record = _encode_buoy(buoy)
+                boundary = crc32(record) % self.block_size == 0
+            else:
+                record = None
+                boundary = known[0]
+            # the location and present data are kept so that their ids are not reused
+            self._next_boundaries[key] = (boundary, location, present)
+
+            keys.append(key)
+            pending.append((buoy, record))
+            if boundary:
+                block, size = self._save_buoy_block(keys, pending)
+                blocks.append(block)
+                written += size
+                keys = []
+                pending = []
+        if pending:
+            block, size = self._save_buoy_block(keys, pending)
+            blocks.append(block)
+            written += size
+        return blocks, written
+
+    def _save_groups(self, groups):
+        '''Save the blocks of the groups of buoys.
+
+        :param groups: Iterable of (source, records) where the source is None for the buoys
+        that are not in a source, otherwise a dictionary containing the name and description
+        of the source. The source dictionary may be completed after the records are read.
+        :return: tuple of (block names of the buoys, list of (source, block names), number of
+        bytes written)
+        '''
+        buoys = []
+        sources = []
+        written = 0
+        for source, records in groups:
+            blocks, size = self._save_records(records)
+            written += size
+            if source is None:
+                buoys.extend(blocks)
+            else:
+                sources.append((source, blocks))
+        return buoys, sources, written
+
+    def _save_manifest(self, timestamp, time, buoys, sources):
+        '''Save the manifest of a snapshot.
+
+        :return: Name of the snapshot
+        '''
+        name = timestamp.astimezone(timezone.utc).strftime(_NAME_FORMAT)
+        suffix = 0
+        while exists(self._manifest_filename(name if not suffix else f"{name}_{suffix}")):
+            suffix += 1
+        name = name if not suffix else f"{name}_{suffix}"
+
+        manifest = {
+            CacheData.TIME.name: time,
+            "CREATED": timestamp.timestamp(),
+            CacheData.BUOYS.name: buoys,
+            CacheData.SOURCES.name: [
+                {"name": source["name"], "description": source["description"], "blocks": blocks}
+                for source, blocks in sources
+            ]
+        }
+        with atomic_open(self._manifest_filename(name)) as manifest_file:
+            manifest_file.write(jdumps(manifest).encode("utf-8"))
+        return name
+
+    def snapshot(self, data=None, filename=NAUTICAL_CACHE_FILE, timestamp=None):
+        '''Save a snapshot of the cache. Only the blocks that changed since the previous
+        snapshots are saved.
+
+        When the data is provided, the buoys that did not change since the previous snapshot
+        (the same objects, see `SnapshotStore`) are not encoded again, so the time to save the
+        snapshot depends on the number of buoys that changed. Otherwise the records of the
+        cache file are read in chunks: the json and indexed caches are not loaded or decoded,
+        the SQLite and binary caches are loaded.
+
+        :param data: Dictionary containing buoys and sources (see `nautical.cache.load`)
+        [default is the contents of the cache file]
+        :param filename: Name of the cache file, used when the data is not provided
+        :param timestamp: `datetime` of the snapshot [default is the current time]
+        :return: Name of the snapshot, None when there is no data to save
+        '''
+        if data is None:
+            if not exists(filename):
+                return None
+            if is_sqlite_file(filename) or is_binary_file(filename):
+                data = load(filename)
+        if data is not None and not isinstance(data, dict):
+            raise TypeError("snapshot requires data to be a dictionary")
+
+        timestamp = timestamp or datetime.now(timezone.utc)
+        if timestamp.tzinfo is None:
+            timestamp = timestamp.replace(tzinfo=timezone.utc)
+
+        with self._lock:
+            if data is None:
+                header = {}
+                stream = _stream_indexed_cache if is_indexed_file(filename) else _stream_json_cache
+                buoys, sources, written = self._save_groups(stream(filename, header))
+                time = header.get(CacheData.TIME.name)
+            else:
+                self._next_boundaries = {}
+                self._next_blocks = {}
+                buoys, written = self._save_buoys(data.get(CacheData.BUOYS.name, []))
+
+                sources = []
+                for source in data.get(CacheData.SOURCES.name, []):
+                    blocks, size = self._save_buoys(source)
+                    written += size
+                    sources.append((
+                        {"name": source.name, "description": source.description if source.description else ""},
+                        blocks
+                    ))
+                time = data.get(CacheData.TIME.name)
+
+                # only the buoys of this snapshot are remembered
+                self._boundaries, self._next_boundaries = self._next_boundaries, {}
+                self._blocks, self._next_blocks = self._next_blocks, {}
+
+            name = self._save_manifest(timestamp, time, buoys, sources)
+
+        log.debug("Saved snapshot %s, %d bytes of new blocks", name, written)
+        return name
+
+    def _read_manifest(self, name):
+        '''Read the manifest of a snapshot.
+
+        :raises KeyError: when the snapshot does not exist
+        '''
+        filename = self._manifest_filename(name)
+        if not exists(filename):
+            raise KeyError(f"Snapshot {name} does not exist")
+        with open(filename, "rb") as manifest_file:
+            return jloads(manifest_file.read())
+
+    def _read_buoys(self, blocks):
+        '''Read the buoys of the blocks, one block at a time'''
+        for block in blocks:
+            with open(self._block_filename(block), "rb") as block_file:
+                payload = _decompress(block_file.read())
+            for buoy_data in jloads(payload):
+                yield Buoy.from_json(buoy_data)
+
+    @property
+    def snapshots(self):
+        '''Names of the snapshots from oldest to newest'''
+        names = [
+            filename[:-len(".json")] for filename in listdir(join(self.directory, _MANIFESTS))
+            if filename.endswith(".json")
+        ]
+        return sorted(names, key=lambda name: self._read_manifest(name)["CREATED"])
+
+    def created(self, name):
+        '''Get the time that a snapshot was created.
+
+        :param name: Name of the snapshot
+        :return: `datetime` in UTC
+        '''
+        return datetime.fromtimestamp(self._read_manifest(name)["CREATED"], timezone.utc)
+
+    def load(self, name, cached_output=CacheData.ALL):
+        '''Load a snapshot in the same format as `nautical.cache.load`.
+
+        :param name: Name of the snapshot
+        :param cached_output: CacheData enumeration type. What type of information to retrieve
+        :return: Dictionary containing all cached output
+        :raises KeyError: when the snapshot does not exist
+        '''
+        manifest = self._read_manifest(name)
+
+        output = {}
+        for key in convert_to_keys(cached_output):
+            if key == CacheData.BUOYS.name:
+                output[key] = list(self._read_buoys(manifest[key]))
+            elif key == CacheData.SOURCES.name:
+                output[key] = []
+                for source_data in manifest[key]:
+                    source = Source(source_data["name"], source_data["description"] or None)
+                    source.add_buoys(self._read_buoys(source_data["blocks"]))
+                    output[key].append(source)
+            elif key == CacheData.TIME.name and manifest.get(key) is not None:
+                output[key] = manifest[key]
+        return output
+
+    # pylint: disable=redefined-builtin
+    def restore(self, name, filename=NAUTICAL_CACHE_FILE, format=None):
+        '''Save a snapshot as the cache. See `nautical.cache.dumps`.
+
+        :param name: Name of the snapshot
+        :param filename: Name of the cache file
+        :param format: CacheFormat of the file
+        :raises KeyError: when the snapshot does not exist
+        '''
+        dumps(self.load(name), filename, format)
+
+    def _collect_garbage(self):
+        '''Remove the blocks that are not used by any snapshot, the lock must be held.
+
+        :return: Number of blocks removed
+        '''
+        used = set()
+        for filename in listdir(join(self.directory, _MANIFESTS)):
+            if filename.endswith(".json"):
+                manifest = self._read_manifest(filename[:-len(".json")])
+                used.update(manifest[CacheData.BUOYS.name])
+                for source_data in manifest[CacheData.SOURCES.name]:
+                    used.update(source_data["blocks"])
+
+        removed = 0
+        blocks_dir = join(self.directory, _BLOCKS)
+        for prefix in listdir(blocks_dir):
+            for block in listdir(join(blocks_dir, prefix)):
+                if block not in used:
+                    remove(join(blocks_dir, prefix, block))
+                    self._saved_blocks.discard(block)
+                    removed += 1
+            if not listdir(join(blocks_dir, prefix)):
+                rmdir(join(blocks_dir, prefix))
+        return removed
+
+    def remove(self, name):
+        '''Remove a snapshot and the blocks that are only used by the snapshot.
+
+        :param name: Name of the snapshot
+        :raises KeyError: when the snapshot does not exist
+        '''
+        with self._lock:
+            self._read_manifest(name)
+            remove(self._manifest_filename(name))
+            self._collect_garbage()
+
+    def prune(self, policy=DEFAULT_RETENTION, now=None):
+        '''Remove the snapshots that are not kept by the retention policy along
+        with the blocks that are no longer used.
+
+        :param policy: RetentionPolicy
+        :param now: `datetime` used to find the age of the snapshots [default is the current time]
+        :return: List of the names of the removed snapshots
+        '''
+        with self._lock:
+            snapshots = [(name, self.created(name)) for name in self.snapshots]
+            keep = policy.select(snapshots, now)
+
+            removed = [name for name, _ in snapshots if name not in keep]
+            for name in removed:
+                remove(self._manifest_filename(name))
+            if removed:
+                self._collect_garbage()
+
+        log.debug("Pruned %d snapshots", len(removed))
+        return removed
@@ -0,0 +1,377 @@
+'''SQLite backend for the nautical cache. Buoys, sources and observations are
+stored in tables so that a single buoy can be saved (upserted) or loaded
+without reading and writing the entire cache. The database uses write-ahead
+logging (WAL) so that readers are not blocked while the cache is written.
+'''
+import sqlite3
+from json import dumps as jdumps, loads as jloads
+from os import makedirs
+from os.path import abspath, dirname, join, exists
+from ..log import get_logger
+from ..noaa.buoy import Buoy, BuoyData, Source
+from ..time import get_current_time, get_time_str
+from .common import CacheData, NAUTICAL_CACHE_DIR, convert_to_keys
+
+
+log = get_logger()
+
+NAUTICAL_SQLITE_FILE = join(NAUTICAL_CACHE_DIR, "nautical_cache.db")
+
+# Extensions of the files that are written with the SQLite backend
+SQLITE_EXTENSIONS = (".db", ".sqlite", ".sqlite3")
+
+# Every SQLite database begins with this header
+_SQLITE_HEADER = b"SQLite format 3\x00"
+
+# Buoys that are not part of a source are stored with an empty source name
+_NO_SOURCE = ""
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS sources (
+    name TEXT PRIMARY KEY,
+    description TEXT NOT NULL DEFAULT ''
+);
+CREATE TABLE IF NOT EXISTS buoys (
+    source TEXT NOT NULL,
+    station TEXT NOT NULL,
+    description TEXT NOT NULL DEFAULT '',
+    valid INTEGER NOT NULL DEFAULT 0,
+    latitude REAL,
+    longitude REAL,
+    altitude REAL,
+    epoch_time INTEGER,
+    data TEXT,
+    PRIMARY KEY (source, station, description)
+);
+CREATE INDEX IF NOT EXISTS buoys_station ON buoys (station);
+CREATE TABLE IF NOT EXISTS observations (
+    station TEXT NOT NULL,
+    description TEXT NOT NULL DEFAULT '',
+    epoch_time INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (station, epoch_time, description)
+) WITHOUT ROWID;
+'''
+
+_UPSERT_SOURCE = '''
+INSERT INTO sources (name, description) VALUES (?, ?)
+ON CONFLICT (name) DO UPDATE SET description = excluded.description
+'''
+
+_UPSERT_BUOY = '''
+INSERT INTO buoys (source, station, description, valid, latitude, longitude, altitude, epoch_time, data)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (source, station, description) DO UPDATE SET
+    valid = excluded.valid,
+    latitude = excluded.latitude,
+    longitude = excluded.longitude,
+    altitude = excluded.altitude,
+    epoch_time = excluded.epoch_time,
+    data = excluded.data
+'''
+
+_UPSERT_OBSERVATION = '''
+INSERT INTO observations (station, description, epoch_time, data) VALUES (?, ?, ?, ?)
+ON CONFLICT (station, epoch_time, description) DO UPDATE SET data = excluded.data
+'''
+
+_SELECT_BUOYS = '''
+SELECT station, description, valid, latitude, longitude, altitude, data FROM buoys
+'''
+
+
+def is_sqlite_file(filename):
+    '''Determine if the file is a SQLite database.
+
+    :param filename: Name of the file
+    :return: True when the file exists and contains a SQLite database
+    '''
+    if not exists(filename):
+        return False
+
+    with open(filename, "rb") as db_file:
+        return db_file.read(len(_SQLITE_HEADER)) == _SQLITE_HEADER
+
+
+def _buoy_values(source_name, buoy):
+    '''Get the values of the buoy table row for the buoy'''
+    location = buoy.location
+    present = buoy.present
+    return (
+        source_name,
+        str(buoy.station),
+        buoy.description if buoy.description else "",
+        int(bool(buoy.valid)),
+        location.latitude if location else None,
+        location.longitude if location else None,
+        location.altitude if location else None,
+        present.epoch_time if present else None,
+        jdumps(present.to_json()) if present else None
+    )
+
+
+def _buoy_from_row(row):
+    '''Create a Buoy from a buoy table row'''
+    station, description, valid, latitude, longitude, altitude, data = row
+    buoy_json = {"station": station, "description": description, "valid": bool(valid)}
+    if latitude is not None and longitude is not None:
+        buoy_json["location"] = {"latitude": latitude, "longitude": longitude, "altitude": altitude}
+    if data:
+        buoy_json["data"] = jloads(data)
+    return Buoy.from_json(buoy_json)
+
+
+class SQLiteCache:
+
+    '''Nautical cache stored in a SQLite database. Buoys are upserted (inserted or
+    updated) one row at a time, so saving a refreshed buoy does not rewrite the cache.
+    The present data of each saved buoy is also kept in an observations table that
+    is indexed by station and time.
+
+    Each instance has its own connection to the database. Use one instance per
+    thread or process; in WAL mode, readers can load data while another
+    instance writes.
+    '''
+
+    def __init__(self, filename: str = NAUTICAL_SQLITE_FILE, timeout: float = 30.0) -> None:
+        '''
+        :param filename: Name of the database file, the file is created when it does not exist
+        :param timeout: Number of seconds to wait for another writer to release the database
+        '''
+        self.filename = filename
+        makedirs(dirname(abspath(filename)), exist_ok=True)
+
+        self._connection = sqlite3.connect(filename, timeout=timeout)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        with self._connection:
+            self._connection.executescript(_SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        '''Close the connection to the database'''
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def _set_time(self):
+        '''Set the time that the cache was last written (see `load`)'''
+        self._connection.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+            (CacheData.TIME.name, get_time_str(get_current_time()))
+        )
+
+    def _write_buoys(self, source_name, buoys):
+        '''Upsert the buoys and add the present data of each buoy to the observations'''
+        rows = [_buoy_values(source_name, buoy) for buoy in buoys]
+        self._connection.executemany(_UPSERT_BUOY, rows)
+        self._connection.executemany(
+            _UPSERT_OBSERVATION,
+            [(row[1], row[2], row[7], row[8]) for row in rows if row[8] is not None]
+        )
+
+    def _write_source(self, source):
+        '''Upsert the source and the buoys in the source'''
+        self._connection.execute(
+            _UPSERT_SOURCE, (source.name, source.description if source.description else "")
+        )
+        self._write_buoys(source.name, source)
+
+    def upsert_buoy(self, buoy, source=None):
+        '''Insert or update a single buoy. See `upsert_buoys` for more information.'''
+        self.upsert_buoys([buoy], source)
+
+    def upsert_buoys(self, buoys, source=None):
+        '''Insert or update buoys. Buoys are identified by their station and
+        description (see `Buoy.__hash__`), along with the source that they belong to.
+
+        :param buoys: Iterable of Buoy objects
+        :param source: Name of the source (or `Source`) containing the buoys. When None
+        the buoys are stored as `CacheData.BUOYS`.
+        '''
+        with self._connection:
+            if isinstance(source, Source):
+                self._connection.execute(
+                    _UPSERT_SOURCE, (source.name, source.description if source.description else "")
+                )
+                source = source.name
+            elif source:
+                self._connection.execute("INSERT OR IGNORE INTO sources (name) VALUES (?)", (source,))
+
+            self._write_buoys(source if source else _NO_SOURCE, buoys)
+            self._set_time()
+
+    def upsert_source(self, source):
+        '''Insert or update a source and all buoys in the source. Buoys that were
+        previously saved with the source and are no longer in the source are kept.
+
+        :param source: Source object
+        '''
+        self.upsert_sources([source])
+
+    def upsert_sources(self, sources):
+        '''Insert or update many sources in a single transaction. See `upsert_source`.
+
+        :param sources: Iterable of Source objects
+        '''
+        with self._connection:
+            for source in sources:
+                self._write_source(source)
+            self._set_time()
+
+    def add_observations(self, station, observations, description=None):
+        '''Add observations of a station without changing the saved buoy.
+
+        :param station: ID of the station
+        :param observations: Iterable of BuoyData
+        :param description: Description of the buoy, used to separate buoys that share a station (ships)
+        '''
+        description = description if description else ""
+        with self._connection:
+            self._connection.executemany(_UPSERT_OBSERVATION, [
+                (str(station), description, data.epoch_time, jdumps(data.to_json()))
+                for data in observations
+            ])
+
+    def remove_source(self, name):
+        '''Remove a source and the buoys saved with the source.
+
+        :param name: Name of the source
+        :return: True when the source was removed
+        '''
+        with self._connection:
+            self._connection.execute("DELETE FROM buoys WHERE source = ?", (name,))
+            removed = self._connection.execute("DELETE FROM sources WHERE name = ?", (name,))
+            return removed.rowcount > 0
+
+    def get_buoy(self, station, source=None):
+        '''Load a single buoy. The lookup uses the station index.
+
+        :param station: ID of the station
+        :param source: Name of the source containing the buoy [default is any source]
+        :return: Buoy, None when the station was not found
+        '''
+        buoys = self.get_buoys([station], source)
+        return buoys[0] if buoys else None
+
+    def get_buoys(self, stations=None, source=None):
+        '''Load buoys.
+
+        :param stations: Iterable of station IDs [default is all stations]
+        :param source: Name of the source containing the buoys [default is any source]. Use
+        an empty string for the buoys that were not saved with a source.
+        :return: list of Buoy objects
+        '''
+        query = _SELECT_BUOYS
+        params = []
+        clauses = []
+        if stations is not None:
+            stations = [str(station) for station in stations]
+            clauses.append(f"station IN ({', '.join('?' * len(stations))})")
+            params.extend(stations)
+        if source is not None:
+            clauses.append("source = ?")
+            params.append(source)
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+
+        return [_buoy_from_row(row) for row in self._connection.execute(query, params)]
+
+    def get_source(self, name):
+        '''Load a source and all buoys in the source.
+
+        :param name: Name of the source
+        :return: Source, None when the source was not found
+        '''
+        sources = self.get_sources([name])
+        return sources[0] if sources else None
+
+    def get_sources(self, names=None):
+        '''Load sources and the buoys in each source.
+
+        :param names: Iterable of source names [default is all sources]
+        :return: list of Source objects
+        '''
+        rows = self._connection.execute("SELECT name, description FROM sources").fetchall()
+        if names is not None:
+            names = set(names)
+            rows = [row for row in rows if row[0] in names]
+
+        sources = []
+        for name, description in rows:
+            source = Source(name, description if description else None)
+            source.add_buoys(self.get_buoys(source=name))
+            sources.append(source)
+        return sources
+
+    def observations(self, station, start=None, end=None, description=None):
+        '''Load the observations of a station in a time range.
+
+        :param station: ID of the station
+        :param start: Epoch time of the start of the range (inclusive), None for the oldest
+        :param end: Epoch time of the end of the range (inclusive), None for the newest
+        :param description: Description of the buoy [default is all buoys with the station]
+        :return: list of BuoyData from oldest to newest
+        '''
+        query = "SELECT data FROM observations WHERE station = ?"
+        params = [str(station)]
+        if description is not None:
+            query += " AND description = ?"
+            params.append(description)
+        if start is not None:
+            query += " AND epoch_time >= ?"
+            params.append(start)
+        if end is not None:
+            query += " AND epoch_time <= ?"
+            params.append(end)
+        query += " ORDER BY epoch_time"
+
+        return [
+            BuoyData.from_json(jloads(data)) for (data,) in self._connection.execute(query, params)
+        ]
+
+    def load(self, cached_output=CacheData.ALL):
+        '''Load the cache in the same format as `nautical.cache.load`.
+
+        :param cached_output: CacheData enumeration type. What type of information to retrieve
+        :return: Dictionary containing all cached output
+        '''
+        output = {}
+        for key in convert_to_keys(cached_output):
+            if key == CacheData.BUOYS.name:
+                output[key] = self.get_buoys(source=_NO_SOURCE)
+            elif key == CacheData.SOURCES.name:
+                output[key] = self.get_sources()
+            elif key == CacheData.TIME.name:
+                row = self._connection.execute(
+                    "SELECT value FROM meta WHERE key = ?", (key,)
+                ).fetchone()
+                if row:
+                    output[key] = row[0]
+        return output
+
+    def dumps(self, data):
+        '''Save the data in the same format as `nautical.cache.dumps`. Unlike the json
+        cache, the buoys and sources are upserted, data that was previously saved
+        is not removed.
+
+        :param data: Dictionary containing buoys and sources with the keys to match
+        '''
+        if not isinstance(data, dict):
+            raise TypeError("dumps requires data to be a dictionary")
+
+        with self._connection:
+            if CacheData.BUOYS.name in data:
+                self._write_buoys(_NO_SOURCE, data[CacheData.BUOYS.name])
+            for source in data.get(CacheData.SOURCES.name, []):
+                self._write_source(source)
+            self._set_time()
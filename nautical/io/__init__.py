@@ -2,18 +2,66 @@
 information about buoys and their sources on NOAA's website.
 '''
 
-from .web import get_url_source, get_noaa_forecast_url
-from .buoy import create_buoy, get_current_data, get_buoy_data
-from .sources import get_buoy_sources
+from .web import (
+    get_url_source,
+    parse_url_source,
+    get_noaa_forecast_url,
+    get_noaa_realtime_url,
+    HTTPSession,
+    RateLimiter,
+    get_default_session,
+    set_default_session
+)
+from .transport import RequestsTransport, RecordTransport, ReplayTransport, TransportResponse
+from .buoy import (
+    create_buoy,
+    fill_buoy,
+    async_create_buoys,
+    async_fill_buoy,
+    get_current_data,
+    get_current_data_from_source,
+    get_buoy_data
+)
+from .sources import get_buoy_sources, iter_kml_sources, validate_sources
+from .realtime import (
+    parse_realtime_data,
+    get_realtime_data,
+    fill_buoy_with_realtime_data,
+    parse_latest_obs,
+    get_latest_obs,
+    update_sources_with_latest_obs
+)
 from .cdata import parse_winds, parse_location, parse_time, parse_cdata, fill_buoy_with_cdata
 
 __all__ = [
     "get_url_source",
+    "parse_url_source",
     "get_noaa_forecast_url",
+    "get_noaa_realtime_url",
+    "HTTPSession",
+    "RateLimiter",
+    "get_default_session",
+    "set_default_session",
+    "RequestsTransport",
+    "RecordTransport",
+    "ReplayTransport",
+    "TransportResponse",
     "create_buoy",
+    "fill_buoy",
+    "async_create_buoys",
+    "async_fill_buoy",
     "get_current_data",
+    "get_current_data_from_source",
     "get_buoy_data",
     "get_buoy_sources",
+    "iter_kml_sources",
+    "validate_sources",
+    "parse_realtime_data",
+    "get_realtime_data",
+    "fill_buoy_with_realtime_data",
+    "parse_latest_obs",
+    "get_latest_obs",
+    "update_sources_with_latest_obs",
     "parse_winds",
     "parse_location",
     "parse_time",
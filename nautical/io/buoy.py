@@ -1,26 +1,38 @@
+from asyncio import gather, get_running_loop, Semaphore
+from concurrent.futures import ThreadPoolExecutor
 from re import sub
+from urllib.error import HTTPError, URLError
 from bs4 import BeautifulSoup
+from lxml import etree, html
 from nautical.log import get_logger
-from nautical.io.web import get_noaa_forecast_url, get_url_source
+from nautical.io.web import (
+    get_noaa_forecast_url,
+    get_default_session,
+    HTTPSession
+)
 from nautical.noaa.buoy.buoy_data import BuoyData
 from nautical.noaa.buoy.buoy import Buoy
 
 
 log = get_logger()
 
+# Default number of stations fetched at the same time by the async functions
+DEFAULT_CONCURRENCY = 16
 
-def create_buoy(buoy):
+
+def create_buoy(buoy, session=None):
     '''Provide a full workup for a specific buoy. If the buoy is None or it cannot
     be found then the data returned will be considered invalid as None
 
     :param buoy: id of the buoy to do a workup on
+    :param session: HTTPSession used for the request [default is the shared session]
     :return: BuoyWorkup if successful else None
     '''
     if not buoy:
         return None
 
     buoy_data = Buoy(buoy)
-    fill_buoy(buoy_data)
+    fill_buoy(buoy_data, session=session)
 
     if not buoy_data.valid:
         return None
@@ -28,18 +40,39 @@ def create_buoy(buoy):
     return buoy_data
 
 
-def fill_buoy(buoy):
+def fill_buoy(buoy, session=None):
     '''Pass in a Buoy object that needs to be filled in with the current data.
     The buoy object will have the validity set if the results were successful
 
     :param buoy: nautical.noaa.buoy.Buoy object
+    :param session: HTTPSession used for the request [default is the shared session]
     '''
     url = get_noaa_forecast_url(buoy.station)
-    soup = get_url_source(url)
+    session = session or get_default_session()
+
+    try:
+        response = session.fetch(url)
+    except (AttributeError, TypeError, ValueError, HTTPError) as error:
+        log.error(error)
+        raise
+
+    _fill_buoy_from_response(buoy, response)
+
+
+def _fill_buoy_from_response(buoy, response):
+    '''Fill the buoy with the current data found in the response. When the
+    page was not modified since the buoy was last filled, parsing is skipped.
+
+    :param buoy: nautical.noaa.buoy.Buoy object
+    :param response: HTTPResponse of the station page
+    '''
+    if response.not_modified and buoy.valid:
+        log.debug("Station %s not modified, skipping", buoy.station)
+        return
 
     current_buoy_data = BuoyData()
-    buoy_valid = get_current_data(
-        soup,
+    buoy_valid = get_current_data_from_source(
+        response.content,
         current_buoy_data,
         [f"Conditions at {buoy.station}", "Detailed Wave Summary"]
     )
@@ -47,6 +80,70 @@ def fill_buoy(buoy):
     buoy.present = current_buoy_data
 
 
+async def async_fill_buoy(buoy, session=None, semaphore=None, executor=None):
+    '''Asynchronous version of `fill_buoy`. The station page is downloaded
+    without blocking the event loop, and the page is handed to the same parsing
+    logic as `fill_buoy`.
+
+    :param buoy: nautical.noaa.buoy.Buoy object
+    :param session: HTTPSession used for the request [default is the shared session]
+    :param semaphore: asyncio.Semaphore limiting the number of requests in flight
+    :param executor: concurrent.futures.Executor used to perform the blocking request
+    '''
+    url = get_noaa_forecast_url(buoy.station)
+    session = session or get_default_session()
+
+    if semaphore is None:
+        response = await get_running_loop().run_in_executor(executor, session.fetch, url)
+    else:
+        async with semaphore:
+            response = await get_running_loop().run_in_executor(executor, session.fetch, url)
+
+    _fill_buoy_from_response(buoy, response)
+
+
+async def async_create_buoys(stations, concurrency=DEFAULT_CONCURRENCY, session=None):
+    '''Asynchronous version of `create_buoy` for many stations. At most `concurrency`
+    station pages are requested at the same time.
+
+    :param stations: list of station ids
+    :param concurrency: max number of requests in flight
+    :param session: HTTPSession used for the requests. When not provided a session is
+    created with a pool large enough for `concurrency` connections.
+    :return: list of Buoy objects in the same order as `stations`. The entry is None when
+    the buoy could not be found or is invalid (see `create_buoy`).
+    '''
+    if concurrency < 1:
+        raise ValueError("async_create_buoys requires a concurrency of 1 or more")
+
+    owns_session = session is None
+    if owns_session:
+        session = HTTPSession(pool_maxsize=concurrency)
+
+    semaphore = Semaphore(concurrency)
+    executor = ThreadPoolExecutor(max_workers=concurrency)
+
+    async def _create(station):
+        if not station:
+            return None
+
+        buoy = Buoy(station)
+        try:
+            await async_fill_buoy(buoy, session=session, semaphore=semaphore, executor=executor)
+        except (AttributeError, TypeError, ValueError, URLError) as error:
+            log.error("Failed to create buoy %s: %s", station, error)
+            return None
+
+        return buoy if buoy.valid else None
+
+    try:
+        return list(await gather(*[_create(station) for station in stations]))
+    finally:
+        executor.shutdown(wait=False)
+        if owns_session:
+            session.close()
+
+
 def get_current_data(soup: BeautifulSoup, buoy: BuoyData, search: str):
     '''Search the beautiful soup object for a TABLE containing the search string. The 
     function will grab the data from the table and create a NOAAData object and return the data
@@ -91,5 +188,60 @@ def get_current_data(soup: BeautifulSoup, buoy: BuoyData, search: str):
     # no variables set indicates errors or invalid buoy
     return buoy_variables_set > 0
 
+
+def get_current_data_from_source(source, buoy: BuoyData, search: str):
+    '''Fast version of `get_current_data` that works directly on the page source.
+    The page is parsed with lxml, and only the TABLEs with a caption containing the
+    search string are visited. A BeautifulSoup object is never created. The results
+    are the same as `get_current_data`.
+
+    :param source: bytes or string of the page source
+    :param buoy: BuoyData object that should be filled with data as this function parses the data.
+    :param search: text to search for in the captions of the tables.
+    :return: True when data has been found and set
+    '''
+    # keep track of the number of variables that were set, indicates validity
+    buoy_variables_set = 0
+
+    if not isinstance(search, list):
+        search = [search]
+
+    try:
+        root = html.fromstring(source)
+    except (etree.ParserError, ValueError) as error:
+        log.error(error)
+        return False
+
+    # Find all tables with a caption that has the text we are searching for
+    tables = []
+    for caption in root.iter('caption'):
+        caption_text = caption.text_content()
+        for search_text in search:
+            if search_text in caption_text:
+                tables.append(next(caption.iterancestors('table'), None))
+
+    for table in tables:
+        for i, row in enumerate(table.iter('tr')):
+            key_data = None
+            key = None
+            value = None
+
+            # the first table is another table and it is no use to use -- skipping
+            if i >= 1:
+                cells = list(row.iter('td'))
+                if cells:
+                    try:
+                        key_data = cells[0].text_content()
+                        key = key_data[key_data.find("(")+1:key_data.find(")")]
+                        value = cells[1].text.split()[0]
+                        buoy.set(key.lower(), value)
+                        buoy_variables_set += 1
+                    except (IndexError, TypeError, AttributeError) as error:
+                        log.error("{} - key_field: {}, key: {}, value: {}".format(error, key_data, key, value))
+
+    # no variables set indicates errors or invalid buoy
+    return buoy_variables_set > 0
+
+
 # Alias for getting current data, It has the same result
 get_buoy_data = get_current_data
@@ -0,0 +1,280 @@
+'''NOAA publishes the realtime observations of each buoy as whitespace
+delimited text files. The column names of the files match the names of the
+variables in `BuoyData`, so the files can be read without scraping the
+station pages.
+'''
+from typing import Dict, List
+from nautical.location import Point
+from nautical.log import get_logger
+from nautical.noaa.buoy.buoy import Buoy
+from nautical.noaa.buoy.buoy_data import BuoyData, buoy_units, buoy_vars
+from nautical.time import NauticalTime, TimeFormat
+from nautical.units import (
+    SpeedUnits,
+    DistanceUnits,
+    PressureUnits,
+    TimeUnits,
+    TemperatureUnits,
+    convert
+)
+from .web import get_noaa_realtime_url, get_default_session
+
+
+log = get_logger()
+
+# Latest observation of every station in a single file
+LATEST_OBS_URL = "https://www.ndbc.noaa.gov/data/latest_obs/latest_obs.txt"
+
+# Value used by NOAA in the realtime files when the data is missing
+MISSING_REALTIME_DATA = "MM"
+
+# The date and time columns are case sensitive (MM = month, mm = minutes)
+_date_columns = {
+    "YY": "year",
+    "YYYY": "year",
+    "MM": "mm",
+    "DD": "dd",
+    "hh": "hours",
+    "mm": "minutes"
+}
+
+# Columns describing the station rather than the observation
+_station_columns = {
+    "STN": "station",
+    "LAT": "latitude",
+    "LON": "longitude"
+}
+
+# Units of the values in the realtime files. The values are converted to the
+# units of the data scraped from the station pages (see `buoy_units`).
+realtime_units = {
+    "wspd": SpeedUnits.MPS,
+    "gst": SpeedUnits.MPS,
+    "wvht": DistanceUnits.METERS,
+    "dpd": TimeUnits.SECONDS,
+    "apd": TimeUnits.SECONDS,
+    "pres": PressureUnits.HPA,
+    "ptdy": PressureUnits.HPA,
+    "atmp": TemperatureUnits.DEG_C,
+    "wtmp": TemperatureUnits.DEG_C,
+    "dewp": TemperatureUnits.DEG_C,
+    "vis": DistanceUnits.NAUTICAL_MILES,
+    "tide": DistanceUnits.FEET,
+    "swh": DistanceUnits.METERS,
+    "swp": TimeUnits.SECONDS,
+    "wwh": DistanceUnits.METERS,
+    "wwp": TimeUnits.SECONDS,
+    "otmp": TemperatureUnits.DEG_C,
+    "depth": DistanceUnits.METERS,
+}
+
+
+def _parse_header(header):
+    '''Map each column of the header to the name of the BuoyData variable.
+
+    :param header: First line of the realtime file (starts with #)
+    :return: list of variable names where None indicates an unknown column
+    '''
+    columns = []
+    for column in header.lstrip("#").split():
+        if column in _date_columns:
+            columns.append(_date_columns[column])
+        elif column in _station_columns:
+            columns.append(_station_columns[column])
+        elif column.lower() in buoy_vars:
+            columns.append(column.lower())
+        else:
+            log.debug("Unknown realtime column %s, skipping", column)
+            columns.append(None)
+    return columns
+
+
+def _parse_value(column, value):
+    '''Convert the value to a float when possible, otherwise keep the string. Numeric
+    values are converted from the `realtime_units` to the `buoy_units`.
+    '''
+    try:
+        value = float(value)
+    except ValueError:
+        return value
+
+    init_units = realtime_units.get(column, None)
+    final_units = buoy_units.get(column, None)
+    if init_units is not None and final_units is not None and init_units != final_units:
+        value = convert(value, init_units, final_units)
+    return value
+
+
+def _parse_rows(data):
+    '''Parse all rows of a NOAA realtime file.
+
+    :param data: bytes or string contents of the realtime file
+    :return: generator of (station dictionary, BuoyData) for each row. The station
+    dictionary contains the station, latitude and longitude when found in the row.
+    '''
+    if isinstance(data, bytes):
+        data = data.decode("utf-8", errors="replace")
+
+    columns = None
+
+    for line in data.splitlines():
+        if not line.strip():
+            continue
+
+        if line.startswith("#"):
+            # The first comment is the header, the second comment contains the units
+            if columns is None:
+                columns = _parse_header(line)
+            continue
+
+        if columns is None:
+            log.error("Realtime data is missing a header")
+            return
+
+        values = line.split()
+        if len(values) != len(columns):
+            log.warning("Skipping realtime row with %d columns, expected %d",
+                        len(values), len(columns))
+            continue
+
+        station_info = {}
+        nautical_time = NauticalTime(fmt=TimeFormat.HOUR_24)
+        buoy_values = {"time": nautical_time}
+        for column, value in zip(columns, values):
+            if column is None or value == MISSING_REALTIME_DATA:
+                continue
+
+            try:
+                if column == "hours":
+                    nautical_time.hours = int(value)
+                elif column == "minutes":
+                    nautical_time.minutes = int(value)
+                elif column in ("year", "mm", "dd"):
+                    buoy_values[column] = int(value)
+                elif column == "station":
+                    station_info[column] = value
+                elif column in ("latitude", "longitude"):
+                    station_info[column] = float(value)
+                else:
+                    buoy_values[column] = _parse_value(column, value)
+            except ValueError as error:
+                log.error("%s - column: %s, value: %s", error, column, value)
+
+        # the date and time columns are always present, so BuoyData is built in a single call
+        yield station_info, BuoyData.from_values(buoy_values)
+
+
+def parse_realtime_data(data) -> List[BuoyData]:
+    '''Parse all rows of a NOAA realtime file. Values that are missing (MM)
+    are not set in the BuoyData. The values are converted to the units of
+    `BuoyData.get_units`.
+
+    :param data: bytes or string contents of the realtime file
+    :return: list of BuoyData objects in the same order as the file (newest first)
+    '''
+    return [buoy_data for _, buoy_data in _parse_rows(data)]
+
+
+def parse_latest_obs(data) -> Dict[str, Buoy]:
+    '''Parse the latest observation file that contains a row for every station.
+    The values are converted to the units of `BuoyData.get_units`.
+
+    :param data: bytes or string contents of the latest observation file
+    :return: dictionary of the station (upper case) mapped to a valid Buoy
+    containing the latest observation and location of the station.
+    '''
+    latest_obs = {}
+    for station_info, buoy_data in _parse_rows(data):
+        if "station" not in station_info:
+            continue
+
+        buoy = Buoy(station_info["station"])
+        if "latitude" in station_info and "longitude" in station_info:
+            buoy.location = Point(station_info["latitude"], station_info["longitude"])
+        buoy.present = buoy_data
+        buoy.valid = True
+
+        latest_obs[buoy.station.upper()] = buoy
+
+    return latest_obs
+
+
+def get_realtime_data(station, extension="txt", session=None) -> List[BuoyData]:
+    '''Download and parse the realtime data for a station.
+
+    :param station: id of the station
+    :param extension: type of realtime data file (txt [default], spec, ocean, ...)
+    :param session: HTTPSession used for the request [default is the shared session]
+    :return: list of BuoyData objects (newest first)
+    '''
+    session = session or get_default_session()
+    return parse_realtime_data(session.read(get_noaa_realtime_url(station, extension)))
+
+
+def fill_buoy_with_realtime_data(buoy, session=None):
+    '''Fill the buoy with the most recent realtime observation. The buoy
+    is valid when an observation was found.
+
+    :param buoy: nautical.noaa.buoy.Buoy object
+    :param session: HTTPSession used for the request [default is the shared session]
+    '''
+    realtime_data = get_realtime_data(buoy.station, session=session)
+
+    if realtime_data:
+        _update_present(buoy, realtime_data[0])
+        buoy.valid = True
+
+
+def _update_present(buoy, buoy_data):
+    '''Set the present data of the buoy when the data is more recent.
+
+    :return: True when the present data was set
+    '''
+    present = buoy.present
+    if present is None or buoy_data.epoch_time > present.epoch_time:
+        buoy.present = buoy_data
+        return True
+    return False
+
+
+def get_latest_obs(session=None) -> Dict[str, Buoy]:
+    '''Download and parse the latest observation of every station.
+
+    :param session: HTTPSession used for the request [default is the shared session]
+    :return: see `parse_latest_obs`
+    '''
+    session = session or get_default_session()
+    return parse_latest_obs(session.read(LATEST_OBS_URL))
+
+
+def update_sources_with_latest_obs(sources, latest_obs=None, session=None):
+    '''Update the present data of every buoy in the sources with the latest
+    observations. All sources are refreshed with a single request.
+
+    .. note:: Stations are matched without case sensitivity.
+
+    :param sources: Dictionary in the format of source_name: source (see `get_buoy_sources`)
+    :param latest_obs: Result of `get_latest_obs`. When not provided the latest
+    observations are downloaded.
+    :param session: HTTPSession used for the request [default is the shared session]
+    :return: Number of buoys that were updated
+    '''
+    if latest_obs is None:
+        latest_obs = get_latest_obs(session=session)
+
+    num_updated = 0
+    for source in sources.values():
+        for buoy in source:
+            latest = latest_obs.get(str(buoy.station).upper(), None)
+            if latest is None:
+                continue
+
+            if _update_present(buoy, latest.present):
+                num_updated += 1
+
+            # the location is missing (MM) in some rows, the known location is kept
+            if latest.location is not None:
+                buoy.location = latest.location
+            buoy.valid = True
+
+    return num_updated
@@ -1,28 +1,132 @@
+from concurrent.futures import ThreadPoolExecutor
 from copy import copy, deepcopy
-from urllib.request import urlopen
+from io import BytesIO
 from urllib.error import URLError
-from pykml import parser
+from lxml import etree
 from nautical.noaa.buoy.buoy import Buoy
 from nautical.noaa.buoy.source import Source, SourceType
 from nautical.location.point import Point
 from nautical.log import get_logger
+from nautical.time import get_current_time, get_time_str
 from .cdata import fill_buoy_with_cdata
 from .buoy import fill_buoy
+from .web import get_default_session, HTTPSession, RateLimiter
 
 
 log = get_logger()
 
 
-def get_buoy_sources(source_types=SourceType.ALL):
-    '''NOAA is kind enough to provide all of names, ids, and other information about ALL
-    of their known buoys in a kml document hosted at the link provided 
-    (https://www.ndbc.noaa.gov/kml/marineobs_by_pgm.kml). Read through this document and 
-    parse the buoy information to determine their id and location. The ID can be used to 
-    provide to get_noaa_forecast_url(). Then we can find even more information about the
-    buoys.
+# The known public link to all NOAA Buoys
+MARINE_OBS_KML_URL = "https://www.ndbc.noaa.gov/kml/marineobs_by_pgm.kml"
 
-    :return: dictionary all source names mapped to their respective source.
+
+def _local_name(tag):
+    '''Remove the namespace from the tag of an element'''
+    return tag.rsplit("}", 1)[-1] if isinstance(tag, str) else None
+
+
+def _clear_element(element):
+    '''Free the memory of a processed element and the siblings before it.'''
+    element.clear()
+    parent = element.getparent()
+    if parent is not None:
+        while element.getprevious() is not None:
+            del parent[0]
+
+
+def _find_network_link(fileobject):
+    '''Find the link (href) embedded in the kml document.
+
+    :param fileobject: file like object containing the kml document
+    :return: link as a string, None when no link is found
+    '''
+    for _, element in etree.iterparse(fileobject, events=("end",)):
+        if _local_name(element.tag) == "href" and element.text:
+            return element.text.strip()
+    return None
+
+
+def _create_buoy(placemark, source):
+    '''Create a Buoy from a Placemark element of the kml document.
+
+    :param placemark: Placemark element
+    :param source: Source that will contain the buoy
+    :return: Buoy
+    '''
+    fields = {}
+    for element in placemark.iter():
+        tag = _local_name(element.tag)
+        if tag in ("name", "Snippet", "description", "coordinates") and tag not in fields:
+            fields[tag] = element.text
+
+    pnt = Point.parse(str(fields.get("coordinates")))
+    buoy = Buoy(fields.get("name"), description=fields.get("Snippet"), location=pnt)
+
+    # These two sources contain buoys with information embedded in CDATA
+    if source.name in (SourceType.as_strings(SourceType.SHIPS), ):
+        fill_buoy_with_cdata(buoy, fields.get("description") or "")
+        # These buoys must be marked as True
+        buoy.valid = True
+
+    return buoy
+
+
+def iter_kml_sources(fileobject, source_names):
+    '''Incrementally parse the kml document containing all buoys. Each `Source`
+    is yielded as soon as its Folder closes, and the processed elements are freed.
+    Folders that are not requested are skipped without creating buoys.
+
+    :param fileobject: file like object containing the kml document
+    :param source_names: list of source names (see `SourceType.as_strings`) to keep
+    :return: generator of Source objects
     '''
+    folder_depth = 0
+    folder_name = None
+    folder_description = None
+    source = None
+
+    for event, element in etree.iterparse(fileobject, events=("start", "end")):
+        tag = _local_name(element.tag)
+
+        if event == "start":
+            if tag == "Folder":
+                folder_depth += 1
+            continue
+
+        # The sources are the Folders inside of the Document Folder
+        if tag == "Folder":
+            if folder_depth == 2:
+                if source is not None:
+                    yield source
+                elif folder_name is not None:
+                    log.debug("Found %s, skipping ...", folder_name)
+                folder_name = None
+                folder_description = None
+                source = None
+                _clear_element(element)
+            folder_depth -= 1
+            continue
+
+        if folder_depth != 2 or _local_name(element.getparent().tag) != "Folder":
+            # Only the children of the source Folder are processed here
+            continue
+
+        if tag == "name":
+            folder_name = element.text
+            if folder_name in source_names:
+                source = Source(folder_name, folder_description)
+        elif tag == "description":
+            folder_description = element.text
+            if source is not None:
+                source.description = folder_description
+        elif tag == "Placemark":
+            if source is not None:
+                source.add_buoy(_create_buoy(element, source))
+            _clear_element(element)
+
+
+def _as_source_names(source_types):
+    '''Convert the SourceType(s) to a list of supported source names'''
     source_lst = source_types
     if not isinstance(source_types, list):
         source_lst = [source_types]
@@ -32,8 +136,6 @@ def get_buoy_sources(source_types=SourceType.ALL):
     else:
         source_lst = list(set([SourceType.as_strings(x) for x in source_lst]))
 
-    sources = {}
-
     # remove the unsupported types
     for unsupported_source in (
         SourceType.as_strings(SourceType.TAO), SourceType.as_strings(SourceType.TSUNAMI)
@@ -41,51 +143,136 @@ def get_buoy_sources(source_types=SourceType.ALL):
         if unsupported_source in source_lst:
             log.debug("Removing %s, unsupported source type.", unsupported_source)
             source_lst.remove(unsupported_source)
-    
-    try:
-        # The known public link to all NOAA Buoys
-        fileobject = urlopen("https://www.ndbc.noaa.gov/kml/marineobs_by_pgm.kml")
-    except URLError:
-        return sources
 
-    root = parser.parse(fileobject).getroot()
+    return source_lst
 
-    # grab the embedded link that will provide the kml to all buoys
-    real_kml = root.Document.NetworkLink.Link.href
 
-    if real_kml:
-        real_fileobject = urlopen(str(real_kml))
-        real_root = parser.parse(real_fileobject).getroot()
+def get_buoy_sources(
+    source_types=SourceType.ALL,
+    session=None,
+    use_cache=False,
+    cache_ttl=None,
+    force_refresh=False,
+    cache_filename=None
+):
+    '''NOAA is kind enough to provide all of names, ids, and other information about ALL
+    of their known buoys in a kml document hosted at the link provided 
+    (https://www.ndbc.noaa.gov/kml/marineobs_by_pgm.kml). Read through this document and 
+    parse the buoy information to determine their id and location. The ID can be used to 
+    provide to get_noaa_forecast_url(). Then we can find even more information about the
+    buoys.
+
+    When `use_cache` is True, the parsed sources are saved to the catalogue in the
+    nautical cache directory. Cached sources are used until they are older than
+    `cache_ttl`, and the documents are only downloaded for the missing or stale sources.
+    When the documents cannot be downloaded, the stale cached sources are provided.
+
+    :param source_types: SourceType or list of SourceTypes to retrieve
+    :param session: HTTPSession used for the requests [default is the shared session]
+    :param use_cache: When True read and write the cached catalogue of sources
+    :param cache_ttl: Number of minutes that a cached source is considered valid [default is one day]
+    :param force_refresh: True to refresh all sources, or a SourceType (list of SourceTypes)
+    to refresh only those sources even when the cached sources are valid.
+    :param cache_filename: Name of the file containing the cached catalogue
+    [default is the catalogue in the nautical cache directory]
+    :return: dictionary all source names mapped to their respective source.
+    '''
+    session = session or get_default_session()
+    source_lst = _as_source_names(source_types)
+
+    if not use_cache:
+        return _download_buoy_sources(source_lst, session) or {}
+
+    # the cache package is only imported when the catalogue is used
+    # pylint: disable=import-outside-toplevel
+    from nautical.cache.catalogue import (
+        load_catalogue,
+        dump_catalogue,
+        is_stale,
+        DEFAULT_CATALOGUE_TTL,
+        NAUTICAL_CATALOGUE_FILE
+    )
+    cache_ttl = DEFAULT_CATALOGUE_TTL if cache_ttl is None else cache_ttl
+    cache_filename = cache_filename or NAUTICAL_CATALOGUE_FILE
+
+    if force_refresh is True:
+        refresh_lst = source_lst
+    elif force_refresh:
+        refresh_lst = _as_source_names(force_refresh)
+    else:
+        refresh_lst = []
+
+    catalogue = load_catalogue(cache_filename)
 
-        for category in real_root.Document.Folder.Folder:
+    sources = {}
+    cached_lst = []
+    for name, (time_str, source) in catalogue.items():
+        if name in source_lst and name not in refresh_lst and not is_stale(time_str, cache_ttl):
+            cached_lst.append(name)
+            # sources that were not found when cached are not provided
+            if source is not None:
+                sources[name] = source
 
-            source_name = category.name.text
+    missing_lst = [name for name in source_lst if name not in cached_lst]
+    if not missing_lst:
+        log.debug("Loaded all sources from the catalogue %s", cache_filename)
+        return sources
 
-            if source_name not in source_lst:
-                log.debug("Found %s, skipping ...", source_name)
-                continue
-            
-            source = Source(source_name, category.description)
+    downloaded = _download_buoy_sources(missing_lst, session)
+    if downloaded is None:
+        # stale sources are better than no sources when NOAA cannot be reached
+        stale_lst = [name for name in missing_lst if catalogue.get(name, (None, None))[1] is not None]
+        log.warning(
+            "Failed to download the sources, using the stale cached sources: %s",
+            ", ".join(stale_lst) if stale_lst else "none"
+        )
+        for name in stale_lst:
+            sources[name] = catalogue[name][1]
+        return sources
 
-            for placemark in category.Placemark:
+    time_str = get_time_str(get_current_time())
+    for name in missing_lst:
+        catalogue[name] = (time_str, downloaded.get(name, None))
+    dump_catalogue(catalogue, cache_filename)
 
-                pnt = Point.parse(str(placemark.Point.coordinates))
-                buoy = Buoy(placemark.name.text, description=placemark.Snippet, location=pnt)
+    sources.update(downloaded)
+    return sources
 
-                # These two sources contain buoys with information embedded in CDATA
-                if source.name in (SourceType.as_strings(SourceType.SHIPS), ):
-                    fill_buoy_with_cdata(buoy, placemark.description.text)
-                    # These buoys must be marked as True
-                    buoy.valid = True
 
-                source.add_buoy(buoy)
+def _download_buoy_sources(source_lst, session):
+    '''Download and parse the kml documents containing all buoys.
 
+    :param source_lst: list of source names to keep
+    :param session: HTTPSession used for the requests
+    :return: dictionary all source names mapped to their respective source,
+    None when the documents could not be retrieved.
+    '''
+    sources = {}
+
+    try:
+        fileobject = BytesIO(session.read(MARINE_OBS_KML_URL))
+    except URLError:
+        return None
+
+    # grab the embedded link that will provide the kml to all buoys
+    real_kml = _find_network_link(fileobject)
+
+    if real_kml:
+        real_fileobject = BytesIO(session.read(real_kml))
+
+        for source in iter_kml_sources(real_fileobject, source_lst):
             sources[source.name] = source
 
     return sources
 
 
-def validate_sources(source_data, remove_invalid=True):
+def validate_sources(
+    source_data,
+    remove_invalid=True,
+    session=None,
+    max_workers=1,
+    rate_limit=None
+):
     '''This function is presumed to be executed after `get_buoy_sources`. 
     The results of the previous function meet the requirements for the
     formatted parameter here. The function will attempt to parse all
@@ -93,6 +280,14 @@ def validate_sources(source_data, remove_invalid=True):
 
     :param source_data: Dictionary in the format of source_name: source
     :param remove_invalid: when True [default] remove the buoys that are invalid
+    :param session: HTTPSession used for the requests [default is the shared session]. When
+    `max_workers` is more than 1 and no session is provided, a session is created with a pool
+    large enough for `max_workers` connections. The workers of a provided session wait for a
+    connection when the pool of the session is smaller than `max_workers`.
+    :param max_workers: Number of threads used to fill the buoys. When 1 [default]
+    the buoys are filled serially.
+    :param rate_limit: RateLimiter or the max number of requests per second shared
+    by all workers [default is no limit]
     :return: New dictionary where the buoys for each source are validated
     '''
     validated_source_info = {}
@@ -100,25 +295,58 @@ def validate_sources(source_data, remove_invalid=True):
     if not isinstance(source_data, dict):
         return validated_source_info
 
+    if rate_limit is not None and not isinstance(rate_limit, RateLimiter):
+        rate_limit = RateLimiter(rate_limit)
+
+    def _fill(buoy):
+        if rate_limit is not None:
+            rate_limit.acquire()
+        fill_buoy(buoy, session=session)
+
+    # copy all buoys before filling so that the order in each source is kept
+    copied_buoys = {}
     for source, source_obj in source_data.items():
 
         if source == SourceType.as_strings(SourceType.SHIPS):
             log.info("Skipping validity check on Ships")
-            validated_source_info[source] = deepcopy(source_obj)
             continue
-        
-        copied_source = copy(source_obj)
-        for _, buoy_obj in source_obj.buoys.items():
-            buoy_copy = copy(buoy_obj)
 
+        copied_buoys[source] = [copy(buoy_obj) for buoy_obj in source_obj]
+
+    unfilled_buoys = []
+    for buoys in copied_buoys.values():
+        for buoy_copy in buoys:
             if buoy_copy.valid:
-                log.debug("Skipping buoy: %s, already validated", buoy_obj.station)
-                copied_source.add_buoy(buoy_copy)
-            
-            fill_buoy(buoy_copy)
+                log.debug("Skipping buoy: %s, already validated", buoy_copy.station)
+            else:
+                unfilled_buoys.append(buoy_copy)
+
+    if max_workers > 1:
+        owns_session = session is None
+        if owns_session:
+            session = HTTPSession(pool_maxsize=max_workers)
+
+        try:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                # consume the results so that errors are raised
+                list(executor.map(_fill, unfilled_buoys))
+        finally:
+            if owns_session:
+                session.close()
+    else:
+        for buoy_copy in unfilled_buoys:
+            _fill(buoy_copy)
+
+    for source, source_obj in source_data.items():
 
+        if source not in copied_buoys:
+            validated_source_info[source] = deepcopy(source_obj)
+            continue
+
+        copied_source = copy(source_obj)
+        for buoy_copy in copied_buoys[source]:
             if not buoy_copy.valid and remove_invalid:
-                log.warning("Dropping buoy: %s, invalid data", buoy_obj.station)
+                log.warning("Dropping buoy: %s, invalid data", buoy_copy.station)
             else:
                 copied_source.add_buoy(buoy_copy)
     
@@ -0,0 +1,180 @@
+'''Transports perform the requests for an `HTTPSession`. The default transport
+sends the requests to the server, while the record and replay transports allow
+the responses to be saved to, and served from, a local fixture directory.
+'''
+from collections import namedtuple
+from hashlib import sha1
+from json import load as jload, dump as jdump
+from os import makedirs, replace
+from os.path import join, exists
+from random import uniform
+from time import sleep
+from urllib.error import URLError
+from requests import Session
+from requests.adapters import HTTPAdapter
+from requests.exceptions import RequestException
+from requests.structures import CaseInsensitiveDict
+from nautical.log import get_logger
+
+
+log = get_logger()
+
+# Default number of host pools cached by a transport
+DEFAULT_POOL_CONNECTIONS = 4
+# Default number of keep-alive connections allowed per host
+DEFAULT_POOL_MAXSIZE = 10
+
+# Response created by the transports that do not send requests to the server
+TransportResponse = namedtuple("TransportResponse", ["status_code", "reason", "headers", "content"])
+
+
+class RequestsTransport:
+
+    '''Transport that keeps connections to a host alive between requests.
+    Connections are pooled per host so that repeated lookups against NOAA only
+    pay for the TCP/TLS handshake once per connection.
+    '''
+
+    def __init__(
+        self,
+        pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+        max_retries: int = 0
+    ) -> None:
+        '''
+        :param pool_connections: Number of host pools to keep cached
+        :param pool_maxsize: Max number of connections kept alive per host. Requests
+        beyond this limit will block until a connection is returned to the pool.
+        :param max_retries: Number of times a failed connection is retried
+        '''
+        self._session = Session()
+
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            max_retries=max_retries,
+            pool_block=True
+        )
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+
+    def get(self, url, headers=None, timeout=None):
+        '''Send a GET request for the url using a pooled connection.
+
+        :param url: full url to request
+        :param headers: Optional dictionary of request headers
+        :param timeout: Single timeout or (connect, read) tuple in seconds
+        :return: requests.Response
+        :raises URLError: when the request could not be sent
+        '''
+        try:
+            return self._session.get(url, headers=headers, timeout=timeout)
+        except RequestException as error:
+            raise URLError(error) from error
+
+    def close(self):
+        '''Close all pooled connections'''
+        self._session.close()
+
+
+def _fixture_filename(directory, url, extension):
+    '''Name of the fixture file for the url, the url is hashed to create a valid filename'''
+    return join(directory, sha1(url.encode("utf-8")).hexdigest() + extension)
+
+
+class RecordTransport:
+
+    '''Transport that saves every response to a fixture directory. The
+    fixtures can be served later with a `ReplayTransport`.
+    '''
+
+    def __init__(self, directory: str, transport=None) -> None:
+        '''
+        :param directory: Directory where the responses are saved
+        :param transport: Transport used to send the requests [default is RequestsTransport]
+        '''
+        self.directory = directory
+        self.transport = transport or RequestsTransport()
+        makedirs(self.directory, exist_ok=True)
+
+    def get(self, url, headers=None, timeout=None):
+        '''Send the request with the wrapped transport and save the response.
+
+        See `RequestsTransport.get` for more information.
+        '''
+        response = self.transport.get(url, headers=headers, timeout=timeout)
+
+        # 304 responses contain no body, keep the fixture of the full response
+        if response.status_code != 304:
+            body_filename = _fixture_filename(self.directory, url, ".body")
+            with open(body_filename + ".tmp", "wb") as body_file:
+                body_file.write(response.content)
+            replace(body_filename + ".tmp", body_filename)
+
+            meta_filename = _fixture_filename(self.directory, url, ".json")
+            with open(meta_filename + ".tmp", "w") as meta_file:
+                jdump({
+                    "url": url,
+                    "status_code": response.status_code,
+                    "reason": response.reason,
+                    "headers": dict(response.headers)
+                }, meta_file)
+            replace(meta_filename + ".tmp", meta_filename)
+
+        return response
+
+    def close(self):
+        '''Close the wrapped transport'''
+        self.transport.close()
+
+
+class ReplayTransport:
+
+    '''Transport that serves the responses saved by a `RecordTransport`. No
+    requests are sent to the server. Urls without a fixture result in a 404 response.
+    '''
+
+    def __init__(self, directory: str, latency: float = 0.0, jitter: float = 0.0) -> None:
+        '''
+        :param directory: Directory containing the saved responses
+        :param latency: Seconds added to each response to simulate the network
+        :param jitter: Max random seconds added to the latency of each response
+        '''
+        self.directory = directory
+        self.latency = latency
+        self.jitter = jitter
+
+    def get(self, url, headers=None, timeout=None):  # pylint: disable=unused-argument
+        '''Serve the saved response for the url. Conditional requests are
+        answered with 304 when the ETag or Last-Modified header matches.
+
+        See `RequestsTransport.get` for more information.
+        '''
+        delay = self.latency + (uniform(0.0, self.jitter) if self.jitter > 0 else 0.0)
+        if delay > 0:
+            sleep(delay)
+
+        meta_filename = _fixture_filename(self.directory, url, ".json")
+        body_filename = _fixture_filename(self.directory, url, ".body")
+        if not exists(meta_filename) or not exists(body_filename):
+            log.warning("No fixture found for %s", url)
+            return TransportResponse(404, "Not Found", CaseInsensitiveDict(), b"")
+
+        with open(meta_filename, "r") as meta_file:
+            meta = jload(meta_file)
+
+        response_headers = CaseInsensitiveDict(meta.get("headers", {}))
+        headers = headers or {}
+        if (headers.get("If-None-Match") and
+                headers["If-None-Match"] == response_headers.get("ETag")) or \
+           (headers.get("If-Modified-Since") and
+                headers["If-Modified-Since"] == response_headers.get("Last-Modified")):
+            return TransportResponse(304, "Not Modified", response_headers, b"")
+
+        with open(body_filename, "rb") as body_file:
+            content = body_file.read()
+
+        return TransportResponse(meta["status_code"], meta.get("reason"), response_headers, content)
+
+    def close(self):
+        '''Nothing to close for the replay transport'''
@@ -1,11 +1,177 @@
-from urllib.request import urlopen
+from collections import namedtuple
+from threading import Lock
+from time import monotonic, sleep
 from urllib.error import HTTPError
 from bs4 import BeautifulSoup
 from nautical.log import get_logger
+from .transport import RequestsTransport, DEFAULT_POOL_CONNECTIONS, DEFAULT_POOL_MAXSIZE
 
 
 log = get_logger()
 
+# Default (connect, read) timeout in seconds
+DEFAULT_TIMEOUT = (10.0, 30.0)
+
+# Result of `HTTPSession.fetch`. `not_modified` is True when the content was
+# served from the cache because the server reported no changes.
+HTTPResponse = namedtuple("HTTPResponse", ["url", "content", "not_modified"])
+
+
+class HTTPSession:
+
+    '''Reusable HTTP session that keeps connections to a host alive between
+    requests. Connections are pooled per host so that repeated lookups against
+    NOAA only pay for the TCP/TLS handshake once per connection.
+    '''
+
+    def __init__(
+        self,
+        pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+        timeout=DEFAULT_TIMEOUT,
+        max_retries: int = 0,
+        cache=None,
+        transport=None
+    ) -> None:
+        '''
+        :param pool_connections: Number of host pools to keep cached
+        :param pool_maxsize: Max number of connections kept alive per host. Requests
+        beyond this limit will block until a connection is returned to the pool.
+        :param timeout: Single timeout or (connect, read) tuple in seconds
+        :param max_retries: Number of times a failed connection is retried
+        :param cache: nautical.cache.HTTPCache used to send conditional requests [optional]
+        :param transport: Transport that performs the requests (see `nautical.io.transport`).
+        When provided, the pool parameters are not used. [default is RequestsTransport]
+        '''
+        self.timeout = timeout
+        self.cache = cache
+        self.transport = transport or RequestsTransport(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            max_retries=max_retries
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def get(self, url, headers=None):
+        '''Send a GET request for the url using a pooled connection.
+
+        .. note:: Errors are raised as `urllib.error` exceptions so that callers
+        are not required to know about the underlying transport.
+
+        :param url: full url to request
+        :param headers: Optional dictionary of request headers
+        :return: response of the transport (requests.Response for the default transport)
+        '''
+        if not url:
+            raise AttributeError("No url provided to HTTPSession.get")
+
+        response = self.transport.get(url, headers=headers, timeout=self.timeout)
+
+        if response.status_code >= 400:
+            raise HTTPError(url, response.status_code, response.reason, response.headers, None)
+
+        return response
+
+    def fetch(self, url):
+        '''Fetch the body of the url. When the session has a cache, a conditional
+        request is sent and the cached body is used when the server responds
+        with 304 (Not Modified).
+
+        :param url: full url to request
+        :return: HTTPResponse
+        '''
+        if self.cache is None:
+            return HTTPResponse(url, self.get(url).content, False)
+
+        response = self.get(url, headers=self.cache.conditional_headers(url))
+
+        if response.status_code == 304:
+            content = self.cache.load(url)
+            if content is not None:
+                log.debug("%s not modified, using cached content", url)
+                return HTTPResponse(url, content, True)
+
+            # the cached content was removed after the request was sent
+            response = self.get(url)
+
+        self.cache.store(url, response.headers, response.content)
+        return HTTPResponse(url, response.content, False)
+
+    def read(self, url):
+        '''Read the full body of the url.
+
+        :param url: full url to request
+        :return: bytes of the response body
+        '''
+        return self.fetch(url).content
+
+    def close(self):
+        '''Close all pooled connections'''
+        self.transport.close()
+
+
+class RateLimiter:
+
+    '''Thread safe limiter for the number of requests made per second. The limiter
+    can be shared between sessions and threads to apply a global limit.
+    '''
+
+    def __init__(self, requests_per_second: float) -> None:
+        '''
+        :param requests_per_second: Max number of requests allowed per second
+        '''
+        if requests_per_second <= 0:
+            raise ValueError("RateLimiter requires requests_per_second greater than 0")
+
+        self.requests_per_second = float(requests_per_second)
+        self._interval = 1.0 / self.requests_per_second
+        self._next_time = monotonic()
+        self._lock = Lock()
+
+    def acquire(self):
+        '''Block until the next request is allowed.'''
+        with self._lock:
+            now = monotonic()
+            wait_time = self._next_time - now
+            self._next_time = max(self._next_time, now) + self._interval
+
+        if wait_time > 0:
+            sleep(wait_time)
+
+
+_default_session = None
+_default_session_lock = Lock()
+
+
+def get_default_session():
+    '''Get the module level session that is shared by all functions that
+    were not provided a session. The session is created on first use.
+
+    :return: HTTPSession
+    '''
+    global _default_session  # pylint: disable=global-statement
+    with _default_session_lock:
+        if _default_session is None:
+            _default_session = HTTPSession()
+        return _default_session
+
+
+def set_default_session(session):
+    '''Replace the module level session. The previous session is closed.
+
+    :param session: HTTPSession or None to reset to the default configuration
+    '''
+    global _default_session  # pylint: disable=global-statement
+    with _default_session_lock:
+        if _default_session is not None and _default_session is not session:
+            _default_session.close()
+        _default_session = session
+
 
 def get_noaa_forecast_url(buoy):
     '''NOAA is kind enough to post all of their data from their buoys at 
@@ -22,18 +188,42 @@ def get_noaa_forecast_url(buoy):
     log.warning("No buoy ID provided to get_noaa_forecast_url")
 
 
-def get_url_source(url_name):
+def get_noaa_realtime_url(buoy, extension="txt"):
+    '''NOAA publishes the last 45 days of observations for each buoy as
+    whitespace delimited text files
+    (https://www.ndbc.noaa.gov/data/realtime2/).
+
+    :param buoy: id of the buoy
+    :param extension: type of realtime data file (txt [default], spec, ocean, ...)
+    :return: full url if buoy is not empty, otherwise None
+    '''
+    if buoy:
+        return f"https://www.ndbc.noaa.gov/data/realtime2/{str(buoy).upper()}.{extension}"
+    log.warning("No buoy ID provided to get_noaa_realtime_url")
+
+
+def parse_url_source(data):
+    '''Place the raw source of a url into a BeautifulSoup object.
+
+    :param data: bytes or string of the page source
+    :return: BeautifulSoup Object
+    '''
+    return BeautifulSoup(data, features="lxml")
+
+
+def get_url_source(url_name, session=None):
     '''If you already know the url_name or if you have run through the 
     get_noaa_forecast_url(), then you can send in the url here. Get the source 
     information for the url and place the information into a BeautifulSoup
     object, so that we can do any lookups of the data that we need.
 
     :param url_name: name of the url to search for
+    :param session: HTTPSession used for the request [default is the shared session]
     :return: BeautifulSoup Object on success otherwise none
     '''
+    session = session or get_default_session()
     try:
-        open_url = urlopen(url_name)
-        soup = BeautifulSoup(open_url.read(), features="lxml")
+        soup = parse_url_source(session.read(url_name))
         return soup
     except (AttributeError, TypeError, ValueError, HTTPError) as error:
         log.error(error)
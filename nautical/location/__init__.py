@@ -1,9 +1,15 @@
 '''The module contains data to create and manage 3D points. The points
 can be generated from the data contained inside of NOAA's kml and html data.
 '''
+from .area import PreparedArea
 from .point import Point
+from .point_array import PointArray
+from .spatial_index import SpatialIndex
 
 
 __all__ = [
-    "Point"
+    "Point",
+    "PointArray",
+    "PreparedArea",
+    "SpatialIndex"
 ]
@@ -0,0 +1,130 @@
+import numpy as np
+from .distance import DEFAULT_CHUNK_SIZE
+from .point import Point
+from .point_array import PointArray
+
+
+class PreparedArea:
+
+    '''Geometry (area) prepared for many point in area tests. The geometry is
+    validated and the edges are stored in arrays once, so each test only runs the
+    ray casting algorithm (see `nautical.location.util.in_area`). Points outside of
+    the bounding box of the geometry are rejected before the edges are checked.
+    '''
+
+    __slots__ = ('_bbox', '_x1', '_y1', '_x2', '_y2', '_min_y', '_max_y', '_max_x', '_vertical')
+
+    def __init__(self, geometry) -> None:
+        '''
+        :param geometry: Ordered list of `Point` objects or a `PointArray`. When the geometry
+        contains two points, the area is the rectangle with the points at opposite corners.
+        :raises TypeError: when the geometry has fewer than 2 points or contains values
+        that are not `Point` objects
+        '''
+        if isinstance(geometry, PointArray):
+            x_values = geometry.latitudes
+            y_values = geometry.longitudes
+        else:
+            if len(geometry) >= 2:
+                for pnt in geometry:
+                    if not isinstance(pnt, Point):
+                        raise TypeError("All values of geometry must be Point objects")
+            x_values = np.array([pnt.x for pnt in geometry], dtype=np.float64)
+            y_values = np.array([pnt.y for pnt in geometry], dtype=np.float64)
+
+        if len(x_values) < 2:
+            raise TypeError("Geometry must be a set of points with a length of 2 or more")
+
+        if len(x_values) == 2:
+            # rectangle made from the max/mins of the two points
+            min_x, max_x = min(x_values), max(x_values)
+            min_y, max_y = min(y_values), max(y_values)
+            x_values = np.array([min_x, min_x, max_x, max_x], dtype=np.float64)
+            y_values = np.array([min_y, max_y, max_y, min_y], dtype=np.float64)
+
+        self._bbox = (
+            float(x_values.min()), float(y_values.min()),
+            float(x_values.max()), float(y_values.max())
+        )
+
+        # each point is connected to the next point, the last point closes the geometry.
+        # Edges parallel to the ray can never be intersected, drop them.
+        x_next = np.roll(x_values, -1)
+        y_next = np.roll(y_values, -1)
+        keep = y_values != y_next
+
+        self._x1 = x_values[keep][:, np.newaxis]
+        self._y1 = y_values[keep][:, np.newaxis]
+        self._x2 = x_next[keep][:, np.newaxis]
+        self._y2 = y_next[keep][:, np.newaxis]
+        self._min_y = np.minimum(self._y1, self._y2)
+        self._max_y = np.maximum(self._y1, self._y2)
+        self._max_x = np.maximum(self._x1, self._x2)
+        self._vertical = self._x1 == self._x2
+
+    @property
+    def bbox(self):
+        '''Bounding box of the geometry
+        :return: tuple of (min latitude, min longitude, max latitude, max longitude)
+        '''
+        return self._bbox
+
+    def __len__(self):
+        '''Number of edges that can be intersected'''
+        return len(self._x1)
+
+    def __contains__(self, point):
+        '''True when the `Point` lies in the area'''
+        return bool(self.contains(point))
+
+    def _intersections(self, x_values, y_values):
+        '''Find the number of edges that each ray intersects (see
+        `nautical.location.util._find_intersections`).
+
+        :param x_values: 1D array of x values (latitudes) of the points
+        :param y_values: 1D array of y values (longitudes) of the points
+        :return: Array containing the number of intersections for each point
+        '''
+        intersected = np.zeros(len(x_values), dtype=np.int64)
+
+        # limit the size of the (edges x points) temporary arrays
+        step = max(1, DEFAULT_CHUNK_SIZE // max(1, len(self)))
+        for start in range(0, len(x_values), step):
+            x_pnt = x_values[start:start + step]
+            y_pnt = y_values[start:start + step]
+
+            crosses = (self._max_y >= y_pnt) & (y_pnt > self._min_y) & (x_pnt <= self._max_x)
+            xinters = (y_pnt - self._y1) * (self._x2 - self._x1) / (self._y2 - self._y1) + self._x1
+            crosses &= self._vertical | (x_pnt <= xinters)
+
+            intersected[start:start + step] = np.count_nonzero(crosses, axis=0)
+
+        return intersected
+
+    def contains(self, points):
+        '''Determine if the points lie in the area.
+
+        :param points: `Point` or `PointArray`
+        :return: True when the `Point` lies in the area. When a `PointArray` is provided
+        a boolean array is returned for each point.
+        '''
+        if isinstance(points, Point):
+            return bool(self.contains(PointArray([points.x], [points.y]))[0])
+        if not isinstance(points, PointArray):
+            raise TypeError("The points must be a Point or PointArray object")
+
+        min_x, min_y, max_x, max_y = self._bbox
+        x_values = points.latitudes
+        y_values = points.longitudes
+
+        # a ray from a point outside of the bounding box intersects an even number of edges
+        mask = (x_values >= min_x) & (x_values <= max_x) & (y_values >= min_y) & (y_values <= max_y)
+        candidates = np.flatnonzero(mask)
+        if len(candidates) and len(self):
+            mask[candidates] = self._intersections(
+                x_values[candidates], y_values[candidates]
+            ) % 2 == 1
+        else:
+            mask[:] = False
+
+        return mask
@@ -0,0 +1,98 @@
+'''Great circle (haversine) distances. The scalar functions are used by `Point`,
+while the array functions compute the distances of many coordinates at once.
+'''
+from math import asin, cos, radians, sin, sqrt
+import numpy as np
+from nautical.units import DistanceUnits
+from nautical.units.conversion import DistanceLookup
+
+
+# Mean radius of the earth
+EARTH_RADIUS_METERS = 6371008.8
+
+# Max number of distances computed at once by `haversine_matrix_deg`
+DEFAULT_CHUNK_SIZE = 2 ** 20
+
+
+def meters_per_unit(units):
+    '''Get the number of meters in one of the units.
+
+    :param units: nautical.units.DistanceUnits
+    :return: meters in a single unit
+    :raises TypeError: when the units are not DistanceUnits
+    '''
+    if not isinstance(units, DistanceUnits):
+        raise TypeError(f"DistanceUnits not found: {str(type(units))}")
+    return DistanceLookup[units] / DistanceLookup[DistanceUnits.METERS]
+
+
+def haversine_deg(lat1, lon1, lat2, lon2, units=DistanceUnits.METERS) -> float:
+    '''Distance between two coordinates provided in degrees.
+
+    :param lat1: Latitude of point 1 in degrees
+    :param lon1: Longitude of point 1 in degrees
+    :param lat2: Latitude of point 2 in degrees
+    :param lon2: Longitude of point 2 in degrees
+    :param units: nautical.units.DistanceUnits
+    :return: Distance between the points, in units
+    '''
+    lat1, lat2 = radians(lat1), radians(lat2)
+    dlat = lat2 - lat1
+    dlon = radians(lon2) - radians(lon1)
+    hav = sin(dlat * 0.5) ** 2 + cos(lat1) * cos(lat2) * sin(dlon * 0.5) ** 2
+    # rounding can push the value past 1 for antipodal points
+    return 2.0 * EARTH_RADIUS_METERS * asin(sqrt(min(hav, 1.0))) / meters_per_unit(units)
+
+
+def haversine_many_deg(lat, lon, lats, lons, units=DistanceUnits.METERS):
+    '''Distance between one coordinate and many coordinates provided in degrees.
+
+    :param lat: Latitude of the point in degrees
+    :param lon: Longitude of the point in degrees
+    :param lats: Array of latitudes in degrees
+    :param lons: Array of longitudes in degrees
+    :param units: nautical.units.DistanceUnits
+    :return: Array containing the distance to each coordinate, in units
+    '''
+    scale = 2.0 * EARTH_RADIUS_METERS / meters_per_unit(units)
+
+    lat = radians(lat)
+    lats = np.radians(lats)
+    hav = np.sin((lats - lat) * 0.5) ** 2 + \
+        cos(lat) * np.cos(lats) * np.sin((np.radians(lons) - radians(lon)) * 0.5) ** 2
+    return scale * np.arcsin(np.sqrt(np.minimum(hav, 1.0)))
+
+
+def haversine_matrix_deg(
+    lats1, lons1, lats2, lons2, units=DistanceUnits.METERS, chunk_size=DEFAULT_CHUNK_SIZE
+):
+    '''Distance between each pair of coordinates provided in degrees. The
+    matrix is computed in chunks of rows to limit the size of temporary arrays.
+
+    :param lats1: Array of N latitudes in degrees
+    :param lons1: Array of N longitudes in degrees
+    :param lats2: Array of M latitudes in degrees
+    :param lons2: Array of M longitudes in degrees
+    :param units: nautical.units.DistanceUnits
+    :param chunk_size: Max number of distances computed at once
+    :return: N x M array of distances, in units
+    '''
+    scale = 2.0 * EARTH_RADIUS_METERS / meters_per_unit(units)
+
+    lats1 = np.radians(lats1)
+    lons1 = np.radians(lons1)
+    lats2 = np.radians(lats2)
+    lons2 = np.radians(lons2)
+    cos_lats2 = np.cos(lats2)
+
+    output = np.empty((len(lats1), len(lats2)), dtype=np.float64)
+    rows = max(1, int(chunk_size) // max(1, len(lats2)))
+    for start in range(0, len(lats1), rows):
+        stop = start + rows
+        lat = lats1[start:stop, np.newaxis]
+        lon = lons1[start:stop, np.newaxis]
+        hav = np.sin((lats2 - lat) * 0.5) ** 2 + \
+            np.cos(lat) * cos_lats2 * np.sin((lons2 - lon) * 0.5) ** 2
+        output[start:stop] = scale * np.arcsin(np.sqrt(np.minimum(hav, 1.0)))
+
+    return output
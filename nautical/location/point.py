@@ -1,6 +1,6 @@
-from haversine import haversine, Unit
 from nautical.log import get_logger
 from nautical.units import DistanceUnits
+from .distance import haversine_deg
 
 
 log = get_logger()
@@ -8,22 +8,47 @@ log = get_logger()
 
 class Point:
 
-    '''A 3D point containing latitude, longitude and altitude coordinates.'''
+    '''A 3D point containing latitude, longitude and altitude coordinates.
+    Points are immutable, so they can be shared without copying. See `PointArray`
+    for storing many points.
+    '''
+
+    __slots__ = ('_latitude', '_longitude', '_altitude')
 
     def __init__(self, lat: float = 0.0, lon: float = 0.0, alt: float = 0.0) -> None:
         '''The latitude, longitude, and altitude are supplied to
         the base class as the x, y, z parameters respectively.
         '''
-        self._latitude = lat
-        self._longitude = lon
-        self._altitude = alt
+        object.__setattr__(self, "_latitude", lat)
+        object.__setattr__(self, "_longitude", lon)
+        object.__setattr__(self, "_altitude", alt)
+
+    def __setattr__(self, key, value):
+        '''Points are immutable
+
+        :raises AttributeError: when setting any variable
+        '''
+        raise AttributeError(f"{self.__class__.__name__} is immutable")
+
+    def __delattr__(self, key):
+        raise AttributeError(f"{self.__class__.__name__} is immutable")
+
+    def __copy__(self):
+        '''The point is immutable, there is no need to copy it'''
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
 
-        # pylint: disable=invalid-name
-        self.x = self.latitude
-        # pylint: disable=invalid-name
-        self.y = self.longitude
-        # pylint: disable=invalid-name
-        self.z = self.altitude
+    def __reduce__(self):
+        return self.__class__, (self._latitude, self._longitude, self._altitude)
+
+    def copy(self):
+        '''Create a new point with the same coordinates
+
+        :return: Point
+        '''
+        return self.__class__(self._latitude, self._longitude, self._altitude)
 
     @property
     def latitude(self):
@@ -46,6 +71,21 @@ class Point:
         '''
         return self._altitude
 
+    @property
+    def x(self):  # pylint: disable=invalid-name
+        '''x Property, same as the latitude'''
+        return self._latitude
+
+    @property
+    def y(self):  # pylint: disable=invalid-name
+        '''y Property, same as the longitude'''
+        return self._longitude
+
+    @property
+    def z(self):  # pylint: disable=invalid-name
+        '''z Property, same as the altitude'''
+        return self._altitude
+
     def as_tuple(self):
         '''Get the values of the object as a simple tuple. The
         lat and lon are used but not the altitude. The altitude
@@ -72,16 +112,21 @@ class Point:
     
     @staticmethod
     def from_json(json_dict):
-        '''Fill the instance from a json dictionary'''
-        loc = Point()
-        loc.from_dict(json_dict)
-        return loc
-    
+        '''Create an instance from a json dictionary. Points are immutable
+        so a new instance is always created.
+        '''
+        return Point(
+            json_dict.get("latitude", 0.0),
+            json_dict.get("longitude", 0.0),
+            json_dict.get("altitude", 0.0)
+        )
+
     def from_dict(self, point_dict):
-        '''Fill the instance from a json dictionary'''
-        self._latitude = point_dict.get("latitude", self._latitude)
-        self._longitude = point_dict.get("longitude", self._longitude)
-        self._altitude = point_dict.get("altitude", self._altitude)
+        '''Points are immutable, use `from_json` to create a new point.
+
+        :raises AttributeError: always, the instance cannot be filled
+        '''
+        raise AttributeError(f"{self.__class__.__name__} is immutable, use {self.__class__.__name__}.from_json")
 
     def distance(self, other, units=DistanceUnits.METERS):
         '''Get the distance using the Haversine function. The function will
@@ -96,13 +141,9 @@ class Point:
         if not isinstance(other, Point):
             raise TypeError("Distance should be calculated between two points")
 
-        if units == DistanceUnits.CENTIMETERS:
-            raise AttributeError("Centimeters not accepted")
-
-        hav_units = getattr(Unit, str(units.name), Unit.METERS)
-        log.debug("haversine executed with units: %s", hav_units.name)
-
-        return haversine(self.as_tuple(), other.as_tuple(), hav_units)
+        return haversine_deg(
+            self._latitude, self._longitude, other._latitude, other._longitude, units
+        )
 
     def in_range(self, other, distance, units=DistanceUnits.METERS):
         '''Deteremine if the points are within a specific distance of eachother.
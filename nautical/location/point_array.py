@@ -0,0 +1,143 @@
+import numpy as np
+from nautical.log import get_logger
+from .point import Point
+
+
+log = get_logger()
+
+
+def _read_only(array):
+    '''Create a read-only view of the array'''
+    view = array.view()
+    view.flags.writeable = False
+    return view
+
+
+class PointArray:
+
+    '''Array of N 3D points. The latitudes, longitudes and altitudes are
+    stored in contiguous float64 arrays. Like `Point`, the array is immutable.
+    '''
+
+    __slots__ = ('_latitudes', '_longitudes', '_altitudes')
+
+    def __init__(self, latitudes, longitudes, altitudes=None) -> None:
+        '''
+        :param latitudes: Sequence or array of latitudes (degrees)
+        :param longitudes: Sequence or array of longitudes (degrees)
+        :param altitudes: Sequence or array of altitudes (meters) [default is 0.0 for all points]
+        :raises ValueError: when the number of values do not match
+        '''
+        latitudes = np.array(latitudes, dtype=np.float64).ravel()
+        longitudes = np.array(longitudes, dtype=np.float64).ravel()
+        if altitudes is None:
+            altitudes = np.zeros(len(latitudes), dtype=np.float64)
+        else:
+            altitudes = np.array(altitudes, dtype=np.float64).ravel()
+
+        if not len(latitudes) == len(longitudes) == len(altitudes):
+            raise ValueError(f"{self.__class__.__name__} requires the same number of "
+                             "latitudes, longitudes and altitudes")
+
+        self._latitudes = _read_only(latitudes)
+        self._longitudes = _read_only(longitudes)
+        self._altitudes = _read_only(altitudes)
+
+    @property
+    def latitudes(self):
+        '''Latitudes Property (degrees)
+        :return: read-only array of latitudes
+        '''
+        return self._latitudes
+
+    @property
+    def longitudes(self):
+        '''Longitudes Property (degrees)
+        :return: read-only array of longitudes
+        '''
+        return self._longitudes
+
+    @property
+    def altitudes(self):
+        '''Altitudes Property (meters)
+        :return: read-only array of altitudes
+        '''
+        return self._altitudes
+
+    def __len__(self):
+        '''Number of points in the array'''
+        return len(self._latitudes)
+
+    def __getitem__(self, index):
+        '''Get a single `Point` when the index is an integer, otherwise a
+        `PointArray` is created from the slice, index array or boolean mask.
+        '''
+        if isinstance(index, (int, np.integer)):
+            return Point(
+                float(self._latitudes[index]),
+                float(self._longitudes[index]),
+                float(self._altitudes[index])
+            )
+        return PointArray(self._latitudes[index], self._longitudes[index], self._altitudes[index])
+
+    def __iter__(self):
+        '''Yield each `Point` in the array'''
+        for lat, lon, alt in zip(self._latitudes.tolist(),
+                                 self._longitudes.tolist(),
+                                 self._altitudes.tolist()):
+            yield Point(lat, lon, alt)
+
+    def __str__(self):
+        '''String representation of this instance'''
+        return f"{self.__class__.__name__} of {len(self)} points"
+
+    def to_json(self):
+        '''Convert the instance to a list of json dictionaries (see `Point.to_json`)'''
+        return [point.to_json() for point in self]
+
+    @staticmethod
+    def from_json(json_list):
+        '''Create an instance from a list of json dictionaries'''
+        return PointArray.from_points(Point.from_json(json_dict) for json_dict in json_list)
+
+    @staticmethod
+    def from_points(points):
+        '''Create an instance from `Point` objects.
+
+        :param points: Iterable of Point objects
+        :return: PointArray
+        '''
+        coordinates = [(pnt.latitude, pnt.longitude, pnt.altitude) for pnt in points]
+        if not coordinates:
+            return PointArray([], [])
+
+        latitudes, longitudes, altitudes = zip(*coordinates)
+        return PointArray(latitudes, longitudes, altitudes)
+
+    @staticmethod
+    def from_kml(data):
+        '''Parse kml coordinates. Each coordinate contains the lon, lat, alt [optional]
+        values respectively separated by commas, coordinates are separated by whitespace.
+        See `Point.parse` for more information.
+
+        :param data: A string containing one or more coordinates, or an iterable of these strings
+        :return: PointArray
+        :raises ValueError: when a coordinate cannot be parsed
+        '''
+        if isinstance(data, str):
+            data = [data]
+
+        latitudes = []
+        longitudes = []
+        altitudes = []
+        for coordinate_str in data:
+            for coordinate in str(coordinate_str).split():
+                values = coordinate.split(",")
+                if len(values) < 2:
+                    raise ValueError(f"Invalid kml coordinate: {coordinate}")
+
+                longitudes.append(float(values[0]))
+                latitudes.append(float(values[1]))
+                altitudes.append(float(values[2]) if len(values) > 2 and values[2] else 0.0)
+
+        return PointArray(latitudes, longitudes, altitudes)
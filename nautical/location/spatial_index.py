@@ -0,0 +1,259 @@
+from math import asin, ceil, cos, degrees, floor, radians, sin
+import numpy as np
+from nautical.log import get_logger
+from nautical.units import DistanceUnits
+from .distance import EARTH_RADIUS_METERS, haversine_many_deg, meters_per_unit
+from .point import Point
+
+
+log = get_logger()
+
+# Default size (degrees) of the latitude/longitude cells of the index
+DEFAULT_CELL_SIZE = 1.0
+
+
+class SpatialIndex:
+
+    '''Index of items (ex. `Buoy`) by location. The index is a grid of
+    latitude/longitude cells so that queries only measure the distance to the
+    items in the cells that can contain a result. Distances are measured on
+    the sphere (see `nautical.location.util.haversine`).
+
+    Items are added with the location of the item, `Buoy` objects use their
+    `location` by default. Items are identified by their hash, items that move
+    (ex. Ships) can be updated without rebuilding the index.
+    '''
+
+    def __init__(self, cell_size: float = DEFAULT_CELL_SIZE) -> None:
+        '''
+        :param cell_size: Size of each cell in degrees. Smaller cells reduce the number of
+        distance calculations for small queries, larger cells reduce the number of cells visited.
+        '''
+        if cell_size <= 0 or cell_size > 180:
+            raise ValueError(f"Invalid cell size provided to {self.__class__.__name__}")
+        self.cell_size = float(cell_size)
+        self._num_lon_cells = int(ceil(360.0 / self.cell_size))
+
+        # cell mapped to the entries in the cell (hash of item: (item, latitude, longitude))
+        self._cells = {}
+        # hash of item mapped to the cell containing the item
+        self._items = {}
+
+    def __len__(self):
+        '''Number of items in the index'''
+        return len(self._items)
+
+    def __contains__(self, item):
+        '''True when the item is in the index'''
+        return hash(item) in self._items
+
+    def __iter__(self):
+        '''Yield all items in the index'''
+        for cell in self._cells.values():
+            for item, _, _ in cell.values():
+                yield item
+
+    def _cell(self, latitude, longitude):
+        '''Get the cell (latitude index, longitude index) for the location'''
+        lat_index = min(int(floor((latitude + 90.0) / self.cell_size)),
+                        int(ceil(180.0 / self.cell_size)) - 1)
+        return lat_index, self._lon_index(longitude)
+
+    def _lon_index(self, longitude):
+        '''Get the index of the longitude cell. The longitude is normalized to [-180, 180)
+        so that the same location always maps to the same cell.
+        '''
+        longitude = (longitude + 180.0) % 360.0 - 180.0
+        return min(int(floor((longitude + 180.0) / self.cell_size)), self._num_lon_cells - 1)
+
+    def insert(self, item, location=None):
+        '''Add an item to the index. When the item is already in the index it is moved
+        to the new location.
+
+        :param item: Item to add to the index (ex. `Buoy`)
+        :param location: `Point` location of the item [default is `item.location`]
+        :return: True when the item was added, False when the item has no location
+        '''
+        if location is None:
+            location = getattr(item, "location", None)
+        if not isinstance(location, Point):
+            log.debug("Skipping %s, no location", str(item))
+            return False
+
+        key = hash(item)
+        if key in self._items:
+            self.remove(item)
+
+        cell = self._cell(location.latitude, location.longitude)
+        self._cells.setdefault(cell, {})[key] = (item, location.latitude, location.longitude)
+        self._items[key] = cell
+        return True
+
+    def update(self, item, location=None):
+        '''Move an item in the index. See `insert` for more information.'''
+        return self.insert(item, location)
+
+    def remove(self, item):
+        '''Remove an item from the index.
+
+        :param item: Item to remove from the index
+        :return: True when the item was removed
+        '''
+        key = hash(item)
+        cell = self._items.pop(key, None)
+        if cell is None:
+            return False
+
+        entries = self._cells[cell]
+        del entries[key]
+        if not entries:
+            del self._cells[cell]
+        return True
+
+    def _lon_indices(self, min_lon, max_lon):
+        '''Indices of the longitude cells between the longitudes. The range
+        wraps around the antimeridian when min_lon > max_lon.
+        '''
+        if min_lon <= max_lon and max_lon - min_lon >= 360.0:
+            return range(self._num_lon_cells)
+
+        # the normalized range crosses the antimeridian when it is outside of [-180, 180)
+        min_lon = (min_lon + 180.0) % 360.0 - 180.0
+        max_lon = (max_lon + 180.0) % 360.0 - 180.0
+        first = self._lon_index(min_lon)
+        last = self._lon_index(max_lon)
+        if min_lon <= max_lon:
+            return range(first, last + 1)
+        # split into the cells east of min_lon and the cells west of max_lon
+        return list(range(first, self._num_lon_cells)) + list(range(0, last + 1))
+
+    def _candidates(self, min_lat, max_lat, lon_indices):
+        '''Get the entries in the cells between the latitudes for the longitude cells
+
+        :return: list of entries (item, latitude, longitude)
+        '''
+        first = self._cell(max(min_lat, -90.0), 0.0)[0]
+        last = self._cell(min(max_lat, 90.0), 0.0)[0]
+        lon_indices = set(lon_indices)
+
+        if (last - first + 1) * len(lon_indices) > len(self._cells):
+            # visiting every occupied cell is cheaper than looking up each cell
+            cells = [entries for (lat_index, lon_index), entries in self._cells.items()
+                     if first <= lat_index <= last and lon_index in lon_indices]
+        else:
+            cells = [self._cells[(lat_index, lon_index)]
+                     for lat_index in range(first, last + 1) for lon_index in lon_indices
+                     if (lat_index, lon_index) in self._cells]
+
+        return [entry for entries in cells for entry in entries.values()]
+
+    def within(self, point, distance, units=DistanceUnits.METERS):
+        '''Find the items within a distance of the point.
+
+        :param point: `Point` at the center of the search
+        :param distance: Max distance of the items from the point
+        :param units: Units of the distance
+        :return: list of (item, distance) sorted by distance
+        '''
+        if not isinstance(point, Point):
+            raise TypeError("The first parameter must be a Point object")
+
+        # angular radius of the search, the longitude range widens toward the poles
+        radius = distance * meters_per_unit(units) / EARTH_RADIUS_METERS
+        radius_deg = degrees(radius)
+        min_lat = point.latitude - radius_deg
+        max_lat = point.latitude + radius_deg
+
+        if min_lat <= -90.0 or max_lat >= 90.0 or radius >= 0.5 * np.pi:
+            lon_indices = range(self._num_lon_cells)
+        else:
+            ratio = sin(radius) / cos(radians(point.latitude))
+            lon_deg = degrees(asin(ratio)) if ratio < 1.0 else 180.0
+            lon_indices = self._lon_indices(point.longitude - lon_deg, point.longitude + lon_deg)
+
+        candidates = self._candidates(min_lat, max_lat, lon_indices)
+        if not candidates:
+            return []
+
+        items, lats, lons = zip(*candidates)
+        distances = haversine_many_deg(point.latitude, point.longitude, lats, lons, units)
+
+        found = np.flatnonzero(distances <= distance)
+        found = found[np.argsort(distances[found], kind="stable")]
+        return [(items[index], float(distances[index])) for index in found]
+
+    def nearest(self, point, k=1, units=DistanceUnits.METERS):
+        '''Find the k nearest items to the point.
+
+        :param point: `Point` at the center of the search
+        :param k: Number of items to find
+        :param units: Units of the distances returned
+        :return: list of (item, distance) sorted by distance, fewer than k items
+        are returned when the index contains fewer than k items.
+        '''
+        if k < 1 or not self._items:
+            return []
+
+        k = min(k, len(self._items))
+
+        # grow the search until k items are found, the distance to the k-th item
+        # is then used to search again so that closer items in unvisited cells are included
+        distance = self.cell_size * 60.0 * meters_per_unit(DistanceUnits.NAUTICAL_MILES) / \
+            meters_per_unit(units)
+        max_distance = np.pi * EARTH_RADIUS_METERS / meters_per_unit(units)
+        found = self.within(point, distance, units)
+        while len(found) < k and distance < max_distance:
+            distance *= 4.0
+            found = self.within(point, distance, units)
+
+        return self.within(point, found[k - 1][1], units)[:k]
+
+    def in_bbox(self, min_lat, min_lon, max_lat, max_lon):
+        '''Find the items inside of a bounding box. The box crosses the
+        antimeridian when min_lon > max_lon.
+
+        :param min_lat: Southern edge of the box (degrees)
+        :param min_lon: Western edge of the box (degrees)
+        :param max_lat: Northern edge of the box (degrees)
+        :param max_lon: Eastern edge of the box (degrees)
+        :return: list of items in the box
+        '''
+        wraps = min_lon > max_lon
+        candidates = self._candidates(min_lat, max_lat, self._lon_indices(min_lon, max_lon))
+
+        found = []
+        for item, lat, lon in candidates:
+            if not min_lat <= lat <= max_lat:
+                continue
+            in_lon = (lon >= min_lon or lon <= max_lon) if wraps else min_lon <= lon <= max_lon
+            if in_lon:
+                found.append(item)
+        return found
+
+    @classmethod
+    def from_buoys(cls, buoys, cell_size=DEFAULT_CELL_SIZE):
+        '''Create an index of the buoys. Buoys without a location are skipped.
+
+        :param buoys: Iterable of Buoy objects
+        :param cell_size: See `SpatialIndex`
+        :return: SpatialIndex
+        '''
+        index = cls(cell_size)
+        for buoy in buoys:
+            index.insert(buoy)
+        return index
+
+    @classmethod
+    def from_sources(cls, sources, cell_size=DEFAULT_CELL_SIZE):
+        '''Create an index of all buoys in the sources.
+
+        :param sources: Dictionary in the format of source_name: source (see
+        `nautical.io.sources.get_buoy_sources`), or a list of sources (see `nautical.cache.load`)
+        :param cell_size: See `SpatialIndex`
+        :return: SpatialIndex
+        '''
+        if isinstance(sources, dict):
+            sources = sources.values()
+        return cls.from_buoys(
+            (buoy for source in sources if source is not None for buoy in source), cell_size
+        )
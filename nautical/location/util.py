@@ -1,20 +1,67 @@
 from nautical.units import DistanceUnits
+from .area import PreparedArea
+from .distance import DEFAULT_CHUNK_SIZE, haversine_many_deg, haversine_matrix_deg
 from .point import Point
+from .point_array import PointArray
 
 
 def haversine(point_one, point_two, units=DistanceUnits.METERS) -> float:
     '''Wrapper for the Haversine for the `Point` class in this module
 
     :param p1: `Point` 1
-    :param point_two: `Point` 2
+    :param point_two: `Point` 2 or a `PointArray`
     :param units: nautical.units.DistanceUnits
-    :return: Distance between the points, in units
+    :return: Distance between the points, in units. When `point_two` is a `PointArray`
+    an array containing the distance to each point is returned.
     '''
     if not isinstance(point_one, Point):
         raise TypeError("The first parameter must be a Point object")
+    if isinstance(point_two, PointArray):
+        return haversine_one_to_many(point_one, point_two, units)
     return point_one.distance(point_two, units)
 
 
+def haversine_one_to_many(point, points, units=DistanceUnits.METERS):
+    '''Distance between a point and every point in a `PointArray`. The distances
+    are computed with numpy rather than one point at a time.
+
+    :param point: `Point`
+    :param points: `PointArray`
+    :param units: nautical.units.DistanceUnits
+    :return: Array containing the distance to each point, in units
+    '''
+    if not isinstance(point, Point):
+        raise TypeError("The first parameter must be a Point object")
+    if not isinstance(points, PointArray):
+        raise TypeError("The second parameter must be a PointArray object")
+    return haversine_many_deg(
+        point.latitude, point.longitude, points.latitudes, points.longitudes, units
+    )
+
+
+def haversine_matrix(points_one, points_two=None, units=DistanceUnits.METERS,
+                     chunk_size=DEFAULT_CHUNK_SIZE):
+    '''Distance between every pair of points. The matrix is computed in
+    chunks so that large arrays do not create large temporary arrays.
+
+    :param points_one: `PointArray` of N points
+    :param points_two: `PointArray` of M points [default is points_one]
+    :param units: nautical.units.DistanceUnits
+    :param chunk_size: Max number of distances computed at once
+    :return: N x M array where [i, j] is the distance between points_one[i]
+    and points_two[j], in units
+    '''
+    if points_two is None:
+        points_two = points_one
+    if not isinstance(points_one, PointArray) or not isinstance(points_two, PointArray):
+        raise TypeError("The points must be PointArray objects")
+    return haversine_matrix_deg(
+        points_one.latitudes, points_one.longitudes,
+        points_two.latitudes, points_two.longitudes,
+        units, chunk_size
+    )
+
+
 # pylint: disable=too-many-arguments
 def in_range_ll(lat1_deg, lon1_deg, lat2_deg, lon2_deg, distance, units=DistanceUnits.METERS):
     '''Determine if points are within a distance of each other provided
@@ -34,13 +81,16 @@ def in_range(point_one, point_two, distance, units=DistanceUnits.METERS):
     '''Determine if the points are within a distance of each other.
 
     :param point_one: Point 1
-    :param point_two: Point 2
+    :param point_two: Point 2 or a `PointArray`
     :param distance: Max allowed distance between points to return true.
     :param units: Units of measurement [default=METERS]
-    :return: True when the distance between P1 and P2 is less than (or equal to) distance_m
+    :return: True when the distance between P1 and P2 is less than (or equal to) distance_m.
+    When `point_two` is a `PointArray` a boolean array is returned for each point.
     '''
     if not isinstance(point_one, Point):
         raise TypeError("The first parameter must be a Point object")
+    if isinstance(point_two, PointArray):
+        return haversine(point_one, point_two, units) <= distance
     if not isinstance(point_two, Point):
         raise TypeError("The second parameter must be a Point object")
     return point_one.in_range(point_two, distance, units)
@@ -98,10 +148,20 @@ def in_area(geometry, point):
     can be found here:
     https://www.eecs.umich.edu/courses/eecs380/HANDOUTS/PROJ2/InsidePoly.html
 
-    :param geometry: Ordered list of `Point` objects
-    :param point: `Point` that should be checked if exists in the geometry
-    :return: True when the value lies in the geometry, false otherwise
+    When the same geometry is checked many times, create a `PreparedArea` once
+    and provide it as the geometry.
+
+    :param geometry: Ordered list of `Point` objects, a `PointArray` or a `PreparedArea`
+    :param point: `Point` that should be checked if exists in the geometry, or a `PointArray`
+    :return: True when the value lies in the geometry, false otherwise. When `point` is a
+    `PointArray` a boolean array is returned for each point.
     '''
+    if isinstance(geometry, PreparedArea):
+        return geometry.contains(point)
+
+    if isinstance(point, PointArray):
+        return PreparedArea(geometry).contains(point)
+
     if not isinstance(point, Point):
         raise TypeError("The second parameter must be a Point object")
 
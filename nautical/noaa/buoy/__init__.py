@@ -1,10 +1,14 @@
 from .buoy import Buoy
 from .buoy_data import BuoyData
+from .buoy_frame import BuoyFrame
+from .history import BuoyHistory
 from .source import Source, SourceType
 
 __all__ = [
     'Buoy',
     'BuoyData',
+    'BuoyFrame',
+    'BuoyHistory',
     'Source',
     'SourceType'
 ]
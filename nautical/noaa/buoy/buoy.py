@@ -1,25 +1,32 @@
-from copy import copy
-from typing import List
 from warnings import warn
 from nautical.noaa.buoy.buoy_data import BuoyData
 from nautical.location.point import Point
+from .history import BuoyHistory, DEFAULT_HISTORY_CAPACITY
 
 
 class Buoy:
 
     # pylint: disable=too-many-instance-attributes
 
-    def __init__(self, station, description: str = None, location=None) -> None:
+    def __init__(
+        self,
+        station,
+        description: str = None,
+        location=None,
+        history_capacity: int = DEFAULT_HISTORY_CAPACITY
+    ) -> None:
         '''
         :param station: ID of the station
         :param description: snippet of information to describe this station
         :param location: nautical.location.point.Point [optional]
+        :param history_capacity: Max number of past BuoyData objects kept, the
+        oldest data is removed when the capacity is reached. None keeps all data.
         '''        
         self.station = station
         self.description = description
         self._location: Point = None
         self._present: BuoyData = None
-        self._past: List[BuoyData] = []
+        self._past = BuoyHistory(history_capacity)
 
         if location is not None:
             self.location = location
@@ -29,11 +36,11 @@ class Buoy:
 
     @property
     def location(self):
-        '''Location Property
+        '''Location Property. Points are immutable, so the location is shared rather than copied.
 
-        :return: Copy of the location (Point)
+        :return: location (Point)
         '''
-        return copy(self._location)
+        return self._location
 
     @location.setter
     def location(self, loc):
@@ -46,10 +53,10 @@ class Buoy:
 
     @property
     def data(self):
-        '''Copy of `present` Property. This is an expansion function
+        '''`present` Property. This is an expansion function
         for use when the `past` was deprecated.
 
-        :return: Copy of the `present` data stored in this instance
+        :return: Read-only `present` data stored in this instance
         '''
         return self.present
 
@@ -58,9 +65,12 @@ class Buoy:
         '''Present Property, the present data stored in this instance. 
         This is the most recent set of buoy data that was retrieved.
 
-        :return: Copy of the `present` data stored in this instance
+        .. note:: The data is a read-only snapshot that is shared rather than copied,
+        use `copy()` on the result to get data that can be changed.
+
+        :return: Read-only `present` data (FrozenBuoyData) stored in this instance
         '''
-        return copy(self._present)
+        return self._present
 
     @data.setter
     def data(self, present_data):
@@ -73,6 +83,7 @@ class Buoy:
         If this instance of present data is a BuoyData object and the time is
         more recent that the previous present data, then the old present data
         is moved to the past data and the new instance is kept as the present data.
+        A read-only snapshot of the data is stored.
 
         :param present_data: instance or candidate for present data (BuoyData)
         '''
@@ -83,7 +94,7 @@ class Buoy:
                 else:
                     raise ValueError("Failed to set present data, time is in the past.")
 
-            self._present = present_data
+            self._present = present_data.freeze()
 
     @property
     def past(self):
@@ -92,7 +103,7 @@ class Buoy:
         :return: all past instances of Buoy Data objects stored in this instance.
         '''
         warn(f"{self.__class__.__name__} past is deprecated", DeprecationWarning, stacklevel=2)
-        return self._past[:]
+        return self._past.slice()
 
     @past.setter
     def past(self, past_data):
@@ -109,16 +120,30 @@ class Buoy:
                 if isinstance(data, BuoyData):
                     self._update_past(data)
 
+    def history(self, start=None, end=None):
+        '''Get the past and present data in a time range.
+
+        :param start: Epoch time of the start of the range (inclusive), None for the oldest
+        :param end: Epoch time of the end of the range (inclusive), None for the newest
+        :return: list of BuoyData objects from oldest to newest
+        '''
+        history = self._past.slice(start, end)
+
+        if self._present:
+            epoch_time = self._present.epoch_time
+            if (start is None or start <= epoch_time) and (end is None or epoch_time <= end):
+                history.append(self._present)
+
+        return history
+
     def _update_past(self, past_data):
         '''Attempt to update the past data, but make sure that this particular
         NOAA data does not already have a time entry that matches.
 
-        :param p: Buoy Data attempting to be added to the past information.
+        :param past_data: Buoy Data attempting to be added to the past information.
         '''
-        data = next((x for x in self._past if x.epoch_time == past_data.epoch_time), None)
-
-        if not data:
-            self._past.append(past_data)
+        if isinstance(past_data, BuoyData):
+            self._past.add(past_data.freeze())
 
     def __str__(self):
         '''If the location of this buoy is known return the location and the name,
@@ -192,4 +217,4 @@ class Buoy:
             self._location = Point.from_json(buoy_dict["location"])
         
         if "data" in buoy_dict and buoy_dict["data"]:
-            self._present = BuoyData.from_json(buoy_dict["data"])
+            self._present = BuoyData.from_json(buoy_dict["data"]).freeze()
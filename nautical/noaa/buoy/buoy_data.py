@@ -1,3 +1,4 @@
+from copy import deepcopy
 from datetime import datetime, timezone
 from typing import Dict, Any
 from nautical.log import get_logger
@@ -46,6 +47,36 @@ buoy_vars = [
 ]
 
 
+# Units of the variables that have units. Values read from the realtime files are
+# converted from `nautical.io.realtime.realtime_units` to these units.
+buoy_units = {
+    "wspd": SpeedUnits.KNOTS,
+    "gst": SpeedUnits.KNOTS,
+    "wvht": DistanceUnits.FEET,
+    "dpd": TimeUnits.SECONDS,
+    "apd": TimeUnits.SECONDS,
+    "pres": PressureUnits.PSI,
+    "ptdy": PressureUnits.PSI,
+    "atmp": TemperatureUnits.DEG_F,
+    "wtmp": TemperatureUnits.DEG_F,
+    "dewp": TemperatureUnits.DEG_F,
+    "sal": SalinityUnits.PSU,
+    "vis": DistanceUnits.NAUTICAL_MILES,
+    "tide": DistanceUnits.FEET,
+    "swh": DistanceUnits.FEET,
+    "swp": TimeUnits.SECONDS,
+    "wwh": DistanceUnits.FEET,
+    "wwp": TimeUnits.SECONDS,
+    "otmp": TemperatureUnits.DEG_F,
+    "wspd10m": SpeedUnits.KNOTS,
+    "wspd20m": SpeedUnits.KNOTS,
+    "depth": DistanceUnits.FEET,
+}
+
+# Variables that are stored as integers, all other numeric values are stored as floats
+_int_vars = frozenset(('year', 'mm', 'dd'))
+
+
 def _find_parameter_units(key: str) -> str:
     '''Function that will attempt to find the units associated 
     with the key. If no units are found, None is returned.
@@ -53,29 +84,31 @@ def _find_parameter_units(key: str) -> str:
     :param key: Name of the parameter
     :return: string of the type of units if there are units associated with the parameter.
     '''
-    return {
-        "wspd": SpeedUnits.KNOTS,
-        "gst": SpeedUnits.KNOTS,
-        "wvht": DistanceUnits.FEET,
-        "dpd": TimeUnits.SECONDS,
-        "apd": TimeUnits.SECONDS,
-        "pres": PressureUnits.PSI,
-        "ptdy": PressureUnits.PSI,
-        "atmp": TemperatureUnits.DEG_F,
-        "wtmp": TemperatureUnits.DEG_F,
-        "dewp": TemperatureUnits.DEG_F,
-        "sal": SalinityUnits.PSU,
-        "vis": DistanceUnits.NAUTICAL_MILES,
-        "tide": DistanceUnits.FEET,
-        "swh": DistanceUnits.FEET,
-        "swp": TimeUnits.SECONDS,
-        "wwh": DistanceUnits.FEET,
-        "wwp": TimeUnits.SECONDS,
-        "otmp": TemperatureUnits.DEG_F,
-        "wspd10m": SpeedUnits.KNOTS,
-        "wspd20m": SpeedUnits.KNOTS,
-        "depth": DistanceUnits.FEET,
-    }.get(key, None)
+    return buoy_units.get(key, None)
+
+
+def _convert_value(key, value):
+    '''Convert a value to the type that is stored in BuoyData. Numeric strings
+    are converted to float (int for the date), strings that are not numeric
+    (ex. wind direction NNE) are kept. Time strings are converted to NauticalTime.
+
+    :param key: the internal variable name
+    :param value: the value to convert
+    :return: the converted value, None when the value is not available
+    '''
+    if not isinstance(value, str):
+        return value
+
+    value = value.strip()
+    if UNAVAILABLE_NOAA_DATA == value:
+        return None
+    if "time" == key:
+        return convert_noaa_time(value)
+
+    try:
+        return int(value) if key in _int_vars else float(value)
+    except ValueError:
+        return value
 
 
 class BuoyData:
@@ -84,59 +117,86 @@ class BuoyData:
     point for a buoy. A buoy can also include weather stations.
     '''
 
-    __slots__ = buoy_vars
+    # The epoch time is cached along with the date and time used to compute it
+    __slots__ = buoy_vars + ['_epoch_key', '_epoch_time']
 
-    def __init__(self):
+    def __init__(self, timestamp: datetime = None):
+        '''
+        :param timestamp: Date and time used to initialize the data [default is now].
+        The minutes are rounded down to the half hour.
+        '''
         # initialize all slots to None
-        for slot in self.__slots__:
+        for slot in buoy_vars:
             setattr(self, slot, None)
+        self._epoch_key = None
+        self._epoch_time = 0
 
         # set the time for this buoy data to NOW
-        self.year = int(datetime.now().year)
-        # pylint: disable=invalid-name
-        self.mm = int(datetime.now().month)
-        # pylint: disable=invalid-name
-        self.dd = int(datetime.now().day)
+        self._set_date_time(timestamp or datetime.now(), missing_only=False)
 
-        # initialize the time in the case of Present data, we can always correct this later
-        self.time = NauticalTime(fmt=TimeFormat.HOUR_24)
-        self.time.minutes = 30 if int(datetime.now().minute) > 30 else 0
-        self.time.hours = int(datetime.now().hour)
+    def _set_date_time(self, timestamp, missing_only=True):
+        '''Set the date and time from the timestamp. The time is initialized
+        in the case of Present data, we can always correct this later.
+
+        :param timestamp: datetime object
+        :param missing_only: When True, only the values that are not set are changed
+        '''
+        if not missing_only or self.year is None:
+            self.year = timestamp.year
+        if not missing_only or self.mm is None:
+            # pylint: disable=invalid-name
+            self.mm = timestamp.month
+        if not missing_only or self.dd is None:
+            # pylint: disable=invalid-name
+            self.dd = timestamp.day
+        if not missing_only or self.time is None:
+            self.time = NauticalTime(fmt=TimeFormat.HOUR_24)
+            self.time.minutes = 30 if timestamp.minute > 30 else 0
+            self.time.hours = timestamp.hour
 
     @property
     def epoch_time(self):
         '''Epoch time property. Converts the nautical time to the epoch time. 
-        The function assumes that the data is in UTC time. 
+        The function assumes that the data is in UTC time. The result is cached
+        until the date or time changes.
 
         :return: Seconds since the epoch in UTC, 0 on failure
         '''
-        if self.year and self.mm and self.dd and self.time:
+        nautical_time = self.time
+        if self.year and self.mm and self.dd and nautical_time:
+            hours = nautical_time.hours
+            key = (self.year, self.mm, self.dd, hours, nautical_time.minutes)
+            if key == self._epoch_key:
+                return self._epoch_time
+
             # convert the hours values based on the time format
-            hours = self.time.hours
             if isinstance(hours, tuple):
                 if hours[1] == Midday.PM and hours[0] < 12:
                     hours = hours[0] + 12
                 else:
                     hours = hours[0]
             # convert the time using datetime, set the timezone to UTC
-            return int(datetime(
-                self.year, self.mm, self.dd, hours, self.time.minutes
-            ).replace(tzinfo=timezone.utc).timestamp())
+            self._epoch_time = int(datetime(
+                self.year, self.mm, self.dd, hours, nautical_time.minutes, tzinfo=timezone.utc
+            ).timestamp())
+            self._epoch_key = key
+            return self._epoch_time
         return 0
 
     def __contains__(self, item):
         '''Returns True when the value exists and is set'''
-        return item in self.__slots__ and \
+        return item in buoy_vars and \
             getattr(self, item, None) is not None
 
     def __iter__(self):
         '''Provide a user friendly mapping of variable names to values stored 
         in this Buoy Data Object
         '''
-        for slot in self.__slots__:
+        for slot in buoy_vars:
             val = getattr(self, slot, None)
 
-            if val:
+            # numeric values of 0 are valid data
+            if val is not None and val != "":
                 yield slot, val
     
     def to_json(self):
@@ -148,24 +208,97 @@ class BuoyData:
     
     @staticmethod
     def from_json(json_data):
-        '''Fill an instance from the json_data.'''
-        bd = BuoyData()
-        bd.from_dict(json_data)
+        '''Fill an instance from the json_data. The date and time that are not
+        found in the json_data are set to now.
+        '''
+        bd = BuoyData.from_values(json_data)
+        if None in (bd.year, bd.mm, bd.dd, bd.time):
+            bd._set_date_time(datetime.now())
         return bd
 
+    @classmethod
+    def from_values(cls, values):
+        '''Create an instance in a single call. Unlike the constructor, the date
+        and time are NOT initialized to now, all variables that are not provided are None.
+        Values are handled the same as `set`. When called on `FrozenBuoyData` the read-only
+        snapshot is created directly and the time is frozen (see `NauticalTime.freeze`).
+
+        :param values: Dictionary where the keys match the variable names in `buoy_vars`
+        (unknown keys are ignored), or a tuple/list containing a value for every variable
+        in the order of `buoy_vars`.
+        :return: BuoyData (or FrozenBuoyData)
+        :raises ValueError: when the number of values does not match `buoy_vars`
+        '''
+        if isinstance(values, dict):
+            values = [values.get(var, None) for var in buoy_vars]
+        elif len(values) != len(buoy_vars):
+            raise ValueError(f"{cls.__name__} expected {len(buoy_vars)} values, found {len(values)}")
+
+        buoy_data = cls.__new__(cls)
+        frozen = issubclass(cls, FrozenBuoyData)
+        for var, value in zip(buoy_vars, values):
+            if isinstance(value, str):
+                value = _convert_value(var, value)
+            if var == "time":
+                if not isinstance(value, NauticalTime):
+                    value = None
+                elif frozen:
+                    value = value.freeze()
+            object.__setattr__(buoy_data, var, value)
+
+        buoy_data._epoch_key = None
+        buoy_data._epoch_time = 0
+        return buoy_data
+
     def from_dict(self, buoy_data_dict: Dict[str, Any]):
         '''Fill this object from the data stored in a dictionary where 
         the key should match a slot or object variable
 
         :param buoy_data_dict: Dictionary containing the data about this buoy
         '''
-        for key, value in buoy_data_dict.items():
-            self.set(key, value)
+        self.set_values(buoy_data_dict)
+
+    def copy(self):
+        '''Create a mutable copy of this instance. The time is copied so that
+        changes to the copy do not change this instance.
+
+        :return: BuoyData
+        '''
+        buoy_data = BuoyData.__new__(BuoyData)
+        for slot in BuoyData.__slots__:
+            setattr(buoy_data, slot, getattr(self, slot, None))
+        if buoy_data.time is not None:
+            buoy_data.time = buoy_data.time.copy()
+        return buoy_data
+
+    def freeze(self):
+        '''Create a read-only snapshot of this instance. The snapshot can be
+        shared without copying, use `copy` to create a mutable copy of the snapshot.
+        The time of the snapshot is also read-only (see `NauticalTime.freeze`).
+
+        :return: FrozenBuoyData
+        '''
+        frozen = FrozenBuoyData.__new__(FrozenBuoyData)
+        for slot in BuoyData.__slots__:
+            object.__setattr__(frozen, slot, getattr(self, slot, None))
+        if frozen.time is not None:
+            object.__setattr__(frozen, "time", frozen.time.freeze())
+        return frozen
+
+    @staticmethod
+    def get_units(key):
+        '''Get the units of a variable, see `buoy_units`.
+
+        :param key: the internal variable name
+        :return: units of the variable, None when the variable has no units
+        '''
+        return buoy_units.get(key, None)
 
     def set(self, key, value):
         '''Set a key, value pair. This function is intended to replace
         `__setattr__` for simplcity. The function will also attempt to convert
-        the noaa time to a formatted time that is readable.
+        the noaa time to a formatted time that is readable, and numeric strings
+        to numbers so that the values are only parsed once.
 
         :param key: the internal variable name
         :param value: the value we wish to set the variable to
@@ -180,6 +313,55 @@ class BuoyData:
                 setattr(self, key, value)
         else:
             try:
-                setattr(self, key, value)
+                setattr(self, key, _convert_value(key, value))
             except AttributeError as error:
                 log.warning(error)
+
+    def set_values(self, values):
+        '''Set many key, value pairs. See `set` for more information.
+
+        :param values: Dictionary or iterable of (key, value) pairs
+        '''
+        items = values.items() if isinstance(values, dict) else values
+        for key, value in items:
+            self.set(key, value)
+
+
+class FrozenBuoyData(BuoyData):
+
+    '''Read-only snapshot of `BuoyData` (see `BuoyData.freeze`). The snapshot
+    and its time (`FrozenNauticalTime`) cannot be changed, so it is shared rather than copied.
+    '''
+
+    __slots__ = ()
+
+    def __setattr__(self, key, value):
+        '''Only the cached epoch time may be set
+
+        :raises AttributeError: when setting any variable
+        '''
+        if key in ('_epoch_key', '_epoch_time'):
+            object.__setattr__(self, key, value)
+        else:
+            raise AttributeError(f"{self.__class__.__name__} is read-only, use copy()")
+
+    def __delattr__(self, key):
+        raise AttributeError(f"{self.__class__.__name__} is read-only, use copy()")
+
+    def __copy__(self):
+        '''The snapshot is read-only, there is no need to copy it'''
+        return self
+
+    def __deepcopy__(self, memo):
+        return deepcopy(self.copy(), memo).freeze()
+
+    def __reduce__(self):
+        return BuoyData.freeze, (self.copy(), )
+
+    def freeze(self):
+        '''The instance is already a read-only snapshot'''
+        return self
+
+    def set(self, key, value):
+        '''See `__setattr__`'''
+        raise AttributeError(f"{self.__class__.__name__} is read-only, use copy()")
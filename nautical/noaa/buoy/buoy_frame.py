@@ -0,0 +1,209 @@
+from datetime import datetime, timezone
+import numpy as np
+from nautical.log import get_logger
+from nautical.time.nautical_time import NauticalTime
+from nautical.time.enums import TimeFormat
+from .buoy import Buoy
+from .buoy_data import BuoyData, buoy_vars
+
+
+log = get_logger()
+
+# The date and time variables are stored in the epoch time column
+_time_vars = ('year', 'mm', 'dd', 'time')
+
+# Variables stored as float64 columns. Values that are missing or that are
+# not numeric (ex. wind direction NNE) are stored as NaN.
+frame_vars = [var for var in buoy_vars if var not in _time_vars]
+
+# Default number of rows allocated when a frame is created
+DEFAULT_FRAME_CAPACITY = 1024
+
+
+def _as_float(value):
+    '''Convert the value to a float, NaN when the value is missing or not numeric'''
+    if value is None:
+        return np.nan
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+class BuoyFrame:
+
+    '''Columnar store for the observations of many buoys. Each variable in
+    `frame_vars` is stored in a contiguous float64 array (NaN when missing)
+    along with a station column and an epoch time column. Columns are returned
+    as read-only views of the underlying arrays, so reading a column does not
+    copy the data.
+    '''
+
+    def __init__(self, capacity: int = DEFAULT_FRAME_CAPACITY) -> None:
+        '''
+        :param capacity: Number of rows initially allocated. The frame grows
+        as rows are appended.
+        '''
+        self._size = 0
+        self._capacity = max(int(capacity), 1)
+        self._stations = np.empty(self._capacity, dtype=object)
+        self._epoch_time = np.zeros(self._capacity, dtype=np.int64)
+        self._columns = {var: np.full(self._capacity, np.nan) for var in frame_vars}
+
+    def __len__(self):
+        '''Number of rows (observations) in the frame'''
+        return self._size
+
+    def __contains__(self, item):
+        '''True when the item is the name of a column'''
+        return item in self.columns
+
+    def __getitem__(self, name):
+        '''See `column`'''
+        return self.column(name)
+
+    @property
+    def columns(self):
+        '''Names of all columns in the frame'''
+        return ["station", "epoch_time"] + frame_vars
+
+    @property
+    def stations(self):
+        '''Read-only view of the station column'''
+        return self.column("station")
+
+    @property
+    def epoch_time(self):
+        '''Read-only view of the epoch time column'''
+        return self.column("epoch_time")
+
+    def column(self, name):
+        '''Get a column of the frame. The column is a view of the frame data
+        and is not copied; the view is read-only.
+
+        :param name: station, epoch_time or a name in `frame_vars`
+        :return: numpy array containing a value for every row
+        :raises KeyError: when the column does not exist
+        '''
+        if name == "station":
+            data = self._stations
+        elif name == "epoch_time":
+            data = self._epoch_time
+        else:
+            data = self._columns[name]
+
+        view = data[:self._size]
+        view.flags.writeable = False
+        return view
+
+    def _reserve(self, size):
+        '''Make sure that the frame can hold `size` rows. The capacity is doubled
+        so that appending rows is amortized constant time.
+        '''
+        if size <= self._capacity:
+            return
+
+        capacity = self._capacity
+        while capacity < size:
+            capacity *= 2
+
+        def _grow(array, fill):
+            grown = np.full(capacity, fill, dtype=array.dtype)
+            grown[:self._size] = array[:self._size]
+            return grown
+
+        self._stations = _grow(self._stations, None)
+        self._epoch_time = _grow(self._epoch_time, 0)
+        self._columns = {var: _grow(array, np.nan) for var, array in self._columns.items()}
+        self._capacity = capacity
+
+    def append(self, station, buoy_data):
+        '''Append a single observation to the frame.
+
+        :param station: ID of the station that made the observation
+        :param buoy_data: BuoyData for the observation
+        :return: True when the observation was appended
+        '''
+        if not isinstance(buoy_data, BuoyData):
+            log.warning("Skipping observation for %s, expected BuoyData", station)
+            return False
+
+        self._reserve(self._size + 1)
+
+        index = self._size
+        self._stations[index] = station
+        self._epoch_time[index] = buoy_data.epoch_time
+        for var, array in self._columns.items():
+            array[index] = _as_float(getattr(buoy_data, var, None))
+
+        self._size += 1
+        return True
+
+    def extend(self, observations):
+        '''Append many observations to the frame.
+
+        :param observations: Iterable of `Buoy` objects (the present data is
+        appended) or tuples of (station, BuoyData)
+        :return: Number of observations appended
+        '''
+        observations = list(observations)
+        self._reserve(self._size + len(observations))
+
+        num_appended = 0
+        for observation in observations:
+            if isinstance(observation, Buoy):
+                appended = self.append(observation.station, observation.present)
+            else:
+                appended = self.append(*observation)
+            num_appended += int(appended)
+
+        return num_appended
+
+    def row(self, index):
+        '''Create a BuoyData from a row of the frame.
+
+        :param index: Index of the row
+        :return: Tuple of (station, BuoyData)
+        :raises IndexError: when the index is out of range
+        '''
+        if not -self._size <= index < self._size:
+            raise IndexError(f"{self.__class__.__name__} index {index} out of range")
+        index %= self._size
+
+        timestamp = datetime.fromtimestamp(int(self._epoch_time[index]), tz=timezone.utc)
+        nautical_time = NauticalTime(fmt=TimeFormat.HOUR_24)
+        nautical_time.hours = timestamp.hour
+        nautical_time.minutes = timestamp.minute
+
+        values = {
+            var: float(array[index]) for var, array in self._columns.items()
+            if not np.isnan(array[index])
+        }
+        values.update(year=timestamp.year, mm=timestamp.month, dd=timestamp.day, time=nautical_time)
+
+        return self._stations[index], BuoyData.from_values(values)
+
+    @classmethod
+    def from_buoys(cls, buoys):
+        '''Create a frame from the present data of the buoys. Buoys without
+        present data are skipped.
+
+        :param buoys: Iterable of Buoy objects
+        :return: BuoyFrame
+        '''
+        buoys = [buoy for buoy in buoys if buoy.present is not None]
+        frame = cls(capacity=len(buoys))
+        frame.extend(buoys)
+        return frame
+
+    @classmethod
+    def from_sources(cls, sources):
+        '''Create a frame from the present data of every buoy in the sources.
+
+        :param sources: Dictionary in the format of source_name: source
+        (see `nautical.io.sources.get_buoy_sources`)
+        :return: BuoyFrame
+        '''
+        return cls.from_buoys(
+            buoy for source in sources.values() if source is not None for buoy in source
+        )
@@ -0,0 +1,169 @@
+from nautical.log import get_logger
+from .buoy_data import BuoyData
+
+
+log = get_logger()
+
+# Default number of BuoyData objects kept in a history
+DEFAULT_HISTORY_CAPACITY = 1000
+
+# Initial size of the ring buffers, the buffers grow up to the capacity
+_MIN_BUFFER_SIZE = 8
+
+
+class BuoyHistory:
+
+    '''History of the observations for a buoy. The observations are kept sorted
+    by epoch time so that duplicates are found and time ranges are sliced in
+    O(log n). The history is bounded, when the capacity is reached the oldest
+    observation is evicted.
+
+    The observations are kept in ring buffers (grown up to the capacity), so
+    adding the newest observation and evicting the oldest are O(1). An observation
+    added out of order moves the observations between it and the closest end of
+    the history, O(min(k, n - k)) for an observation at position k.
+    '''
+
+    def __init__(self, capacity: int = DEFAULT_HISTORY_CAPACITY) -> None:
+        '''
+        :param capacity: Max number of observations kept in the history. None
+        indicates that the history is not bounded.
+        '''
+        if capacity is not None and capacity < 1:
+            raise ValueError(f"Invalid capacity provided to {self.__class__.__name__}")
+        self.capacity = capacity
+
+        # Epoch times are stored separately so the BuoyData times are only computed on insert
+        self._times = []
+        self._data = []
+        # position of the oldest observation in the buffers and number of observations
+        self._start = 0
+        self._size = 0
+
+    def __len__(self):
+        '''Number of observations in the history'''
+        return self._size
+
+    def __iter__(self):
+        '''Yield the observations from oldest to newest'''
+        yield from self._range(self._data, 0, self._size)
+
+    def __contains__(self, item):
+        '''True when an observation exists at the epoch time of the item.
+
+        :param item: BuoyData or epoch time
+        '''
+        epoch_time = item.epoch_time if isinstance(item, BuoyData) else item
+        index = self._bisect(epoch_time)
+        return index < self._size and self._times[self._slot(index)] == epoch_time
+
+    def _slot(self, index):
+        '''Position in the buffers of the observation at an index (0 is the oldest)'''
+        return (self._start + index) % len(self._times)
+
+    def _range(self, buffer, low, high):
+        '''Get the values of a buffer from the index low (inclusive) to high (exclusive)'''
+        if low >= high:
+            return []
+        first = self._slot(low)
+        last = first + high - low
+        if last <= len(buffer):
+            return buffer[first:last]
+        return buffer[first:] + buffer[:last - len(buffer)]
+
+    def _bisect(self, epoch_time, right=False):
+        '''Binary search of the epoch times, see `bisect.bisect_left` and `bisect.bisect_right`'''
+        low, high = 0, self._size
+        while low < high:
+            middle = (low + high) // 2
+            value = self._times[self._slot(middle)]
+            if value < epoch_time or (right and value == epoch_time):
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _grow(self):
+        '''Double the size of the buffers (up to the capacity), the oldest observation
+        is moved to the start of the buffers.
+        '''
+        size = max(2 * len(self._times), _MIN_BUFFER_SIZE)
+        if self.capacity is not None:
+            size = min(size, self.capacity)
+
+        padding = [None] * (size - self._size)
+        self._times = self._range(self._times, 0, self._size) + padding
+        self._data = self._range(self._data, 0, self._size) + padding
+        self._start = 0
+
+    def _insert(self, index, epoch_time, buoy_data):
+        '''Insert an observation, the buffers must contain a free slot. The observations
+        on the shorter side of the index are moved by one slot.
+        '''
+        if index < self._size - index:
+            # move the older observations back, the oldest moves to the free slot before the start
+            self._start = (self._start - 1) % len(self._times)
+            moved = range(index)
+            step = 1
+        else:
+            moved = range(self._size, index, -1)
+            step = -1
+
+        for position in moved:
+            slot, previous = self._slot(position), self._slot(position + step)
+            self._times[slot] = self._times[previous]
+            self._data[slot] = self._data[previous]
+
+        slot = self._slot(index)
+        self._times[slot] = epoch_time
+        self._data[slot] = buoy_data
+        self._size += 1
+
+    def add(self, buoy_data):
+        '''Add an observation to the history. Observations with the same
+        epoch time as an existing observation are not added.
+
+        :param buoy_data: BuoyData to add
+        :return: True when the observation was added
+        '''
+        if not isinstance(buoy_data, BuoyData):
+            return False
+
+        epoch_time = buoy_data.epoch_time
+        index = self._bisect(epoch_time)
+        if index < self._size and self._times[self._slot(index)] == epoch_time:
+            return False
+
+        if self.capacity is not None and self._size >= self.capacity:
+            if index == 0:
+                log.debug("History is full, observation at %d is older than the history", epoch_time)
+                return False
+
+            # evict the oldest observation
+            self._times[self._start] = self._data[self._start] = None
+            self._start = (self._start + 1) % len(self._times)
+            self._size -= 1
+            index -= 1
+        elif self._size == len(self._times):
+            self._grow()
+
+        self._insert(index, epoch_time, buoy_data)
+        return True
+
+    def slice(self, start=None, end=None):
+        '''Get the observations in a time range.
+
+        :param start: Epoch time of the start of the range (inclusive), None for the oldest
+        :param end: Epoch time of the end of the range (inclusive), None for the newest
+        :return: List of BuoyData from oldest to newest
+        '''
+        low = 0 if start is None else self._bisect(start)
+        high = self._size if end is None else self._bisect(end, right=True)
+        return self._range(self._data, low, high)
+
+    def clear(self):
+        '''Remove all observations from the history'''
+        self._times = []
+        self._data = []
+        self._start = 0
+        self._size = 0
@@ -64,6 +64,8 @@ class Source:
 
         # Each buoy should have a unique name to use as the key
         self._buoys = {}
+        # Index of station mapped to the buoys with the station (Ships share a station)
+        self._stations = {}
 
     def __len__(self):
         '''Return the number of buoys in this source'''
@@ -81,6 +83,7 @@ class Source:
             for key, value in self.__dict__.items() if not key.startswith("_")
         }
         source_dict["_buoys"] = {}
+        source_dict["_stations"] = {}
         log.info("Making copy of %s with dict %s", str(self.__class__.__name__), source_dict)
         result.__dict__.update(source_dict)
         return result
@@ -110,7 +113,7 @@ class Source:
         '''Determine if the item buoy exists in our dictionary.
         When `item` is a `Buoy`, check if the hash of the item is in the dict. 
         when `item` is an int, assume this is the hash and check for it in the dict.
-        When `item` is a str, assume this is the station name check if its in the dict.
+        When `item` is a str, assume this is the station name check if its in the index.
 
         :param item: should be a Buoy, String or int
         :return: True when the item is found in this instance.
@@ -120,7 +123,7 @@ class Source:
         if isinstance(item, int):
             return item in self._buoys
         if isinstance(item, str):
-            return next((True for k, v in self._buoys.items() if item == v.station), False)
+            return item in self._stations
         return False
 
     def __iter__(self):
@@ -153,6 +156,16 @@ class Source:
         '''
         return self._buoys.copy()
 
+    @property
+    def stations(self):
+        '''Stations Property for this instance. The result is a set like view
+        that can be used to check the membership of many stations at once
+        (ex. `source.stations & {"44099", "44072"}`).
+
+        :return: View of the stations contained in this instance
+        '''
+        return self._stations.keys()
+
     def add_buoy(self, buoy):
         '''Add a buoy to this instance
 
@@ -163,9 +176,18 @@ class Source:
         '''
         if buoy not in self:
             self._buoys[hash(buoy)] = buoy
+            self._stations.setdefault(buoy.station, []).append(buoy)
             return True
         return False
 
+    def add_buoys(self, buoys):
+        '''Add many buoys to this instance. See `add_buoy` for more information.
+
+        :param buoys: Iterable of buoys to be added to the list of buoys.
+        :return: Number of buoys that were added
+        '''
+        return sum(int(self.add_buoy(buoy)) for buoy in buoys)
+
     def get_buoy(self, station):
         '''Get a buoy where the station matches the `station` of the Buoy
 
@@ -174,7 +196,18 @@ class Source:
         :param station: name of the buoy station
         :return: Buoy with a matching station, None if one was not found.
         '''
-        return next((v for k, v in self._buoys.items() if v.station == station), None)
+        buoys = self._stations.get(station, None)
+        return buoys[0] if buoys else None
+
+    def get_buoys(self, stations):
+        '''Get the buoys where the station matches each of the `stations`.
+        See `get_buoy` for more information.
+
+        :param stations: Iterable of buoy stations
+        :return: List of Buoy objects in the same order as the stations, None
+        when a station was not found.
+        '''
+        return [self.get_buoy(station) for station in stations]
 
     def to_json(self):
         '''Convert this instance to a json dictionary'''
@@ -205,5 +238,4 @@ class Source:
 
         if "buoys" in source_dict:
             for buoy_json in source_dict["buoys"]:
-                buoy = Buoy.from_json(buoy_json)
-                self._buoys[buoy.station] = buoy
+                self.add_buoy(Buoy.from_json(buoy_json))
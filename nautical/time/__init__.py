@@ -1,5 +1,5 @@
 from .conversion import convert_noaa_time
-from .nautical_time import NauticalTime
+from .nautical_time import FrozenNauticalTime, NauticalTime
 from .enums import Midday, TimeFormat
 from .ops import get_time_diff, get_current_time, get_time_str
 
@@ -9,6 +9,7 @@ __all__ = [
     "Midday",
     "TimeFormat",
     "NauticalTime",
+    "FrozenNauticalTime",
     "get_time_diff",
     "get_current_time",
     "get_time_str"
@@ -99,6 +99,27 @@ class NauticalTime:
             else:
                 self._hours = hours
 
+    def copy(self):
+        '''Create a mutable copy of this instance.
+
+        :return: NauticalTime
+        '''
+        nautical_time = NauticalTime.__new__(NauticalTime)
+        for slot in NauticalTime.__slots__:
+            object.__setattr__(nautical_time, slot, getattr(self, slot))
+        return nautical_time
+
+    def freeze(self):
+        '''Create a read-only snapshot of this instance. The snapshot can be
+        shared without copying, use `copy` to create a mutable copy of the snapshot.
+
+        :return: FrozenNauticalTime
+        '''
+        frozen = FrozenNauticalTime.__new__(FrozenNauticalTime)
+        for slot in NauticalTime.__slots__:
+            object.__setattr__(frozen, slot, getattr(self, slot))
+        return frozen
+
     def __str__(self):
         '''Return the 24 hour version of the hour and minutes. This class does not
         deal in seconds as the seconds are not provided by NOAA.
@@ -108,5 +129,36 @@ class NauticalTime:
         hours, midday = self.hours if isinstance(self.hours, tuple) else self.hours, None
         if midday in (Midday.PM,):
             hours = hours + 12
-        return f"{hours:02d}:{self.minutes:02d}:00" 
+        return f"{hours:02d}:{self.minutes:02d}:00"
+
+
+class FrozenNauticalTime(NauticalTime):
+
+    '''Read-only snapshot of `NauticalTime` (see `NauticalTime.freeze`). The snapshot
+    cannot be changed, so it is shared rather than copied.
+    '''
+
+    __slots__ = ()
+
+    def __setattr__(self, key, value):
+        '''
+        :raises AttributeError: when setting any variable
+        '''
+        raise AttributeError(f"{self.__class__.__name__} is read-only, use copy()")
+
+    def __delattr__(self, key):
+        raise AttributeError(f"{self.__class__.__name__} is read-only, use copy()")
+
+    def __copy__(self):
+        '''The snapshot is read-only, there is no need to copy it'''
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        return NauticalTime.freeze, (self.copy(), )
 
+    def freeze(self):
+        '''The instance is already a read-only snapshot'''
+        return self
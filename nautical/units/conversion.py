@@ -17,13 +17,15 @@ TimeLookup = {
     TimeUnits.DAYS: 86400.0   # seconds per day
 }
 
+# Exact number of centimeters in each unit of distance. This table is also
+# used for the units of the distances between points (`nautical.location`).
 DistanceLookup = {
     DistanceUnits.CENTIMETERS: 1.0,
     DistanceUnits.FEET: 30.48,              # cm per feet
     DistanceUnits.YARDS: 91.44,             # cm per yard
     DistanceUnits.METERS: 100.0,            # cm per meter
     DistanceUnits.KILOMETERS: 100000.0,     # cm per km
-    DistanceUnits.MILES: 160934.0,          # cm per mile
+    DistanceUnits.MILES: 160934.4,          # cm per mile
     DistanceUnits.NAUTICAL_MILES: 185200.0  # cm per nautical mile
 }
 
@@ -43,7 +45,8 @@ PressureLookup = {
     PressureUnits.AT: 1.02 * (10**-5),
     PressureUnits.BA: 10,
     PressureUnits.PSI: 1.45 * (10**-4),
-    PressureUnits.HG: 7.5 * (10**-3)
+    PressureUnits.HG: 7.5 * (10**-3),
+    PressureUnits.HPA: 10**-2
 }
 
 
@@ -120,9 +123,8 @@ def convert_pressure(value, init_units, final_units):
     :return: value converted from the initial units to the final units
     '''
     try:
-        # speed works a bit the opposite we want to divide then multiply
-        # instead of the normal multiplication then division
-        return value / PressureLookup[init_units] * PressureUnits[final_units]
+        # the lookup contains the value of 1 Pa in each unit, divide then multiply
+        return value / PressureLookup[init_units] * PressureLookup[final_units]
     except KeyError as key_error:
         log.error(key_error)
         raise 
@@ -55,6 +55,7 @@ class PressureUnits(Enum):
     BA = 6    # Barad 
     PSI = 7   # Pound per square inch (American) - Default
     HG = 8    # Mercury - manometric units (water influence)
+    HPA = 9   # Hectopascals (millibars), used by the NOAA realtime data
 
 
 class SalinityUnits(Enum):
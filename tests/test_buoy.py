@@ -1,9 +1,13 @@
 from copy import copy, deepcopy
+import pickle
 import pytest
 from uuid import uuid4
-from nautical.location import Point
-from nautical.noaa.buoy import SourceType, Source, Buoy, BuoyData
-from nautical.time import NauticalTime
+import numpy as np
+from nautical.location import Point, SpatialIndex
+from nautical.noaa.buoy.buoy_data import FrozenBuoyData, buoy_vars
+from nautical.noaa.buoy import SourceType, Source, Buoy, BuoyData, BuoyFrame, BuoyHistory
+from nautical.time import NauticalTime, TimeFormat
+from nautical.units import SpeedUnits
 from datetime import datetime, timezone
 
 
@@ -383,5 +387,321 @@ def test_source_json_missing_name():
         source = Source.from_json(original_json)
     
 
+def test_buoy_data_numeric_values():
+    '''Test that numeric strings are converted once when set, and
+    that other strings are kept
+    '''
+    buoy_data = BuoyData()
+    buoy_data.set_values([("wspd", " 9.7 "), ("wdir", "NNE"), ("year", "2022"), ("wvht", "-")])
+    buoy_data.set_values({"gst": 0, "atmp": "64.0"})
+
+    assert buoy_data.wspd == 9.7
+    assert buoy_data.wdir == "NNE"
+    assert buoy_data.year == 2022 and isinstance(buoy_data.year, int)
+    assert buoy_data.wvht is None
+    assert buoy_data.atmp == 64.0
+    # numeric values of 0 are valid
+    assert dict(buoy_data)["gst"] == 0
+
+    assert BuoyData.get_units("wspd") == SpeedUnits.KNOTS
+    assert BuoyData.get_units("wdir") is None
+    assert BuoyData.from_values({"wspd": "1.5"}).wspd == 1.5
+
+
+def test_buoy_data_from_values():
+    '''Test creating BuoyData in a single call from a dictionary or tuple'''
+    values = {"year": 2022, "mm": 10, "dd": 18, "time": "09:34:00", "wspd": 10.2,
+              "wvht": "-", "unknown": 1}
+    buoy_data = BuoyData.from_values(values)
+    assert buoy_data.wspd == 10.2
+    assert buoy_data.wvht is None
+    assert buoy_data.time.minutes == 34
+
+    same = BuoyData.from_values(tuple(getattr(buoy_data, var) for var in buoy_vars))
+    assert same.epoch_time == buoy_data.epoch_time
+
+    # the date and time are not initialized to now
+    assert BuoyData.from_values({}).epoch_time == 0
+
+    with pytest.raises(ValueError):
+        BuoyData.from_values((1, 2, 3))
+
+
+def test_buoy_data_epoch_time_cached():
+    '''Test that the cached epoch time is updated when the date or time changes'''
+    buoy_data = BuoyData(datetime(2022, 10, 18, 9, 45))
+    assert buoy_data.time.minutes == 30
+    expected = datetime(2022, 10, 18, 9, 30, tzinfo=timezone.utc).timestamp()
+    assert buoy_data.epoch_time == expected
+    assert buoy_data.epoch_time == expected
+
+    buoy_data.dd = 19
+    assert buoy_data.epoch_time == expected + 24 * 60 * 60
+
+    buoy_data.time.hours = 10
+    assert buoy_data.epoch_time == expected + 25 * 60 * 60
+
+    copied = copy(buoy_data)
+    copied.year = 2023
+    assert copied.epoch_time > buoy_data.epoch_time
+
+
+def test_buoy_present_read_only():
+    '''Test that the present data and location are shared read-only
+    snapshots and that copies can be changed
+    '''
+    data = BuoyData()
+    data.set("wspd", 10.0)
+    buoy = Buoy("read-only", location=Point(36.0, -75.0))
+    buoy.present = data
+
+    # changes to the original data do not change the buoy
+    data.set("wspd", 11.0)
+    assert buoy.present.wspd == 10.0
+
+    present = buoy.present
+    assert present is buoy.present
+    assert copy(present) is present
+    assert buoy.location is buoy.location
+
+    with pytest.raises(AttributeError):
+        present.wspd = 12.0
+    with pytest.raises(AttributeError):
+        present.set("wspd", 12.0)
+    with pytest.raises(AttributeError):
+        buoy.location.x = 1.0
+
+    mutable = present.copy()
+    mutable.set("wspd", 12.0)
+    mutable.time.hours = (mutable.time.hours + 1) % 24
+    assert buoy.present.wspd == 10.0
+    assert mutable.epoch_time != present.epoch_time
+
+    deep = deepcopy(buoy)
+    assert deep.present.wspd == 10.0
+    assert deep.present is not present
+    assert pickle.loads(pickle.dumps(present)).wspd == 10.0
+
+
+def test_buoy_present_time_read_only():
+    '''Test that the time of the present data cannot be changed'''
+    data = BuoyData()
+    buoy = Buoy("read-only")
+    buoy.present = data
+    present = buoy.present
+    epoch_time = present.epoch_time
+
+    with pytest.raises(AttributeError):
+        present.time.minutes = 5
+    with pytest.raises(AttributeError):
+        present.time.hours = (present.time.hours + 1) % 24
+    assert present.epoch_time == epoch_time
+
+    # the time provided to from_values is not shared with the snapshot
+    nautical_time = NauticalTime(fmt=TimeFormat.HOUR_24)
+    nautical_time.hours = 9
+    frozen = FrozenBuoyData.from_values({"year": 2020, "mm": 1, "dd": 10, "time": nautical_time})
+    nautical_time.hours = 10
+    assert frozen.time.hours == 9
+    with pytest.raises(AttributeError):
+        frozen.time.minutes = 5
+
+    assert copy(frozen.time) is frozen.time
+    assert pickle.loads(pickle.dumps(frozen)).time.hours == 9
+    mutable = frozen.copy()
+    mutable.time.minutes = 5
+    assert frozen.time.minutes == 0
+
+
+def test_source_station_index():
+    '''Test that the station lookups agree before and after a
+    json round trip, including buoys that share a station (Ships)
+    '''
+    source = Source(SourceType.as_strings(SourceType.SHIPS))
+    buoys = [Buoy(str(station)) for station in range(100)]
+    buoys.extend([Buoy("SHIP", "ship one"), Buoy("SHIP", "ship two")])
+    assert source.add_buoys(buoys) == len(buoys)
+    assert source.add_buoys(buoys[:10]) == 0
+
+    for src in (source, Source.from_json(source.to_json())):
+        assert len(src) == 102
+        assert "42" in src
+        assert "missing" not in src
+        assert all(buoy in src for buoy in buoys)
+        assert src.get_buoy("42").station == "42"
+        assert src.get_buoy("SHIP").description == "ship one"
+        assert [buoy.station if buoy else None for buoy in src.get_buoys(["7", "missing", "SHIP"])] == \
+            ["7", None, "SHIP"]
+        assert src.stations & {"1", "2", "missing"} == {"1", "2"}
+
+    assert len(copy(source).stations) == 0
+
+
+def test_spatial_index_from_sources():
+    '''Test indexing the buoys of sources, including Ships that share a station'''
+    ndbc = Source(SourceType.as_strings(SourceType.NDBC_METEOROLOGICAL_OCEAN))
+    ndbc.add_buoys([Buoy("44099", location=Point(36.915, -75.722)),
+                    Buoy("44014", location=Point(36.603, -74.837)),
+                    Buoy("no-location")])
+    ships = Source(SourceType.as_strings(SourceType.SHIPS))
+    ship = Buoy("SHIP", "ship one", Point(36.9, -75.7))
+    ships.add_buoys([ship, Buoy("SHIP", "ship two", Point(10.0, 10.0))])
+
+    index = SpatialIndex.from_sources({ndbc.name: ndbc, ships.name: ships, "missing": None})
+    assert len(index) == 4
+    assert len(SpatialIndex.from_sources([ndbc, ships])) == 4
+
+    nearest = index.nearest(Point(36.915, -75.722), k=3)
+    assert [buoy.description or buoy.station for buoy, _ in nearest] == ["44099", "ship one", "44014"]
+
+    ship.location = Point(0.0, 0.0)
+    index.update(ship)
+    assert [buoy.station for buoy, _ in index.nearest(Point(36.915, -75.722), k=2)] == ["44099", "44014"]
+
+
+def _buoy_data_at(hours):
+    '''Create BuoyData on a fixed day at the hour'''
+    data = BuoyData()
+    data.year, data.mm, data.dd = 2022, 10, 18
+    data.time = NauticalTime(fmt=TimeFormat.HOUR_24)
+    data.time.hours = hours
+    return data
+
+
+def test_buoy_history_rollover():
+    '''Test that setting the present data moves the previous present
+    data to the history and that the history is sliced by time
+    '''
+    buoy = Buoy("history")
+    for hours in range(6):
+        buoy.present = _buoy_data_at(hours)
+
+    with pytest.raises(ValueError):
+        buoy.present = _buoy_data_at(2)
+
+    history = buoy.history()
+    assert [data.time.hours for data in history] == list(range(6))
+    assert history[-1] is buoy._present
+
+    start = _buoy_data_at(2).epoch_time
+    end = _buoy_data_at(4).epoch_time
+    assert [data.time.hours for data in buoy.history(start, end)] == [2, 3, 4]
+    assert [data.time.hours for data in buoy.history(end=start)] == [0, 1, 2]
+
+
+def test_buoy_history_dedupe_and_eviction():
+    '''Test that the history ignores duplicate times, keeps the data sorted
+    and evicts the oldest data when the capacity is reached
+    '''
+    history = BuoyHistory(capacity=3)
+    for hours in (5, 1, 3, 3):
+        history.add(_buoy_data_at(hours))
+
+    assert len(history) == 3
+    assert [data.time.hours for data in history] == [1, 3, 5]
+    assert _buoy_data_at(3) in history
+
+    assert history.add(_buoy_data_at(4))
+    assert [data.time.hours for data in history] == [3, 4, 5]
+
+    # older than everything in a full history
+    assert not history.add(_buoy_data_at(0))
+    assert not history.add(None)
+
+    with pytest.raises(ValueError):
+        BuoyHistory(capacity=0)
+
+
+def test_buoy_history_ring_buffer():
+    '''Test that observations added out of order are sorted after the
+    ring buffers wrap around
+    '''
+    history = BuoyHistory(capacity=10)
+    for hours in range(0, 24, 2):
+        history.add(_buoy_data_at(hours))
+    assert [data.time.hours for data in history] == list(range(4, 24, 2))
+
+    for hours in (21, 7, 13):
+        assert history.add(_buoy_data_at(hours))
+    assert [data.time.hours for data in history] == [8, 10, 12, 13, 14, 16, 18, 20, 21, 22]
+
+    start, end = _buoy_data_at(13).epoch_time, _buoy_data_at(20).epoch_time
+    assert [data.time.hours for data in history.slice(start, end)] == [13, 14, 16, 18, 20]
+
+    history.clear()
+    assert len(history) == 0 and list(history) == []
+
+
+def test_buoy_frame_append_and_columns():
+    '''Test that buoys are appended to the frame and that the
+    columns are read-only views containing NaN for missing values
+    '''
+    buoys = []
+    for index in range(5):
+        buoy = Buoy(f"station{index}")
+        data = BuoyData()
+        data.set("wspd", str(index * 1.5))
+        data.set("wdir", "NNE")
+        if index % 2 == 0:
+            data.set("wvht", index)
+        buoy.present = data
+        buoys.append(buoy)
+    buoys.append(Buoy("no_data"))
+
+    frame = BuoyFrame.from_buoys(buoys)
+    assert len(frame) == 5
+    assert list(frame.stations) == [f"station{index}" for index in range(5)]
+    assert list(frame["wspd"]) == [index * 1.5 for index in range(5)]
+    assert np.isnan(frame["wdir"]).all()
+    assert np.isnan(frame["wvht"]).tolist() == [False, True, False, True, False]
+    assert (frame.epoch_time == buoys[0].present.epoch_time).all()
+
+    column = frame.column("wspd")
+    assert np.shares_memory(column, frame.column("wspd"))
+    with pytest.raises(ValueError):
+        column[0] = 1.0
+
+    with pytest.raises(KeyError):
+        frame.column("unknown")
+
+
+def test_buoy_frame_grows():
+    '''Test that the frame grows past the initial capacity and that
+    rows are converted back to BuoyData
+    '''
+    frame = BuoyFrame(capacity=2)
+    observations = []
+    for index in range(10):
+        data = BuoyData()
+        data.set("atmp", 60.0 + index)
+        observations.append((str(index), data))
+
+    assert frame.extend(observations) == 10
+    assert not frame.append("bad", None)
+    assert len(frame) == 10
+    assert frame["atmp"].sum() == sum(60.0 + index for index in range(10))
+
+    station, data = frame.row(-1)
+    assert station == "9"
+    assert data.atmp == 69.0
+    assert data.wspd is None
+    assert data.epoch_time == observations[-1][1].epoch_time
+
+    with pytest.raises(IndexError):
+        frame.row(10)
+
+
+def test_buoy_frame_from_sources():
+    '''Test creating a frame from a dictionary of sources'''
+    source = Source("frame source")
+    for index in range(3):
+        buoy = Buoy(str(index))
+        buoy.present = BuoyData()
+        source.add_buoy(buoy)
+
+    frame = BuoyFrame.from_sources({source.name: source, "missing": None})
+    assert sorted(frame.stations) == ["0", "1", "2"]
+
+
 if __name__ == '__main__':
     test_buoy_data_json_all_available()
\ No newline at end of file
@@ -1,3 +1,4 @@
+from datetime import datetime, timedelta, timezone
 from os.path import exists, join
 from os import remove, listdir, environ
 import pytest
@@ -8,6 +9,7 @@ environ["NAUTICAL_CACHE_DIR"] = "nautical_cache_tests"
 
 # Load anything associated with nautical after env vars are set
 from nautical.cache import *
+from nautical.cache.common import atomic_open
 from nautical.cache.file import NAUTICAL_CACHE_DIR, NAUTICAL_CACHE_FILE
 from nautical.noaa.buoy import Buoy, Source
 
@@ -218,6 +220,405 @@ def test_load_time(subtests):
             assert isinstance(buoy, Buoy)  
 
 
+def test_http_cache(tmp_path):
+    '''Store a response and create the conditional headers from it'''
+    url = "https://www.ndbc.noaa.gov/station_page.php?station=44099"
+    http_cache = HTTPCache(str(tmp_path))
+
+    assert http_cache.conditional_headers(url) == {}
+    assert http_cache.load(url) is None
+
+    # responses without validators cannot be cached
+    assert not http_cache.store(url, {}, b"data")
+
+    assert http_cache.store(url, {"ETag": '"abc"', "Last-Modified": "Mon, 10 Oct 2022 10:00:00 GMT"}, b"data")
+    assert http_cache.load(url) == b"data"
+    assert http_cache.conditional_headers(url) == {
+        "If-None-Match": '"abc"',
+        "If-Modified-Since": "Mon, 10 Oct 2022 10:00:00 GMT"
+    }
+
+    http_cache.remove(url)
+    assert http_cache.load(url) is None
+    assert http_cache.conditional_headers(url) == {}
+
+
+def _make_buoy(station, minute=34, description=None, wvht=2.5):
+    '''Create a buoy with present data for the cache tests'''
+    return Buoy.from_json({
+        "station": station,
+        "description": description,
+        "valid": True,
+        "location": {"latitude": 36.0, "longitude": -75.34},
+        "data": {
+            'wdir': "ESE", 'wspd': 10.2, 'wvht': wvht,
+            'time': f'09:{minute:02d}:00', 'dd': 10, 'mm': 1, 'year': 2020
+        }
+    })
+
+
+def test_sqlite_cache(tmp_path):
+    '''Upsert buoys and sources into the sqlite cache and load them back'''
+    filename = str(tmp_path / "cache.db")
+
+    source = Source("TestSource", "Test Source")
+    source.add_buoys([_make_buoy("41001"), _make_buoy("SHIP", description="ship 1"),
+                      _make_buoy("SHIP", description="ship 2")])
+
+    with SQLiteCache(filename) as cache:
+        cache.upsert_source(source)
+        cache.upsert_buoy(_make_buoy("44099"))
+
+        assert [buoy.station for buoy in cache.get_buoys(source="")] == ["44099"]
+        assert len(cache.get_buoys(["SHIP"])) == 2
+
+        loaded = cache.get_source("TestSource")
+        assert loaded == source and len(loaded) == 3
+        assert cache.get_source("missing") is None
+
+        # update a single buoy, a newer observation is added to the history of the station
+        cache.upsert_buoy(_make_buoy("41001", minute=44, wvht=3.0), "TestSource")
+        assert cache.get_buoy("41001").present.wvht == 3.0
+        assert len(cache.get_source("TestSource")) == 3
+        assert [data.wvht for data in cache.observations("41001")] == [2.5, 3.0]
+
+        epoch_time = cache.get_buoy("41001").present.epoch_time
+        assert len(cache.observations("41001", start=epoch_time)) == 1
+        assert len(cache.observations("41001", end=epoch_time - 1)) == 1
+
+        assert cache.remove_source("TestSource")
+        assert cache.get_buoy("41001") is None
+
+
+def test_sqlite_cache_facade(tmp_path):
+    '''load and dumps detect the sqlite cache'''
+    filename = str(tmp_path / "cache.db")
+
+    source = Source("TestSource", "Test Source")
+    source.add_buoy(_make_buoy("41001"))
+    dumps({CacheData.BUOYS.name: [_make_buoy("44099")], CacheData.SOURCES.name: [source]}, filename)
+
+    # dumps upserts, the buoys that were already saved are kept
+    dumps({CacheData.BUOYS.name: [_make_buoy("44100")]}, filename)
+
+    data = load(filename)
+    assert sorted(buoy.station for buoy in data[CacheData.BUOYS.name]) == ["44099", "44100"]
+    assert data[CacheData.SOURCES.name][0].get_buoy("41001") is not None
+    assert data.get(CacheData.TIME.name) is not None
+
+    assert list(load(filename, CacheData.SOURCES).keys()) == [CacheData.SOURCES.name]
+
+    with pytest.raises(TypeError):
+        dumps([], filename)
+
+
+def test_journal_append_and_compact(tmp_path):
+    '''Append observations to the journal and fold them into the cache'''
+    journal_filename = str(tmp_path / "cache.journal")
+    snapshot = str(tmp_path / "cache.json")
+    dumps({CacheData.BUOYS.name: [_make_buoy("44099")]}, snapshot)
+
+    with ObservationJournal(journal_filename, sync_every=2) as journal:
+        for minute in (44, 54):
+            journal.append_buoy(_make_buoy("44099", minute=minute, wvht=minute / 10))
+        journal.append_buoy(_make_buoy("44100"))
+        assert len(journal) == 3
+
+        # the snapshot has not changed, replaying the journal gives the newest data
+        assert load(snapshot)[CacheData.BUOYS.name][0].present.wvht == 2.5
+        replayed = {buoy.station: buoy for buoy in journal.load(snapshot)[CacheData.BUOYS.name]}
+        assert replayed["44099"].present.wvht == 5.4
+        assert "44100" in replayed
+
+        assert journal.compact(snapshot) == 3
+        assert len(journal) == 0
+        assert journal.compact(snapshot) == 0
+
+        # compacting in the background
+        journal.append_buoy(_make_buoy("44101"))
+        journal.compact(snapshot, background=True).join()
+        assert len(journal) == 0
+
+    compacted = {buoy.station: buoy for buoy in load(snapshot)[CacheData.BUOYS.name]}
+    assert sorted(compacted) == ["44099", "44100", "44101"]
+    assert compacted["44099"].present.wvht == 5.4
+    assert compacted["44099"].location is not None
+
+
+def test_journal_recover(tmp_path):
+    '''An incomplete record at the end of the journal is removed'''
+    journal_filename = str(tmp_path / "cache.journal")
+
+    with ObservationJournal(journal_filename) as journal:
+        journal.append_buoy(_make_buoy("44099"))
+        journal.append_buoy(_make_buoy("44100"))
+
+    # simulate a crash while the last record was written
+    with open(journal_filename, "rb") as journal_file:
+        contents = journal_file.read()
+    with open(journal_filename, "wb") as journal_file:
+        journal_file.write(contents[:-10])
+
+    with ObservationJournal(journal_filename) as journal:
+        assert [record["station"] for record in journal.records()] == ["44099"]
+        journal.append_buoy(_make_buoy("44101"))
+        assert [record["station"] for record in journal.records()] == ["44099", "44101"]
+
+    with ObservationJournal(journal_filename) as journal, pytest.raises(TypeError):
+        journal.append("44099", {})
+
+    # the journal is closed
+    with pytest.raises(ValueError):
+        journal.records()
+    with pytest.raises(ValueError):
+        journal.append_buoy(_make_buoy("44102"))
+    with pytest.raises(ValueError):
+        journal.compact(str(tmp_path / "cache.json"))
+    journal.close()
+
+
+def test_indexed_cache(tmp_path):
+    '''Load single stations and sources from an indexed cache'''
+    filename = str(tmp_path / "cache.ncache")
+
+    source = Source("TestSource", "Test Source")
+    source.add_buoys([_make_buoy("41001"), _make_buoy("SHIP", description="ship 1"),
+                      _make_buoy("SHIP", description="ship 2")])
+    buoys = [_make_buoy(str(station)) for station in range(44000, 44100)]
+    dumps({CacheData.BUOYS.name: buoys, CacheData.SOURCES.name: [source]}, filename)
+
+    with IndexedCache(filename) as cache:
+        assert len(cache.stations) == 102
+        assert list(cache.sources) == ["TestSource"]
+
+        buoy = cache.get_buoy("44050")
+        assert buoy.station == "44050" and buoy.present.wvht == 2.5
+        assert cache.get_buoy("41001", source="") is None
+        assert cache.get_buoy("missing") is None
+        assert len(cache.get_buoys(["SHIP", "44001"])) == 3
+
+        loaded = cache.get_source("TestSource")
+        assert loaded == source and len(loaded) == 3
+        assert cache.get_source("missing") is None
+
+
+def test_indexed_cache_lazy_load(tmp_path):
+    '''Buoys and sources returned by load are decoded on first access'''
+    filename = str(tmp_path / "cache.ncache")
+    source = Source("TestSource", "Test Source")
+    source.add_buoy(_make_buoy("41001"))
+    buoys = [_make_buoy(str(station)) for station in range(44000, 44010)]
+    dumps({CacheData.BUOYS.name: buoys, CacheData.SOURCES.name: [source]}, filename)
+
+    with IndexedCache(filename) as cache:
+        data = cache.load()
+        assert data.get(CacheData.TIME.name) is not None
+
+        lazy_buoys = data[CacheData.BUOYS.name]
+        assert len(lazy_buoys) == 10 and lazy_buoys.num_decoded == 0
+        assert lazy_buoys[3].station == "44003"
+        assert lazy_buoys[3] is lazy_buoys[3]
+        assert lazy_buoys.num_decoded == 1
+        assert [buoy.station for buoy in lazy_buoys[-2:]] == ["44008", "44009"]
+
+        assert data[CacheData.SOURCES.name][0].get_buoy("41001") is not None
+
+    # the cache is closed, the buoys that were not decoded cannot be read
+    assert lazy_buoys[3].station == "44003"
+    with pytest.raises(ValueError):
+        lazy_buoys[0]
+    with pytest.raises(ValueError):
+        cache.get_buoy("44003")
+    with pytest.raises(ValueError):
+        cache.stations
+
+    # load decodes every buoy and closes the cache, so the file can be replaced
+    data = load(filename)
+    assert isinstance(data[CacheData.BUOYS.name], list)
+    assert [buoy.station for buoy in data[CacheData.BUOYS.name]] == [buoy.station for buoy in buoys]
+    dumps(data, filename)
+    assert list(load(filename, CacheData.SOURCES).keys()) == [CacheData.SOURCES.name]
+
+    # the journal can be compacted into an indexed cache
+    with ObservationJournal(str(tmp_path / "cache.journal")) as journal:
+        journal.append_buoy(_make_buoy("44000", minute=44, wvht=3.0))
+        assert journal.compact(filename) == 1
+    assert load(filename)[CacheData.BUOYS.name][0].present.wvht == 3.0
+
+    with pytest.raises(ValueError):
+        IndexedCache(str(tmp_path / "cache.journal"))
+
+
+def test_binary_cache(tmp_path):
+    '''Save and load a binary cache, the result matches the json cache'''
+    source = Source("TestSource", "Test Source")
+    source.add_buoys([_make_buoy("41001"), _make_buoy("SHIP", description="ship 1")])
+    buoy = _make_buoy("44099")
+    buoy.location = None
+    data = {CacheData.BUOYS.name: [buoy, _make_buoy("44100", minute=4)], CacheData.SOURCES.name: [source]}
+
+    json_filename = str(tmp_path / "cache.json")
+    binary_filename = str(tmp_path / "cache.nbin")
+    dumps(data, json_filename)
+    dumps(data, binary_filename)
+    dat_filename = str(tmp_path / "cache.dat")
+    dumps(data, dat_filename, format=CacheFormat.BINARY)
+
+    expected = load(json_filename)
+    for filename in (binary_filename, dat_filename):
+        loaded = load(filename)
+        assert loaded.get(CacheData.TIME.name) is not None
+        for key in (CacheData.BUOYS.name, CacheData.SOURCES.name):
+            assert [item.to_json() for item in loaded[key]] == [item.to_json() for item in expected[key]]
+
+    assert list(load(binary_filename, CacheData.SOURCES).keys()) == [CacheData.SOURCES.name]
+    assert load(binary_filename, CacheData.BUOYS)[CacheData.BUOYS.name][0].present.wdir == "ESE"
+
+
+def test_binary_cache_int_values(tmp_path):
+    '''Integer values of any variable are loaded as integers'''
+    buoy = _make_buoy("44099")
+    buoy_json = buoy.to_json()
+    buoy_json["data"]["wdir"] = 270
+    buoy = Buoy.from_json(buoy_json)
+    filename = str(tmp_path / "cache.nbin")
+    dumps({CacheData.BUOYS.name: [buoy]}, filename)
+
+    loaded = load(filename)[CacheData.BUOYS.name][0].present
+    assert loaded.wdir == 270 and isinstance(loaded.wdir, int)
+    assert isinstance(loaded.wspd, float) and isinstance(loaded.year, int)
+
+
+def test_dumps_format(tmp_path):
+    '''The format is selected by name and detected by load'''
+    data = {CacheData.BUOYS.name: [_make_buoy("44099")]}
+    for cache_format in CacheFormat:
+        filename = str(tmp_path / f"cache_{cache_format.value}")
+        dumps(data, filename, format=cache_format.value)
+        assert [buoy.station for buoy in load(filename)[CacheData.BUOYS.name]] == ["44099"]
+
+    with pytest.raises(ValueError):
+        dumps(data, str(tmp_path / "cache"), format="xml")
+
+
+def test_snapshot_store(tmp_path):
+    '''Snapshots share the blocks of the buoys that did not change'''
+    source = Source("TestSource", "Test Source")
+    source.add_buoys([_make_buoy("41001"), _make_buoy("SHIP", description="ship 1")])
+    for compression in ("gzip", "lzma", None):
+        buoys = [_make_buoy(str(station)) for station in range(44000, 44200)]
+        data = {CacheData.BUOYS.name: list(buoys), CacheData.SOURCES.name: [source]}
+        store = SnapshotStore(str(tmp_path / str(compression)), compression=compression, block_size=4)
+        first = store.snapshot(data)
+        blocks = [path for path in (tmp_path / str(compression) / "blocks").rglob("*") if path.is_file()]
+
+        # a single buoy changed, only the block(s) containing the buoy are added
+        buoys[100] = data[CacheData.BUOYS.name][100] = _make_buoy("44100", minute=44, wvht=3.0)
+        second = store.snapshot(data)
+        added = [path for path in (tmp_path / str(compression) / "blocks").rglob("*")
+                 if path.is_file() and path not in blocks]
+        assert 1 <= len(added) <= 2
+        assert store.snapshots == [first, second]
+
+        loaded = store.load(second)
+        assert [buoy.to_json() for buoy in loaded[CacheData.BUOYS.name]] == [buoy.to_json() for buoy in buoys]
+        assert [len(item) for item in loaded[CacheData.SOURCES.name]] == [2]
+        assert store.load(first, CacheData.BUOYS)[CacheData.BUOYS.name][100].present.wvht == 2.5
+
+        store.remove(first)
+        assert store.snapshots == [second]
+        # the blocks that were only used by the first snapshot are removed
+        remaining = [path for path in (tmp_path / str(compression) / "blocks").rglob("*") if path.is_file()]
+        assert set(added) <= set(remaining) and len(remaining) < len(blocks) + len(added)
+        assert len(store.load(second)[CacheData.BUOYS.name]) == len(buoys)
+
+    filename = str(tmp_path / "cache.json")
+    store.restore(second, filename)
+    assert len(load(filename)[CacheData.BUOYS.name]) == len(buoys)
+
+    with pytest.raises(KeyError):
+        store.load("missing")
+    with pytest.raises(ValueError):
+        SnapshotStore(str(tmp_path / "bz2"), compression="bz2")
+
+
+def test_snapshot_unchanged_buoys(tmp_path, monkeypatch):
+    '''The buoys that did not change are not encoded again'''
+    buoys = [_make_buoy(str(station)) for station in range(44000, 44100)]
+    store = SnapshotStore(str(tmp_path), block_size=4)
+    store.snapshot({CacheData.BUOYS.name: buoys})
+
+    encoded = []
+    encode = Buoy.to_json
+    monkeypatch.setattr(Buoy, "to_json", lambda buoy: encoded.append(buoy.station) or encode(buoy))
+    buoys[50] = _make_buoy("44050", minute=44, wvht=3.0)
+    name = store.snapshot({CacheData.BUOYS.name: buoys})
+    # the changed buoy and the buoys in the same block
+    assert "44050" in encoded and len(encoded) < len(buoys) // 2
+    assert store.load(name)[CacheData.BUOYS.name][50].present.wvht == 3.0
+
+
+@pytest.mark.parametrize("format", [CacheFormat.JSON, CacheFormat.INDEXED, CacheFormat.SQLITE])
+def test_snapshot_cache_file(tmp_path, format):
+    '''Snapshots of a cache file match snapshots of the data'''
+    source = Source("TestSource", "Test Source")
+    source.add_buoys([_make_buoy("41001"), _make_buoy("SHIP", description="ship 1")])
+    buoys = [_make_buoy(str(station)) for station in range(44000, 44050)]
+    data = {CacheData.BUOYS.name: buoys, CacheData.SOURCES.name: [source]}
+    filename = str(tmp_path / "cache")
+    dumps(data, filename, format=format)
+
+    store = SnapshotStore(str(tmp_path / "snapshots"), block_size=4)
+    name = store.snapshot(filename=filename)
+    loaded = store.load(name)
+    assert [buoy.to_json() for buoy in loaded[CacheData.BUOYS.name]] == [buoy.to_json() for buoy in buoys]
+    assert [(item.name, item.description, len(item)) for item in loaded[CacheData.SOURCES.name]] == \
+        [("TestSource", "Test Source", 2)]
+    assert CacheData.TIME.name in loaded
+
+    # the same records create the same blocks
+    blocks = [path for path in (tmp_path / "snapshots" / "blocks").rglob("*") if path.is_file()]
+    store.snapshot(filename=filename)
+    assert [path for path in (tmp_path / "snapshots" / "blocks").rglob("*") if path.is_file()] == blocks
+    assert store.snapshot(filename=str(tmp_path / "missing")) is None
+
+
+def test_snapshot_retention(tmp_path):
+    '''Keep hourly snapshots for 2 days and daily snapshots for 30 days'''
+    store = SnapshotStore(str(tmp_path))
+    now = datetime(2020, 2, 1, tzinfo=timezone.utc)
+    # a snapshot every 30 minutes for 40 days
+    for half_hours in range(40 * 48):
+        store.snapshot({CacheData.BUOYS.name: [_make_buoy("44099")]}, timestamp=now - timedelta(minutes=30 * half_hours))
+
+    policy = RetentionPolicy((timedelta(hours=1), timedelta(days=2)), (timedelta(days=1), timedelta(days=30)))
+    removed = store.prune(policy, now=now)
+    assert len(store.snapshots) + len(removed) == 40 * 48
+    created = [store.created(name) for name in store.snapshots]
+    assert len([time for time in created if now - time <= timedelta(days=2)]) == 49
+    assert min(created) >= now - timedelta(days=30)
+    # the newest snapshot is kept for each day
+    assert len({time.date() for time in created}) == 31
+
+
+def test_atomic_open(tmp_path):
+    '''The file is only replaced when the writer finishes, writers use separate temporary files'''
+    filename = str(tmp_path / "data.json")
+    with atomic_open(filename, "w") as first, atomic_open(filename, "w") as second:
+        assert first.name != second.name
+        first.write("first")
+        second.write("second")
+        assert not exists(filename)
+    assert open(filename).read() == "first"
+
+    with pytest.raises(RuntimeError):
+        with atomic_open(filename) as output:
+            output.write(b"partial")
+            raise RuntimeError("failed")
+    assert open(filename).read() == "first"
+    assert listdir(str(tmp_path)) == ["data.json"]
+
+
 @pytest.mark.last
 def test_remove_tmp_files():
     '''Remove any temporary files that were created during testing
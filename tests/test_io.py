@@ -1,7 +1,33 @@
+import asyncio
+import subprocess
+import sys
+from io import BytesIO
+from time import monotonic
 from uuid import uuid4
-from nautical.io.web import get_noaa_forecast_url, get_url_source
-from nautical.io.buoy import create_buoy, fill_buoy
-from nautical.io.sources import validate_sources
+from nautical.io.web import (
+    get_noaa_forecast_url,
+    get_url_source,
+    get_default_session,
+    set_default_session,
+    HTTPSession
+)
+from nautical.io.buoy import (
+    create_buoy,
+    fill_buoy,
+    async_create_buoys,
+    get_current_data,
+    get_current_data_from_source
+)
+from nautical.io.sources import validate_sources, get_buoy_sources, iter_kml_sources
+from nautical.io.web import RateLimiter
+from nautical.io.transport import RecordTransport, ReplayTransport, TransportResponse
+from nautical.io.realtime import (
+    parse_realtime_data,
+    fill_buoy_with_realtime_data,
+    parse_latest_obs,
+    update_sources_with_latest_obs
+)
+from nautical.cache import HTTPCache
 from nautical.io.cdata import (
     parse_winds,
     parse_location,
@@ -12,8 +38,10 @@ from nautical.io.cdata import (
 from nautical.location import Point
 from nautical.time import NauticalTime
 from nautical.noaa.buoy import Buoy, BuoyData, Source, SourceType
+from nautical.units import DistanceUnits, PressureUnits, SpeedUnits, convert
 from bs4 import BeautifulSoup
-from urllib.error import HTTPError
+from urllib.error import HTTPError, URLError
+from requests.exceptions import ConnectionError as RequestsConnectionError
 import pytest
 from os.path import abspath, dirname, join
 from unittest.mock import Mock, patch
@@ -33,6 +61,15 @@ class MockResponse:
         '''
         self.data = data
         self.code = status_code
+        self.status_code = status_code
+        self.headers = {}
+
+    @property
+    def content(self):
+        '''Mock of the requests.Response content
+        :return: data that was input
+        '''
+        return self.data
 
     def read(self):
         '''Mock function for the requests.get.json return type
@@ -73,7 +110,7 @@ def test_beautiful_soup_good():
     If interested the 44099 buoy resides in the Chesapeake Bay
     off of the coast of Virginia.
     '''
-    with patch("nautical.io.web.urlopen") as get_patch:
+    with patch("nautical.io.web.HTTPSession.get") as get_patch:
         get_patch.return_value = create_good_response("ValidBuoy.html")
         url = get_noaa_forecast_url(44099)
         soup = get_url_source(url)
@@ -84,7 +121,7 @@ def test_beautiful_soup_bad():
     '''Test that a buoy ID that has no meaning and no known
     matching buoy will not pass the lookup/creation.
     '''
-    with patch("nautical.io.web.urlopen", side_effect=HTTPError("", 404, "", {}, "")) as get_patch:
+    with patch("nautical.io.web.HTTPSession.get", side_effect=HTTPError("", 404, "", {}, None)) as get_patch:
         get_patch.return_value = create_bad_response("", 404)
 
         with pytest.raises(HTTPError):
@@ -95,7 +132,7 @@ def test_beautiful_soup_bad():
 def test_beautiful_soup_bad_empty_str_entry():
     '''Test that an empty buoy ID will not make a valid lookup request
     '''
-    with patch("nautical.io.web.urlopen", side_effect=HTTPError("", 404, "", {}, "")) as get_patch:
+    with patch("nautical.io.web.HTTPSession.get", side_effect=HTTPError("", 404, "", {}, None)) as get_patch:
         get_patch.return_value = create_bad_response("", 404)
 
         with pytest.raises(HTTPError):
@@ -110,6 +147,50 @@ def test_beautiful_soup_bad_empty_none_entry():
         bad_soup = get_url_source(None)
 
     
+def test_default_session_shared():
+    '''The module level session should be reused between calls so that
+    connections are kept alive.
+    '''
+    assert get_default_session() is get_default_session()
+
+    session = HTTPSession(pool_maxsize=2)
+    set_default_session(session)
+    assert get_default_session() is session
+
+    set_default_session(None)
+    assert get_default_session() is not session
+
+
+def test_session_http_error():
+    '''Responses with an error status are raised as HTTPError'''
+    response = Mock(status_code=404, reason="Not Found", headers={}, content=b"")
+
+    with patch("requests.Session.get", return_value=response) as get_patch:
+        with HTTPSession() as session:
+            with pytest.raises(HTTPError):
+                session.read(get_noaa_forecast_url(44099))
+
+        # the timeout of the session should be passed to every request
+        assert get_patch.call_args.kwargs["timeout"] == session.timeout
+
+
+def test_session_connection_error():
+    '''Transport errors are raised as URLError'''
+    with patch("requests.Session.get", side_effect=RequestsConnectionError("refused")):
+        with HTTPSession() as session:
+            with pytest.raises(URLError):
+                session.read(get_noaa_forecast_url(44099))
+
+
+def test_session_read():
+    '''A successful response returns the body of the response'''
+    response = Mock(status_code=200, content=create_good_response("ValidBuoy.html").read())
+
+    with patch("requests.Session.get", return_value=response):
+        soup = get_url_source(get_noaa_forecast_url(44099), session=HTTPSession())
+        assert isinstance(soup, BeautifulSoup)
+
+    
 def test_forecast_url_good():
     '''Test valid and invalid sets of data passed to the create forecast url
     '''
@@ -526,7 +607,7 @@ def test_valid_create_buoy():
     '''Create a valid buoy workup from the webpage data that was pulled
     for a specific known valid buoy
     '''
-    with patch("nautical.io.web.urlopen") as get_patch:
+    with patch("nautical.io.web.HTTPSession.get") as get_patch:
         get_patch.return_value = create_good_response("ValidBuoy.html")
         assert create_buoy("44072") is not None
 
@@ -548,16 +629,46 @@ def test_invalid_create_buoy():
     '''
     # Do NOT get confused as the response is good, a valid page is
     # used, but the data on the page cannot be parsed
-    with patch("nautical.io.web.urlopen") as get_patch:
+    with patch("nautical.io.web.HTTPSession.get") as get_patch:
         get_patch.return_value = create_good_response("InvalidBuoy.html")
         assert create_buoy("invalid-buoy") is None
 
 
+def test_async_create_buoys():
+    '''Create many buoys concurrently. The results should remain in the
+    same order as the stations that were provided.
+    '''
+    stations = ["44072", "", "44072"]
+
+    with patch("nautical.io.web.HTTPSession.get") as get_patch:
+        get_patch.return_value = create_good_response("ValidBuoy.html")
+        buoys = asyncio.run(async_create_buoys(stations, concurrency=2))
+
+    assert len(buoys) == len(stations)
+    assert buoys[0].station == "44072" and buoys[0].valid
+    assert buoys[1] is None
+    assert buoys[2].station == "44072" and buoys[2] is not buoys[0]
+    assert buoys[0].data.wvht == 0.3
+
+
+def test_async_create_buoys_failures():
+    '''Invalid pages and failed requests result in None entries'''
+    def _get(url, headers=None):
+        if url.endswith("bad-request"):
+            raise HTTPError(url, 404, "", {}, None)
+        return create_good_response("InvalidBuoy.html")
+
+    with patch("nautical.io.web.HTTPSession.get", side_effect=_get):
+        buoys = asyncio.run(async_create_buoys(["invalid-buoy", "bad-request"]))
+
+    assert buoys == [None, None]
+
+
 def test_fill_buoy_valid():
     '''The test will fill '''
     buoy = Buoy("44072", "This is a test buoy")
     
-    with patch("nautical.io.web.urlopen") as get_patch:
+    with patch("nautical.io.web.HTTPSession.get") as get_patch:
         get_patch.return_value = create_good_response("ValidBuoy.html")
 
         fill_buoy(buoy)
@@ -567,15 +678,37 @@ def test_fill_buoy_valid():
 
     # These values are pulled directly from the ValidBuoy.html in the tables
     # 'Conditions at ...'  and 'Detailed Wave Summary'
-    assert buoy.data.wvht == '0.3'
-    assert buoy.data.atmp == '64.0'
-    assert buoy.data.wtmp == '67.6'
-    assert buoy.data.sal == '19.98'
-    assert buoy.data.wspd == '9.7'
+    assert buoy.data.wvht == 0.3
+    assert buoy.data.atmp == 64.0
+    assert buoy.data.wtmp == 67.6
+    assert buoy.data.sal == 19.98
+    assert buoy.data.wspd == 9.7
     assert buoy.data.wdir == "NNE"
-    assert buoy.data.gst == '11.7'
-    assert buoy.data.wspd10m == '9.7'
-    assert buoy.data.wspd20m == "11.7"
+    assert buoy.data.gst == 11.7
+    assert buoy.data.wspd10m == 9.7
+    assert buoy.data.wspd20m == 11.7
+
+
+def test_current_data_from_source(subtests):
+    '''The fast parser should produce the same results as parsing
+    the full document with BeautifulSoup.
+    '''
+    search = ["Conditions at 44072", "Detailed Wave Summary"]
+
+    for filename in ("ValidBuoy.html", "InvalidBuoy.html"):
+        with subtests.test(filename=filename):
+            source = create_good_response(filename).read()
+
+            soup_data = BuoyData()
+            soup_valid = get_current_data(BeautifulSoup(source, features="lxml"), soup_data, search)
+
+            source_data = BuoyData()
+            source_valid = get_current_data_from_source(source, source_data, search)
+
+            assert soup_valid == source_valid
+            assert soup_data.to_json() == source_data.to_json()
+
+    assert not get_current_data_from_source(b"", BuoyData(), search)
 
 
 def test_invalid_type_validate_sources():
@@ -615,7 +748,7 @@ def test_remove_invalid_validate_sources():
     for buoy in buoys:
         source.add_buoy(buoy)
     
-    with patch("nautical.io.web.urlopen") as get_patch:
+    with patch("nautical.io.web.HTTPSession.get") as get_patch:
         get_patch.return_value = create_good_response("InvalidBuoy.html")
         unvalidated_sources = {SourceType.as_strings(SourceType.INTERNATIONAL_PARTNERS): source}
         validated_sources = validate_sources(unvalidated_sources)
@@ -635,10 +768,327 @@ def test_keep_invalid_validate_sources():
         source.add_buoy(buoy)
     num_before = len(source)
         
-    with patch("nautical.io.web.urlopen") as get_patch:
+    with patch("nautical.io.web.HTTPSession.get") as get_patch:
         get_patch.return_value = create_good_response("InvalidBuoy.html")
         unvalidated_sources = {SourceType.as_strings(SourceType.INTERNATIONAL_PARTNERS): source}
         validated_sources = validate_sources(unvalidated_sources, False)
 
     assert len(validated_sources) != 0
     assert len(validated_sources[SourceType.as_strings(SourceType.INTERNATIONAL_PARTNERS)]) == num_before
+
+
+def test_parallel_validate_sources():
+    '''Fill the buoys with a pool of workers. The order of the buoys
+    in each source should match the original source.
+    '''
+    source = Source(SourceType.as_strings(SourceType.INTERNATIONAL_PARTNERS),
+                    "This is a test Source, do not use")
+    for index in range(6):
+        source.add_buoy(Buoy(f"{index}", f"Test buoy {index}", Point(36.0, -75.0)))
+
+    with patch("nautical.io.web.HTTPSession.get") as get_patch:
+        get_patch.return_value = create_good_response("ValidBuoy.html")
+        unvalidated_sources = {SourceType.as_strings(SourceType.INTERNATIONAL_PARTNERS): source}
+        with patch("nautical.io.sources.HTTPSession", wraps=HTTPSession) as session_patch:
+            validated_sources = validate_sources(unvalidated_sources, False, max_workers=12)
+
+    # the pool of the session is large enough for every worker
+    session_patch.assert_called_once_with(pool_maxsize=12)
+    validated = validated_sources[SourceType.as_strings(SourceType.INTERNATIONAL_PARTNERS)]
+    assert [buoy.station for buoy in validated] == [buoy.station for buoy in source]
+    assert get_patch.call_count == len(source)
+
+
+def test_rate_limiter():
+    '''The rate limiter should space out the requests'''
+    limiter = RateLimiter(50)
+
+    start = monotonic()
+    for _ in range(6):
+        limiter.acquire()
+
+    # first request is immediate, the rest wait 1/50 seconds each
+    assert monotonic() - start >= 0.09
+
+    with pytest.raises(ValueError):
+        RateLimiter(0)
+
+
+def test_session_not_modified(tmp_path):
+    '''A 304 response should return the cached content and skip
+    parsing the page again when filling a buoy.
+    '''
+    modified = create_good_response("ValidBuoy.html")
+    modified.headers = {"ETag": '"44072-1"'}
+    not_modified = create_bad_response(b"", 304)
+
+    session = HTTPSession(cache=HTTPCache(str(tmp_path)))
+    buoy = Buoy("44072")
+
+    with patch("nautical.io.web.HTTPSession.get", return_value=modified):
+        fill_buoy(buoy, session=session)
+    assert buoy.valid
+
+    present = buoy.present
+    with patch("nautical.io.web.HTTPSession.get", return_value=not_modified) as get_patch:
+        response = session.fetch(get_noaa_forecast_url("44072"))
+        assert response.not_modified
+        assert response.content == modified.content
+        assert get_patch.call_args.kwargs["headers"] == {"If-None-Match": '"44072-1"'}
+
+        with patch("nautical.io.buoy.get_current_data_from_source") as parse_patch:
+            fill_buoy(buoy, session=session)
+            parse_patch.assert_not_called()
+
+    assert buoy.present.epoch_time == present.epoch_time
+
+
+def test_parse_realtime_data():
+    '''Parse the realtime text data, missing values are not set'''
+    buoy_data = parse_realtime_data(create_good_response("Realtime2Buoy.txt").read())
+
+    assert len(buoy_data) == 48
+
+    newest = buoy_data[0]
+    assert (newest.year, newest.mm, newest.dd) == (2022, 10, 18)
+    assert newest.time.hours == 17
+    assert newest.time.minutes == 30
+    assert newest.wdir == 46.0
+    # the metric values of the file are converted to the units of the station pages
+    assert newest.wspd == pytest.approx(convert(8.4, SpeedUnits.MPS, BuoyData.get_units("wspd")))
+    assert newest.wvht == pytest.approx(convert(0.18, DistanceUnits.METERS, BuoyData.get_units("wvht")))
+    assert newest.pres == pytest.approx(convert(1010.9, PressureUnits.HPA, BuoyData.get_units("pres")))
+    assert newest.atmp == pytest.approx(59.18)
+    assert "vis" not in newest
+    assert "ptdy" not in newest
+
+    # rows are ordered newest first
+    assert all(earlier.epoch_time > later.epoch_time
+               for earlier, later in zip(buoy_data, buoy_data[1:]))
+
+
+def test_parse_realtime_ocean_data():
+    '''The ocean temperature and depth are converted to the units of the station pages'''
+    data = "\n".join([
+        "#YY  MM DD hh mm   DEPTH  OTMP",
+        "#yr  mo dy hr mn       m  degC",
+        "2022 10 18 17 30     2.0  20.0",
+    ])
+    newest = parse_realtime_data(data)[0]
+    assert BuoyData.get_units("depth") == DistanceUnits.FEET
+    assert newest.depth == pytest.approx(convert(2.0, DistanceUnits.METERS, DistanceUnits.FEET))
+    assert newest.otmp == pytest.approx(68.0)
+
+
+def test_parse_realtime_data_bad_rows():
+    '''Rows that do not match the header are skipped'''
+    data = "#YY  MM DD hh mm WDIR SPEC\n2022 10 18 17 30  46 1.0\n2022 10 18 17\n"
+    buoy_data = parse_realtime_data(data)
+
+    assert len(buoy_data) == 1
+    assert buoy_data[0].wdir == 46.0
+
+    assert parse_realtime_data("2022 10 18 17 30  46") == []
+
+
+def test_fill_buoy_with_realtime_data():
+    '''The newest realtime observation is the present data'''
+    buoy = Buoy("44072")
+
+    with patch("nautical.io.web.HTTPSession.get") as get_patch:
+        get_patch.return_value = create_good_response("Realtime2Buoy.txt")
+        fill_buoy_with_realtime_data(buoy)
+
+    assert get_patch.call_args.args[0].endswith("realtime2/44072.txt")
+    assert buoy.valid
+    assert buoy.present.wspd == pytest.approx(8.4 * 1.94384)
+
+
+def test_parse_latest_obs():
+    '''Parse the latest observations for all stations'''
+    latest_obs = parse_latest_obs(create_good_response("LatestObs.txt").read())
+
+    assert list(latest_obs.keys()) == ["13001", "41001", "44072", "BURL1"]
+
+    buoy = latest_obs["41001"]
+    assert buoy.valid
+    assert buoy.location.latitude == 34.724
+    assert buoy.location.longitude == -72.317
+    assert buoy.present.wspd == pytest.approx(7.0 * 1.94384)
+    assert buoy.present.ptdy == pytest.approx(convert(-0.9, PressureUnits.HPA, PressureUnits.PSI))
+    assert buoy.present.time.hours == 16
+
+
+def test_update_sources_with_latest_obs():
+    '''Update the buoys of all sources with a single request'''
+    ndbc = Source(SourceType.as_strings(SourceType.NDBC_METEOROLOGICAL_OCEAN), "NDBC")
+    ndbc.add_buoy(Buoy("41001"))
+    ndbc.add_buoy(Buoy("missing"))
+    nos = Source(SourceType.as_strings(SourceType.NOS_CO_OPS), "NOS")
+    nos.add_buoy(Buoy("burl1"))
+    sources = {ndbc.name: ndbc, nos.name: nos}
+
+    with patch("nautical.io.web.HTTPSession.get") as get_patch:
+        get_patch.return_value = create_good_response("LatestObs.txt")
+        assert update_sources_with_latest_obs(sources) == 2
+        assert get_patch.call_count == 1
+
+    assert ndbc.get_buoy("41001").valid
+    assert not ndbc.get_buoy("missing").valid
+
+    # the refreshed data uses the same units as the data from the station pages
+    present = ndbc.get_buoy("41001").present
+    assert BuoyData.get_units("wspd") == SpeedUnits.KNOTS
+    assert present.wspd == pytest.approx(convert(7.0, SpeedUnits.MPS, SpeedUnits.KNOTS))
+    assert BuoyData.get_units("wvht") == DistanceUnits.FEET
+    assert present.wvht == pytest.approx(convert(1.6, DistanceUnits.METERS, DistanceUnits.FEET))
+    assert nos.get_buoy("burl1").present.atmp == pytest.approx(73.58)
+    assert nos.get_buoy("burl1").location.latitude == 28.905
+
+    # the observations are not newer, the present data is kept
+    latest_obs = parse_latest_obs(create_good_response("LatestObs.txt").read())
+    assert update_sources_with_latest_obs(sources, latest_obs) == 0
+
+    # a row without a location (MM) keeps the known location
+    location = ndbc.get_buoy("41001").location
+    data = "\n".join([
+        "#STN       LAT      LON  YYYY MM DD hh mm WSPD",
+        "#text      deg      deg   yr mo day hr mn  m/s",
+        "41001       MM       MM 2022 10 18 17 50  8.0",
+    ])
+    assert update_sources_with_latest_obs(sources, parse_latest_obs(data)) == 1
+    assert ndbc.get_buoy("41001").location is location
+
+
+def _get_kml(url, headers=None):
+    '''Mock of the responses for the kml documents'''
+    if url.endswith("marineobs_by_pgm.kml"):
+        return create_good_response("MarineObs.kml")
+    return create_good_response("BuoySources.kml")
+
+
+def test_get_buoy_sources():
+    '''Parse all supported sources from the kml documents'''
+    with patch("nautical.io.web.HTTPSession.get", side_effect=_get_kml) as get_patch:
+        sources = get_buoy_sources()
+
+    assert get_patch.call_args_list[1].args[0] == \
+        "https://www.ndbc.noaa.gov/kml/marineobs_as_kml.php?sort=pgm"
+    assert list(sources.keys()) == [
+        "International Partners", "NDBC Meteorological/Ocean", "Ships"
+    ]
+
+    ndbc = sources["NDBC Meteorological/Ocean"]
+    assert ndbc.description == "NDBC Meteorological/Ocean"
+    assert [buoy.station for buoy in ndbc] == ["41001", "44072"]
+    assert ndbc.get_buoy("44072").description == "York Spit, VA"
+    assert ndbc.get_buoy("44072").location.latitude == 37.201
+    assert ndbc.get_buoy("44072").location.longitude == -76.266
+    assert not ndbc.get_buoy("44072").valid
+
+    ship = sources["Ships"].get_buoy("SHIP")
+    assert ship.valid
+    assert ship.present.wspd == 15.6
+
+
+def test_get_buoy_sources_by_type():
+    '''Only the requested sources are created'''
+    with patch("nautical.io.web.HTTPSession.get", side_effect=_get_kml):
+        sources = get_buoy_sources([SourceType.SHIPS, SourceType.TAO])
+
+    assert list(sources.keys()) == ["Ships"]
+
+
+def test_iter_kml_sources():
+    '''Sources are yielded as they are parsed'''
+    kml = create_good_response("BuoySources.kml").read()
+    sources = iter_kml_sources(BytesIO(kml), ["International Partners", "Ships"])
+
+    assert next(sources).name == "International Partners"
+    assert next(sources).name == "Ships"
+    with pytest.raises(StopIteration):
+        next(sources)
+
+
+def test_get_buoy_sources_catalogue(tmp_path):
+    '''The parsed sources are saved to and loaded from the catalogue'''
+    catalogue = str(tmp_path / "catalogue.json")
+
+    with patch("nautical.io.web.HTTPSession.get", side_effect=_get_kml) as get_patch:
+        sources = get_buoy_sources(use_cache=True, cache_filename=catalogue)
+        assert get_patch.call_count == 2
+
+        # warm start, nothing is downloaded
+        cached_sources = get_buoy_sources(use_cache=True, cache_filename=catalogue)
+        assert get_patch.call_count == 2
+
+        assert list(cached_sources.keys()) == list(sources.keys())
+        ndbc = cached_sources["NDBC Meteorological/Ocean"]
+        assert [buoy.station for buoy in ndbc] == ["41001", "44072"]
+        assert ndbc.get_buoy("41001").location.latitude == 34.724
+        assert cached_sources["Ships"].get_buoy("SHIP").valid
+
+        # a subset of the sources can be loaded from the catalogue
+        ships = get_buoy_sources(SourceType.SHIPS, use_cache=True, cache_filename=catalogue)
+        assert list(ships.keys()) == ["Ships"]
+        assert get_patch.call_count == 2
+
+        # a partial refresh only downloads the documents once
+        refreshed = get_buoy_sources(
+            use_cache=True, cache_filename=catalogue, force_refresh=SourceType.SHIPS
+        )
+        assert get_patch.call_count == 4
+        assert set(refreshed.keys()) == set(sources.keys())
+
+        # expired entries are downloaded again
+        get_buoy_sources(use_cache=True, cache_filename=catalogue, cache_ttl=-1)
+        assert get_patch.call_count == 6
+
+    # the stale sources are used when the documents cannot be downloaded
+    with patch("nautical.io.web.HTTPSession.get", side_effect=URLError("offline")):
+        stale_sources = get_buoy_sources(use_cache=True, cache_filename=catalogue, cache_ttl=-1)
+    assert set(stale_sources.keys()) == set(sources.keys())
+    assert [buoy.station for buoy in stale_sources["NDBC Meteorological/Ocean"]] == ["41001", "44072"]
+
+
+def test_import_io_without_cache():
+    '''Importing the io package does not import the cache package'''
+    code = "import sys, nautical.io; print(any(name.startswith('nautical.cache') for name in sys.modules))"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "False"
+
+
+def test_record_replay_transport(tmp_path):
+    '''Record the responses of a session and replay them without
+    sending any requests to the server.
+    '''
+    fixtures = str(tmp_path / "fixtures")
+    url = get_noaa_forecast_url("44072")
+    page = create_good_response("ValidBuoy.html").read()
+
+    recorded = Mock()
+    recorded.get.return_value = TransportResponse(200, "OK", {"ETag": '"44072-1"'}, page)
+
+    with HTTPSession(transport=RecordTransport(fixtures, transport=recorded)) as session:
+        assert session.read(url) == page
+
+    replay = ReplayTransport(fixtures, latency=0.01)
+    with HTTPSession(transport=replay) as session:
+        start = monotonic()
+        buoy = create_buoy("44072", session=session)
+        assert monotonic() - start >= 0.01
+        assert buoy.data.wvht == 0.3
+
+        # urls that were not recorded are not found
+        with pytest.raises(HTTPError):
+            session.read(get_noaa_forecast_url("41001"))
+
+    # conditional requests are answered with 304 when the ETag matches
+    response = replay.get(url, headers={"If-None-Match": '"44072-1"'})
+    assert response.status_code == 304
+    assert response.headers["etag"] == '"44072-1"'
+
+    response = replay.get(url, headers={"If-None-Match": '"44072-0"'})
+    assert response.status_code == 200
+    assert response.content == page
+
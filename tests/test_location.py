@@ -1,8 +1,20 @@
 from nautical.location.point import Point
-from nautical.location.util import haversine, in_range, in_range_ll, in_area
+from nautical.location import PointArray, PreparedArea, SpatialIndex
+from nautical.location.distance import haversine_deg
+from nautical.location.util import (
+    haversine,
+    haversine_matrix,
+    haversine_one_to_many,
+    in_range,
+    in_range_ll,
+    in_area
+)
 from nautical.units import DistanceUnits, TimeUnits
 from math import fabs
+from copy import copy
+import numpy as np
 import pytest
+import pickle
 
 
 def test_create_no_altitude():
@@ -19,6 +31,21 @@ def test_create_with_altitude():
     assert p1.latitude == 76.45 and p1.longitude == -110.123 and p1.altitude == 123.67
     
     
+def test_point_immutable():
+    '''Test that points cannot be changed and are shared when copied'''
+    pnt = Point(36.0, -75.0, 1.0)
+    with pytest.raises(AttributeError):
+        pnt.x = 1.0
+    assert copy(pnt) is pnt
+    assert pnt.copy() is not pnt
+    assert pnt.copy().as_tuple() == pnt.as_tuple()
+    assert pickle.loads(pickle.dumps(pnt)).altitude == 1.0
+    assert Point.from_json(pnt.to_json()).to_json() == pnt.to_json()
+    with pytest.raises(AttributeError):
+        pnt.from_dict({"latitude": 10.0})
+    assert pnt.latitude == 36.0
+
+
 def test_parse_altitude():
     '''Test the parse static method with altitude'''
     p1 = Point.parse("-110.123, 76.45, 123.67")
@@ -94,9 +121,9 @@ def test_haversine_invalid_units():
 
 
 def test_haversine_centimeters():
-    '''Centimeters is not supported and should return None'''
-    with pytest.raises(AttributeError):
-        assert haversine(Point(36, -75), Point(37, -76), DistanceUnits.CENTIMETERS) is None
+    '''Test that centimeters are accepted like the other distance units'''
+    meters = haversine(Point(36, -75), Point(37, -76))
+    assert haversine(Point(36, -75), Point(37, -76), DistanceUnits.CENTIMETERS) == pytest.approx(meters * 100)
 
     
 def test_haversine_p2_incorrect():
@@ -147,10 +174,10 @@ def test_in_range_invalid_p1_not_point():
         assert not in_range("serser", Point(36, -75), 140000)
 
     
-def test_in_range_unsupported_units():
-    '''Test in range using an unsupported type = Centimeters'''
-    with pytest.raises(TypeError):
-        assert not in_range("serser", Point(36, -75), 140000, DistanceUnits.CENTIMETERS)
+def test_in_range_centimeters():
+    '''Test in range using centimeters'''
+    assert in_range(Point(36, -75), Point(37, -76), 15000000, DistanceUnits.CENTIMETERS)
+    assert not in_range(Point(36, -75), Point(37, -76), 14000000, DistanceUnits.CENTIMETERS)
 
 
 def test_in_range_ll_valid_base_units():
@@ -283,4 +310,249 @@ def test_json_complete_set():
     
     assert p.latitude == 35.45
     assert p.longitude == -78.234
-    assert p.altitude == 10
\ No newline at end of file
+    assert p.altitude == 10
+
+def test_point_slots():
+    '''Test that points do not store the coordinates twice'''
+    p = Point(36.0, -75.0, 500.0)
+    assert not hasattr(p, "__dict__")
+    assert (p.x, p.y, p.z) == (36.0, -75.0, 500.0)
+
+
+def test_point_array_from_kml():
+    '''Test creating a point array from kml coordinate strings'''
+    points = PointArray.from_kml(["-75.0,36.0,10 -76.5,37.25", " -77.0,38.0,0 "])
+    assert len(points) == 3
+    assert points.latitudes.tolist() == [36.0, 37.25, 38.0]
+    assert points.longitudes.tolist() == [-75.0, -76.5, -77.0]
+    assert points.altitudes.tolist() == [10.0, 0.0, 0.0]
+    assert points.latitudes.dtype == np.float64
+
+    pnt = points[1]
+    assert isinstance(pnt, Point)
+    assert pnt.as_tuple() == (37.25, -76.5)
+    assert [p.latitude for p in points] == [36.0, 37.25, 38.0]
+
+    assert len(points[points.latitudes > 36.5]) == 2
+    assert points[1:].latitudes.tolist() == [37.25, 38.0]
+
+    with pytest.raises(ValueError):
+        points.latitudes[0] = 1.0
+
+    with pytest.raises(ValueError):
+        PointArray.from_kml("-75.0")
+
+    with pytest.raises(ValueError):
+        PointArray([1.0, 2.0], [1.0])
+
+
+def test_point_array_json():
+    '''Test converting a point array to and from json'''
+    points = PointArray.from_points([Point(36.0, -75.0), Point(37.0, -76.0, 5.0)])
+    assert PointArray.from_json(points.to_json()).altitudes.tolist() == [0.0, 5.0]
+    assert len(PointArray.from_points([])) == 0
+
+
+def test_point_array_util():
+    '''Test that the util functions accept point arrays'''
+    origin = Point(36.0, -75.0)
+    points = PointArray.from_points([Point(36.0, -75.0), Point(36.5, -75.0), Point(40.0, -75.0)])
+
+    distances = haversine(origin, points, DistanceUnits.NAUTICAL_MILES)
+    assert np.allclose(distances, [origin.distance(p, DistanceUnits.NAUTICAL_MILES) for p in points])
+    assert in_range(origin, points, 50.0, DistanceUnits.NAUTICAL_MILES).tolist() == [True, True, False]
+
+    geo = PointArray.from_points([Point(35.0, -76.0), Point(37.0, -74.0)])
+    assert in_area(geo, points).tolist() == [True, True, False]
+
+
+def test_haversine_vectorized_all_units(subtests):
+    '''Test that the vectorized distances match Point.distance for every unit'''
+    origin = Point(36.0, -75.0)
+    points = PointArray([36.0, 37.0, -33.9, 51.5], [-75.0, -76.0, 151.2, -0.1])
+
+    for units in DistanceUnits:
+        with subtests.test(units=units):
+            distances = haversine_one_to_many(origin, points, units)
+            expected = [haversine_deg(origin.latitude, origin.longitude, p.latitude, p.longitude, units)
+                        for p in points]
+            assert np.allclose(distances, expected, rtol=1e-12)
+            assert np.allclose(distances, [origin.distance(p, units) for p in points], rtol=1e-12)
+
+
+def test_haversine_matrix_chunks():
+    '''Test that the pairwise distances are the same for any chunk size'''
+    rng = np.random.default_rng(0)
+    points_one = PointArray(rng.uniform(-90, 90, 25), rng.uniform(-180, 180, 25))
+    points_two = PointArray(rng.uniform(-90, 90, 7), rng.uniform(-180, 180, 7))
+
+    matrix = haversine_matrix(points_one, points_two, DistanceUnits.NAUTICAL_MILES)
+    assert matrix.shape == (25, 7)
+    assert np.allclose(matrix[3], haversine_one_to_many(points_one[3], points_two,
+                                                        DistanceUnits.NAUTICAL_MILES))
+    for chunk_size in (1, 10, 100):
+        assert np.allclose(matrix, haversine_matrix(points_one, points_two,
+                                                    DistanceUnits.NAUTICAL_MILES, chunk_size))
+
+    square = haversine_matrix(points_one)
+    assert square.shape == (25, 25)
+    assert np.allclose(np.diag(square), 0.0)
+    assert np.allclose(square, square.T)
+
+    with pytest.raises(TypeError):
+        haversine_matrix([Point(36, -75)])
+    with pytest.raises(TypeError):
+        haversine_one_to_many(points_one, points_two)
+
+
+class _Item:
+    '''Item with a location for the spatial index tests'''
+
+    def __init__(self, name, location):
+        self.name = name
+        self.location = location
+
+
+def _random_items(num_items, seed=0):
+    rng = np.random.default_rng(seed)
+    lats = rng.uniform(-90, 90, num_items)
+    lons = rng.uniform(-180, 180, num_items)
+    return [_Item(index, Point(float(lat), float(lon))) for index, (lat, lon) in enumerate(zip(lats, lons))]
+
+
+def test_spatial_index_within_and_nearest(subtests):
+    '''Test the index queries against measuring the distance to every item'''
+    items = _random_items(2000)
+    index = SpatialIndex(cell_size=2.0)
+    for item in items:
+        assert index.insert(item)
+    assert len(index) == 2000
+
+    centers = [Point(36.0, -75.0), Point(89.5, 10.0), Point(-10.0, 179.9), Point(0.0, -179.5)]
+    for center in centers:
+        with subtests.test(center=str(center)):
+            distances = sorted(
+                (center.distance(item.location, DistanceUnits.NAUTICAL_MILES), item.name) for item in items
+            )
+
+            expected = [name for dist, name in distances if dist <= 500.0]
+            found = index.within(center, 500.0, DistanceUnits.NAUTICAL_MILES)
+            assert [item.name for item, _ in found] == expected
+
+            nearest = index.nearest(center, k=5, units=DistanceUnits.NAUTICAL_MILES)
+            assert [item.name for item, _ in nearest] == [name for _, name in distances[:5]]
+            assert np.allclose([dist for _, dist in nearest], [dist for dist, _ in distances[:5]])
+
+    assert len(index.nearest(Point(0.0, 0.0), k=5000)) == 2000
+    assert SpatialIndex().nearest(Point(0.0, 0.0)) == []
+
+
+def test_spatial_index_bbox():
+    '''Test bounding box queries including a box that crosses the antimeridian'''
+    items = _random_items(1000, seed=1)
+    index = SpatialIndex()
+    for item in items:
+        index.insert(item)
+
+    found = {item.name for item in index.in_bbox(30.0, -80.0, 40.0, -70.0)}
+    assert found == {item.name for item in items
+                     if 30.0 <= item.location.latitude <= 40.0 and -80.0 <= item.location.longitude <= -70.0}
+
+    found = {item.name for item in index.in_bbox(-20.0, 170.0, 20.0, -170.0)}
+    assert found == {item.name for item in items
+                     if -20.0 <= item.location.latitude <= 20.0 and
+                     (item.location.longitude >= 170.0 or item.location.longitude <= -170.0)}
+    assert found
+
+
+def test_spatial_index_antimeridian():
+    '''Test queries across the antimeridian when the cells do not divide 360 degrees'''
+    item = _Item("east", Point(0.0, -179.5))
+    index = SpatialIndex(cell_size=7)
+    index.insert(item)
+
+    found = index.within(Point(0.0, 179.5), 200.0, DistanceUnits.KILOMETERS)
+    assert [found_item for found_item, _ in found] == [item]
+    assert 110.0 < found[0][1] < 112.0
+    assert index.nearest(Point(0.0, 179.5), units=DistanceUnits.KILOMETERS) == found
+    assert index.in_bbox(-1.0, 179.0, 1.0, -179.0) == [item]
+
+
+def test_spatial_index_insert_remove():
+    '''Test moving and removing items from the index'''
+    ship = _Item("ship", Point(36.0, -75.0))
+    index = SpatialIndex()
+    assert index.insert(ship)
+    assert not index.insert(_Item("no location", None))
+
+    assert index.nearest(Point(36.0, -75.0))[0][0] is ship
+    index.update(ship, Point(10.0, 10.0))
+    assert len(index) == 1
+    assert index.within(Point(36.0, -75.0), 100.0, DistanceUnits.KILOMETERS) == []
+    assert index.within(Point(10.0, 10.0), 1.0)[0][0] is ship
+
+    assert ship in index
+    assert index.remove(ship)
+    assert not index.remove(ship)
+    assert len(index) == 0 and ship not in index
+
+    with pytest.raises(ValueError):
+        SpatialIndex(cell_size=0)
+
+
+def test_prepared_area_matches_in_area(subtests):
+    '''Test that the vectorized test matches the point by point test'''
+    geometries = {
+        "rectangle": [Point(36.849403, -75.9408287), Point(36.867840, -75.813113)],
+        "square": [
+            Point(36.849403, -75.9408287),
+            Point(36.849403, -75.813113),
+            Point(36.867840, -75.813113),
+            Point(36.867840, -75.9408287)
+        ],
+        "concave": [
+            Point(36.932651, -75.852713),
+            Point(36.824144, -75.800303),
+            Point(36.862386, -75.784889),
+            Point(36.808101, -75.700108),
+            Point(36.916631, -75.650781)
+        ]
+    }
+
+    rng = np.random.default_rng(2)
+    points = PointArray(rng.uniform(36.78, 36.96, 2000), rng.uniform(-75.97, -75.62, 2000))
+    # include the vertices of the geometries (edge cases for the ray casting)
+    points = PointArray.from_points(
+        list(points) + [pnt for geo in geometries.values() for pnt in geo]
+    )
+
+    for name, geo in geometries.items():
+        with subtests.test(geometry=name):
+            expected = [in_area(geo, pnt) for pnt in points]
+            area = PreparedArea(geo)
+            assert area.contains(points).tolist() == expected
+            assert in_area(area, points).tolist() == expected
+            assert in_area(PointArray.from_points(geo), points).tolist() == expected
+            assert any(expected) and not all(expected)
+
+
+def test_prepared_area_point():
+    '''Test a prepared area with single points'''
+    area = PreparedArea([Point(35.0, -76.0), Point(37.0, -74.0)])
+    assert area.bbox == (35.0, -76.0, 37.0, -74.0)
+    assert Point(36.0, -75.0) in area
+    assert Point(38.0, -75.0) not in area
+    assert in_area(area, Point(36.0, -75.0)) is True
+    assert len(area.contains(PointArray([], []))) == 0
+
+
+def test_prepared_area_invalid():
+    '''Test that invalid geometries are rejected when the area is prepared'''
+    with pytest.raises(TypeError):
+        PreparedArea([Point(35.0, -76.0)])
+
+    with pytest.raises(TypeError):
+        PreparedArea([Point(35.0, -76.0), Point(37.0, -74.0), (36.0, -75.0)])
+
+    with pytest.raises(TypeError):
+        PreparedArea([Point(35.0, -76.0), Point(37.0, -74.0)]).contains((36.0, -75.0))
@@ -153,10 +153,10 @@ def test_good_distance_conversion():
     MILES = 2.10
 
     Expect:
-        cm = 337961.4
-        ft = 11087.972
-        yd = 3695.991
-        mt = 3379.614
+        cm = 337962.24
+        ft = 11088.0
+        yd = 3696.0
+        mt = 3379.6224
         km = 3.380
         nm = 1.825
     '''
@@ -164,10 +164,10 @@ def test_good_distance_conversion():
 
     dist_test_data  = [
         (DistanceUnits.MILES, 2.10),
-        (DistanceUnits.CENTIMETERS, 337961.4),
-        (DistanceUnits.FEET, 11087.972),
-        (DistanceUnits.YARDS, 3695.991),
-        (DistanceUnits.METERS, 3379.614),
+        (DistanceUnits.CENTIMETERS, 337962.24),
+        (DistanceUnits.FEET, 11088.0),
+        (DistanceUnits.YARDS, 3696.0),
+        (DistanceUnits.METERS, 3379.6224),
         (DistanceUnits.KILOMETERS, 3.380),
         (DistanceUnits.NAUTICAL_MILES, 1.825)
     ]
@@ -194,3 +194,12 @@ def test_good_temperature_conversion():
     
     assert not errors, "\n".join(errors)
 
+
+
+def test_good_pressure_conversion():
+    '''
+    Test converting the pressure from the realtime data (hPa)
+    '''
+    assert fabs(convert_pressure(1013.25, PressureUnits.HPA, PressureUnits.PA) - 101325.0) < 0.001
+    assert fabs(convert(1013.25, PressureUnits.HPA, PressureUnits.PSI) - 14.692) < 0.001
+    assert fabs(convert(14.692, PressureUnits.PSI, PressureUnits.HPA) - 1013.24) < 0.01